@@ -0,0 +1,64 @@
+"""
+Compare running several searches from an event loop:
+- "sync": `scrap_all_jobs`, one search after the other, blocking the event loop
+- "async": `scrap_all_jobs_async`, all searches at once, each driving its browser in its own thread
+
+The searches run against fake browsers. The event loop's lag is how late a coroutine
+waking up every 10ms is woken up, at worst
+
+    python -m benchmarks.bench_async_search --searches 4 --cards 100 --load-latency 0.1
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+from jobsscraper import linkedin
+from .fakes import FakeDriver
+
+
+async def run(args: argparse.Namespace, concurrent: bool) -> tuple[int, float, float]:
+    lag = 0.
+
+    async def heartbeat():
+        nonlocal lag
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag = max(lag, time.perf_counter() - start - 0.01)
+
+    async def search(location: str) -> int:
+        jobs = linkedin.scrap_all_jobs_async(location, keyword="Python")
+        return sum([1 async for _ in jobs])
+
+    drivers = [FakeDriver(args.cards, load_latency=args.load_latency) for _ in range(args.searches)]
+    with patch("selenium.webdriver.Chrome", side_effect=drivers):
+        beat = asyncio.ensure_future(heartbeat())
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        if concurrent:
+            nb_jobs = sum(await asyncio.gather(*(search(f"City {i}") for i in range(args.searches))))
+        else:
+            nb_jobs = sum(
+                sum(1 for _ in linkedin.scrap_all_jobs(f"City {i}", keyword="Python")) for i in range(args.searches))
+        elapsed = time.perf_counter() - start
+        # let the heartbeat see how late it is
+        await asyncio.sleep(0.02)
+        beat.cancel()
+    return nb_jobs, elapsed, lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=4, help="number of searches")
+    parser.add_argument("--cards", type=int, default=100, help="number of jobs in each search's results")
+    parser.add_argument("--load-latency", type=float, default=0.1, help="how long new jobs take to load, in seconds")
+    args = parser.parse_args()
+
+    for name, concurrent in (("sync", False), ("async", True)):
+        nb_jobs, elapsed, lag = asyncio.run(run(args, concurrent))
+        print(f"{name:>5}: {nb_jobs} jobs, {elapsed:.2f}s, event loop lag {lag * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare the throughput of the search backends:
+- "selenium": the search page, through a fake browser adding latency to every call
+- "http": the guest search fragments, served by a local stub server adding latency to every response
+
+    python -m benchmarks.bench_backends --cards 500 --load-latency 0.3
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from jobsscraper.linkedin import guest, scraper
+from .fakes import FakeDriver, fake_card, render_card
+
+
+def run_selenium(nb_cards: int, load_latency: float) -> tuple[int, float]:
+    driver = FakeDriver(nb_cards, load_latency=load_latency)
+    with patch("selenium.webdriver.Chrome", return_value=driver):
+        all_jobs_scraper = scraper.AllJobsScraper("Munich")
+    start = time.perf_counter()
+    nb_jobs = sum(1 for _ in all_jobs_scraper.scrap_jobs(keywords="Python"))
+    return nb_jobs, time.perf_counter() - start
+
+
+def stub_search_server(nb_cards: int, page_size: int, latency: float) -> TestServer:
+    pages = [
+        "".join(render_card(fake_card(i)) for i in range(start, min(start + page_size, nb_cards)))
+        for start in range(0, nb_cards, page_size)
+    ]
+
+    async def search(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        page = int(request.query["start"]) // page_size
+        return web.Response(text=pages[page] if page < len(pages) else "", content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/search", search)
+    return TestServer(app)
+
+
+async def run_http(nb_cards: int, load_latency: float, concurrency: int) -> tuple[int, float]:
+    async with stub_search_server(nb_cards, 10, load_latency) as server:
+        guest_scraper = guest.GuestJobsScraper(
+            "Munich", search_url=str(server.make_url("/search")), concurrency=concurrency)
+        start = time.perf_counter()
+        nb_jobs = 0
+        async for _ in guest_scraper.scrap_jobs(keywords="Python"):
+            nb_jobs += 1
+        return nb_jobs, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=500, help="number of jobs in the search results")
+    parser.add_argument("--load-latency", type=float, default=0.3, help="how long new jobs take to load, in seconds")
+    parser.add_argument("--concurrency", type=int, default=4, help="fragments requested at the same time")
+    args = parser.parse_args()
+
+    for name, (nb_jobs, elapsed) in (
+            ("selenium", run_selenium(args.cards, args.load_latency)),
+            ("http", asyncio.run(run_http(args.cards, args.load_latency, 1))),
+            (f"http x{args.concurrency}", asyncio.run(run_http(args.cards, args.load_latency, args.concurrency))),
+    ):
+        print(f"{name:>10}: {nb_jobs} jobs, {elapsed:.2f}s, {nb_jobs / elapsed:.1f} jobs/s")
+
+
+if __name__ == "__main__":
+    main()
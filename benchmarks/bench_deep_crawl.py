@@ -0,0 +1,66 @@
+"""
+Compare how a long search behaves as the page grows, against a fake browser getting slower
+and bigger with the cards it holds:
+- "keep": the cards stay on the page
+- "prune": the cards are emptied once scraped (`prune=True`)
+- "recycle": the cards stay, but the browser is replaced once past `--max-memory` MiB (`max_memory_mb`)
+
+Reports the time to scrap the first and the last batch of jobs, and the browser's peak memory
+
+    python -m benchmarks.bench_deep_crawl --cards 1000 --dom-latency 0.00002
+"""
+import argparse
+import time
+from unittest.mock import patch
+
+from jobsscraper.linkedin import scraper
+from .fakes import FakeDriver
+
+
+def run(args: argparse.Namespace, mode: str) -> tuple[int, float, float, float, int]:
+    browsers: list[FakeDriver] = []
+
+    def create_browser(*_, **__) -> FakeDriver:
+        browsers.append(FakeDriver(
+            args.cards, latency=args.driver_latency, load_latency=args.load_latency, dom_latency=args.dom_latency))
+        return browsers[-1]
+
+    peak_memory = 0
+    batch_times = []
+    with patch("selenium.webdriver.Chrome", side_effect=create_browser), \
+            patch("jobsscraper.linkedin.drivers.driver_memory", side_effect=FakeDriver.memory):
+        all_jobs_scraper = scraper.AllJobsScraper(
+            "Munich", prune=mode == "prune", max_memory_mb=args.max_memory if mode == "recycle" else None)
+        nb_jobs = 0
+        start = time.perf_counter()
+        for _ in all_jobs_scraper.scrap_jobs(keywords="Python"):
+            nb_jobs += 1
+            peak_memory = max(peak_memory, browsers[-1].memory())
+            if nb_jobs % args.batch == 0:
+                now = time.perf_counter()
+                batch_times.append(now - start)
+                start = now
+        all_jobs_scraper.close()
+    return nb_jobs, batch_times[0], batch_times[-1], peak_memory / 1024 ** 2, len(browsers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=1000, help="number of jobs in the search results")
+    parser.add_argument("--batch", type=int, default=100, help="number of jobs per timed batch")
+    parser.add_argument("--driver-latency", type=float, default=0.001,
+                        help="latency of each WebDriver call, in seconds")
+    parser.add_argument("--dom-latency", type=float, default=0.00002,
+                        help="latency added to each WebDriver call per card on the page, in seconds")
+    parser.add_argument("--load-latency", type=float, default=0.01, help="how long new jobs take to load, in seconds")
+    parser.add_argument("--max-memory", type=int, default=120, help="recycle: the browser's memory limit, in MiB")
+    args = parser.parse_args()
+
+    for mode in ("keep", "prune", "recycle"):
+        nb_jobs, first, last, memory, nb_browsers = run(args, mode)
+        print(f"{mode:>7}: {nb_jobs} jobs, first {args.batch} in {first:.2f}s, last {args.batch} in {last:.2f}s, "
+              f"peak browser memory {memory:.0f} MiB, {nb_browsers} browser(s)")
+
+
+if __name__ == "__main__":
+    main()
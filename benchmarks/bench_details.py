@@ -0,0 +1,54 @@
+"""
+Compare the throughput of the job details scraping, when the pages are parsed
+on the event loop, and when they are parsed on a pool of processes
+
+The pages are served by a local stub server adding latency to every response
+
+    python -m benchmarks.bench_details --jobs 1000 --concurrency 32 --parse-workers 4
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from jobsscraper import linkedin
+from .bench_pipeline import stub_details_server
+
+
+async def run(args: argparse.Namespace, parse_workers: int) -> tuple[int, float]:
+    async with stub_details_server(args.details_latency) as server:
+        jobs = [
+            linkedin.LinkedInJob(
+                url=str(server.make_url(f"/jobs/view/{i}")),
+                title="Python Developer",
+                company=linkedin.Company(name="Company"),
+                location=linkedin.Location(full_location="Munich"),
+            )
+            for i in range(args.jobs)
+        ]
+        details = linkedin.scrap_jobs_details(
+            jobs, concurrency=args.concurrency, rqs=args.rqs, parse_workers=parse_workers)
+        start = time.perf_counter()
+        nb_jobs = 0
+        async for _ in details:
+            nb_jobs += 1
+        return nb_jobs, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1000, help="number of jobs")
+    parser.add_argument("--details-latency", type=float, default=0.01,
+                        help="how long a job's details take to be served, in seconds")
+    parser.add_argument("--concurrency", type=int, default=32, help="details scrapped at the same time")
+    parser.add_argument("--rqs", type=float, default=10000, help="details requests per second")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count(), help="parsing processes")
+    args = parser.parse_args()
+
+    for parse_workers in (0, args.parse_workers):
+        nb_jobs, elapsed = asyncio.run(run(args, parse_workers))
+        print(f"{parse_workers:>2} parse workers: {nb_jobs} jobs, {elapsed:.2f}s, {nb_jobs / elapsed:.1f} jobs/s")
+
+
+if __name__ == "__main__":
+    main()
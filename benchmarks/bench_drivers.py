@@ -0,0 +1,128 @@
+"""
+Measure the time to the first job and the peak memory of the browser when scraping
+a local copy of the search page, with:
+- "cold": a new browser started for every search
+- "pool": a warm browser borrowed from a `DriverPool`
+- "pool, lean": a warm lean browser, not downloading images, fonts and media
+
+This benchmark needs Chrome, and psutil to measure the memory.
+
+    python -m benchmarks.bench_drivers --searches 5 --cards 100
+"""
+import argparse
+import functools
+import statistics
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from jobsscraper import linkedin
+from jobsscraper.linkedin import drivers, scraper
+from .fakes import fake_card, render_card
+
+
+def search_page(nb_cards: int) -> bytes:
+    """The search page, every job showing its company's logo"""
+    cards = "".join(
+        render_card(fake_card(i)).replace("</li>", f'<img src="/logo-{i}.png" width="100" height="100"></li>')
+        for i in range(nb_cards)
+    )
+    return f"""<html><head><style>
+        @font-face {{ font-family: "Sans"; src: url("/font.woff2"); }}
+        body {{ font-family: "Sans"; }}
+    </style></head><body>
+        <ul class="{scraper.jobs_results_class_name}">{cards}</ul>
+    </body></html>""".encode()
+
+
+class Handler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, page: bytes, **kwargs):
+        self._page = page
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        # the images and fonts are 200kB each
+        body = self._page if self.path.startswith("/jobs") else b"\0" * 200_000
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+class MemorySampler(threading.Thread):
+    """Sample the memory of the browsers in use, and remember the peak"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.drivers: list = []
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def run(self):
+        while not self._stop.wait(0.05):
+            for driver in list(self.drivers):
+                self.peak = max(self.peak, drivers.driver_memory(driver) or 0)
+
+    def stop(self):
+        self._stop.set()
+        self.join()
+
+
+def measure(name: str, nb_searches: int, **kwargs) -> None:
+    sampler = MemorySampler()
+    sampler.start()
+    create_driver = drivers.create_driver
+
+    def sampled_create_driver(**driver_kwargs):
+        driver = create_driver(**driver_kwargs)
+        sampler.drivers.append(driver)
+        return driver
+
+    firsts: list[float] = []
+    with patch.object(drivers, "create_driver", sampled_create_driver):
+        pool = kwargs.get("driver_pool")
+        if pool is not None:
+            pool.start()
+            time.sleep(5)  # the pool warms up in background, while the service does something else
+        for _ in range(nb_searches):
+            start = time.perf_counter()
+            jobs = linkedin.scrap_all_jobs("Munich", **kwargs)
+            next(jobs)
+            firsts.append(time.perf_counter() - start)
+            for _ in jobs:
+                pass
+        if pool is not None:
+            pool.close()
+    sampler.stop()
+    if pool is None:
+        for driver in sampler.drivers:
+            driver.quit()
+    print(
+        f"{name:>12}: time to first job {statistics.median(firsts):.2f}s (median), "
+        f"peak memory {sampler.peak / 1024 ** 2:.0f}MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=5, help="number of searches")
+    parser.add_argument("--cards", type=int, default=100, help="number of jobs in the search page")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, page=search_page(args.cards)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/jobs/search"
+
+    with patch.object(scraper, "linkedin_search_url", url):
+        measure("cold", args.searches)
+        measure("pool", args.searches, driver_pool=drivers.DriverPool(lean=False))
+        measure("pool, lean", args.searches, driver_pool=drivers.DriverPool(lean=True))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
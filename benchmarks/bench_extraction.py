@@ -0,0 +1,50 @@
+"""
+Compare the extractions of the search page's jobs:
+- "webdriver": every job's fields queried one by one through the WebDriver
+- "batch": all new jobs extracted from the page with a single javascript call per load
+- "capture": the html fragments fetched by the page parsed from the network traffic,
+  the page being only queried for the jobs loaded with it
+
+The fake browser adds `--latency` to every call, and `--item-latency` per job extracted from the page
+
+    python -m benchmarks.bench_extraction --cards 1000 --latency 0.002 --item-latency 0.0002
+"""
+import argparse
+import time
+from unittest.mock import patch
+
+from jobsscraper.linkedin import scraper
+from .fakes import FakeDriver
+
+
+def run(args: argparse.Namespace, mode: str) -> dict[str, float]:
+    driver = FakeDriver(
+        args.cards, latency=args.latency, item_latency=args.item_latency, load_latency=args.load_latency)
+    with patch("selenium.webdriver.Chrome", return_value=driver):
+        all_jobs_scraper = scraper.AllJobsScraper(
+            "Munich", batch_extraction=mode != "webdriver", capture=mode == "capture")
+    start = time.perf_counter()
+    nb_jobs = sum(1 for _ in all_jobs_scraper.scrap_jobs(keywords="Python"))
+    elapsed = time.perf_counter() - start
+    return {"jobs": nb_jobs, "round_trips": driver.calls, "seconds": elapsed, "jobs_per_second": nb_jobs / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=1000, help="number of jobs in the search results")
+    parser.add_argument("--latency", type=float, default=0.002, help="latency of each WebDriver call, in seconds")
+    parser.add_argument("--item-latency", type=float, default=0.00005,
+                        help="latency added per job extracted from the page, in seconds")
+    parser.add_argument("--load-latency", type=float, default=0.3, help="how long new jobs take to load, in seconds")
+    args = parser.parse_args()
+
+    for name in ("webdriver", "batch", "capture"):
+        res = run(args, name)
+        print(
+            f"{name:>10}: {res['jobs']} jobs, {res['round_trips']} round trips, "
+            f"{res['seconds']:.2f}s, {res['jobs_per_second']:.1f} jobs/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
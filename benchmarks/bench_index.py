@@ -0,0 +1,108 @@
+"""
+Compare how fast the jobs already scrapped are searched:
+- "scan": going through all the jobs, looking for the words in their title and description, and their criteria
+- "index": with `JobIndex`, once the jobs are indexed
+
+Also, how fast the jobs are indexed, and the index snapshot saved and loaded again.
+The jobs have a description of `--words` words, drawn from a skewed vocabulary
+
+    python -m benchmarks.bench_index --jobs 100000 --words 150
+"""
+import argparse
+import itertools
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+from jobsscraper.linkedin import models
+from jobsscraper.linkedin.index import JobIndex
+from jobsscraper.linkedin.scraper import job_from_card
+from .fakes import fake_card
+
+skills = ["python", "django", "flask", "java", "kotlin", "golang", "rust", "sql", "postgresql", "spark", "kubernetes"]
+seniority_levels = ["Entry level", "Associate", "Mid-Senior level", "Director"]
+employment_types = ["Full-time", "Part-time", "Contract", "Internship"]
+
+
+def jobs(nb_jobs: int, nb_words: int) -> Iterator[models.LinkedInJob]:
+    rnd = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(20000)] + skills
+    # a few words in most descriptions, most words in a few of them
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    rnd.shuffle(weights)
+    cum_weights = list(itertools.accumulate(weights))
+    for i in range(nb_jobs):
+        job = job_from_card(fake_card(i))
+        job.title = f"{rnd.choice(['Senior ', 'Junior ', ''])}{rnd.choice(skills).title()} Developer"
+        job.description = " ".join(rnd.choices(vocabulary, cum_weights=cum_weights, k=nb_words))
+        job.company.name = f"Company {rnd.randrange(5000)}"
+        job.criteria = {"Seniority level": rnd.choice(seniority_levels), "Employment type": rnd.choice(employment_types)}
+        yield job
+
+
+# the same searches, with the index and by scanning the jobs. No word of the vocabulary contains another one
+queries: dict[str, tuple[dict, Callable[[models.LinkedInJob, str], bool]]] = {
+    "python": (
+        {"query": "python"},
+        lambda job, text: "python" in text,
+    ),
+    "python django|flask -senior": (
+        {"query": "python django|flask -senior"},
+        lambda job, text: "python" in text and ("django" in text or "flask" in text) and "senior" not in text,
+    ),
+    "kube* full-time": (
+        {"query": "kube*", "criteria": {"Employment type": "Full-time"}},
+        lambda job, text: "kube" in text and job.criteria.get("Employment type") == "Full-time",
+    ),
+    "company director": (
+        {"company": "Company 42", "criteria": {"Seniority level": "Director"}},
+        lambda job, text: job.company.name == "Company 42" and job.criteria.get("Seniority level") == "Director",
+    ),
+}
+
+
+def scan(all_jobs: list[models.LinkedInJob], matches: Callable[[models.LinkedInJob, str], bool]) -> int:
+    return sum(1 for job in all_jobs if matches(job, f"{job.title} {job.description}".casefold()))
+
+
+def timed(f: Callable[[], object], repeat: int) -> tuple[float, object]:
+    """The median time of the calls, in ms, and the result of the last one"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = f()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100000, help="number of jobs searched")
+    parser.add_argument("--words", type=int, default=150, help="number of words per job description")
+    parser.add_argument("--repeat", type=int, default=20, help="number of times every indexed search is run")
+    args = parser.parse_args()
+
+    all_jobs = list(jobs(args.jobs, args.words))
+    index = JobIndex()
+    start = time.perf_counter()
+    index.add_all(all_jobs)
+    print(f"    index: {args.jobs / (time.perf_counter() - start):.0f} jobs/s")
+
+    for name, (kwargs, matches) in queries.items():
+        scan_ms, nb_scanned = timed(lambda: scan(all_jobs, matches), 3)
+        index_ms, found = timed(lambda: index.search(**kwargs), args.repeat)
+        assert len(found) == nb_scanned
+        print(f"{name:>30}: {len(found)} jobs, scan {scan_ms:.1f}ms, index {index_ms:.2f}ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "jobs.index"
+        save_ms, _ = timed(lambda: index.save(path), 1)
+        load_ms, _ = timed(lambda: JobIndex.load(path), 1)
+        print(f" snapshot: {path.stat().st_size / 1024 ** 2:.1f} MiB, save {save_ms:.0f}ms, load {load_ms:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
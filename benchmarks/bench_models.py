@@ -0,0 +1,45 @@
+"""
+Compare how fast the jobs are built out of the extracted cards, and how much memory they take:
+- "models": the pydantic models, `LinkedInJob`
+- "records": the lightweight `JobRecord` (`job_from_card(card, record=True)`)
+
+    python -m benchmarks.bench_models --jobs 100000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from jobsscraper.linkedin.scraper import job_from_card
+from .fakes import fake_card
+
+
+def run(cards: list[dict], record: bool) -> tuple[float, float]:
+    gc.collect()
+    start = time.perf_counter()
+    for card in cards:
+        job_from_card(card, record=record)
+    jobs_per_second = len(cards) / (time.perf_counter() - start)
+
+    # the memory taken by the jobs kept alive
+    tracemalloc.start()
+    jobs = [job_from_card(card, record=record) for card in cards]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del jobs
+    return jobs_per_second, memory / len(cards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100000, help="number of jobs built")
+    args = parser.parse_args()
+
+    cards = [fake_card(i) for i in range(args.jobs)]
+    for name, record in (("models", False), ("records", True)):
+        jobs_per_second, bytes_per_job = run(cards, record)
+        print(f"{name:>7}: {jobs_per_second:.0f} jobs/s, {bytes_per_job:.0f} bytes/job")
+
+
+if __name__ == "__main__":
+    main()
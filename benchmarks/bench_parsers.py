@@ -0,0 +1,47 @@
+"""
+Compare the job page parsers:
+- "bs4": builds the whole BeautifulSoup tree of the page
+- "lxml": queries only the needed elements, with precompiled XPath on the lxml tree
+
+The throughput is measured in pages parsed per second, and the memory as the peak
+of the python allocations while parsing a page (tracemalloc doesn't see the memory
+allocated by libxml2 itself, freed as soon as the lxml tree is)
+
+    python -m benchmarks.bench_parsers --pages 500
+"""
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from jobsscraper.linkedin import parsers
+
+job_html = (Path(__file__).parent.parent / "tests" / "linkedin" / "job.html.test").read_text()
+
+
+def run(parse: Callable[[str], tuple], nb_pages: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(nb_pages):
+        parse(job_html)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    parse(job_html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return nb_pages / elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500, help="number of pages parsed")
+    args = parser.parse_args()
+
+    for name, parse in (("bs4", parsers.parse_job_page_soup), ("lxml", parsers.parse_job_page)):
+        pages_per_second, peak = run(parse, args.pages)
+        print(f"{name:>5}: {pages_per_second:.0f} pages/s, {peak / 1024:.0f} KiB/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare the total time to find all jobs and scrap their details:
+- "two phases": all jobs are found, then their details are scrapped
+- "pipeline": the details are scrapped as soon as the jobs are found (`scrap_all_jobs_details`)
+
+The search runs against a fake browser, and the details are served
+by a local stub server adding latency to every response
+
+    python -m benchmarks.bench_pipeline --cards 200 --load-latency 0.3 --details-latency 0.05
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from jobsscraper import linkedin
+from .fakes import FakeDriver
+
+job_html = (Path(__file__).parent.parent / "tests" / "linkedin" / "job.html.test").read_text()
+
+
+def stub_details_server(latency: float, *, throttle_every: int = 0, retry_after: float = 0.) -> TestServer:
+    """
+    Serve the job page after `latency` seconds
+    :param throttle_every: answer every n-th request with a 429 instead. 0 to never answer with a 429
+    :param retry_after: the Retry-After of the 429 answers, in seconds
+    """
+    nb_requests = 0
+
+    async def job(_: web.Request) -> web.Response:
+        nonlocal nb_requests
+        nb_requests += 1
+        await asyncio.sleep(latency)
+        if throttle_every and nb_requests % throttle_every == 0:
+            return web.Response(status=429, headers={"Retry-After": str(retry_after)})
+        return web.Response(text=job_html, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/jobs/view/{id}", job)
+    return TestServer(app)
+
+
+def fake_driver(server: TestServer, nb_cards: int, load_latency: float) -> FakeDriver:
+    driver = FakeDriver(nb_cards, load_latency=load_latency)
+    for i, card in enumerate(driver.cards):
+        card["url"] = str(server.make_url(f"/jobs/view/{i}"))
+    return driver
+
+
+async def run(args: argparse.Namespace, pipeline: bool) -> tuple[int, float]:
+    async with stub_details_server(args.details_latency) as server:
+        driver = fake_driver(server, args.cards, args.load_latency)
+        with patch("selenium.webdriver.Chrome", return_value=driver):
+            start = time.perf_counter()
+            if pipeline:
+                jobs = linkedin.scrap_all_jobs_details(
+                    "Munich", keyword="Python", concurrency=args.concurrency, rqs=args.rqs)
+            else:
+                found = list(linkedin.scrap_all_jobs("Munich", keyword="Python"))
+                jobs = linkedin.scrap_jobs_details(found, concurrency=args.concurrency, rqs=args.rqs)
+            nb_jobs = 0
+            async for _ in jobs:
+                nb_jobs += 1
+            return nb_jobs, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=200, help="number of jobs in the search results")
+    parser.add_argument("--load-latency", type=float, default=0.3, help="how long new jobs take to load, in seconds")
+    parser.add_argument("--details-latency", type=float, default=0.05,
+                        help="how long a job's details take to be served, in seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="details scrapped at the same time")
+    parser.add_argument("--rqs", type=float, default=100, help="details requests per second")
+    args = parser.parse_args()
+
+    for name, pipeline in (("two phases", False), ("pipeline", True)):
+        nb_jobs, elapsed = asyncio.run(run(args, pipeline))
+        print(f"{name:>10}: {nb_jobs} jobs, {elapsed:.2f}s, {nb_jobs / elapsed:.1f} jobs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare how completely, and with how many requests, a search finding more jobs than LinkedIn lists is scraped:
+- "single": the search as is, truncated by LinkedIn after `--cap` jobs
+- "by hand": a search per sub-location, workplace and job type, decided beforehand
+- "planner": the searches planned by `SearchPlanner`, splitting only the capped ones
+
+The searches run against a local stub of the guest search, serving a skewed population of jobs:
+most of them in Bavaria, on-site, full-time and mid-senior level
+
+    python -m benchmarks.bench_planner --jobs 6000 --cap 1000
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from jobsscraper.linkedin import guest, models, planner
+from .fakes import fake_card, render_card
+
+sub_locations = {"Germany": ["Bavaria", "Berlin", "Hamburg", "Hesse"]}
+
+
+def population(nb_jobs: int) -> list[dict[str, str]]:
+    rnd = random.Random(0)
+    return [{
+        "id": str(i),
+        "location": rnd.choices(sub_locations["Germany"], weights=[50, 25, 13, 12])[0],
+        "f_WT": rnd.choices(planner.default_facets["f_WT"], weights=[60, 20, 20])[0],
+        "f_JT": rnd.choices(planner.default_facets["f_JT"], weights=[80, 10, 5, 2, 1, 1, 1])[0],
+    } for i in range(nb_jobs)]
+
+
+def stub_search_server(jobs: list[dict[str, str]], cap: int, latency: float) -> TestServer:
+    pages = [render_card(fake_card(i)) for i in range(len(jobs))]
+
+    async def search(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        server.nb_requests += 1
+        filters = {k: v for k, v in request.query.items() if k in planner.default_facets}
+        found = [
+            i for i, job in enumerate(jobs)
+            if request.query["location"] in ("Germany", job["location"])
+            and all(job[name] == value for name, value in filters.items())
+        ][:cap]
+        start = int(request.query["start"])
+        return web.Response(text="".join(pages[i] for i in found[start:start + 10]), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/search", search)
+    server = TestServer(app)
+    server.nb_requests = 0
+    return server
+
+
+async def run(args: argparse.Namespace, strategy: str) -> tuple[int, int, int, float]:
+    jobs = population(args.jobs)
+    async with stub_search_server(jobs, args.cap, args.latency) as server:
+        search_url = str(server.make_url("/search"))
+        search = models.Search(location="Germany", keyword="Python")
+        start = time.perf_counter()
+        if strategy == "single":
+            searches = [search]
+        elif strategy == "by hand":
+            searches = [
+                models.Search(location=location, keyword="Python", filters={"f_WT": workplace, "f_JT": job_type})
+                for location, workplace, job_type in itertools.product(
+                    sub_locations["Germany"], planner.default_facets["f_WT"], planner.default_facets["f_JT"])
+            ]
+        else:
+            search_planner = planner.SearchPlanner(sub_locations=sub_locations, cap=args.cap, search_url=search_url)
+            searches = await search_planner.plan(search)
+
+        urls = set()
+        for s in searches:
+            scraper = guest.GuestJobsScraper(s.location, search_url=search_url, concurrency=args.concurrency)
+            urls |= {job.url async for job in scraper.scrap_jobs(keywords=s.keyword, until=s.until, filters=s.filters)}
+        return len(urls), len(searches), server.nb_requests, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=6000, help="number of jobs found by the search")
+    parser.add_argument("--cap", type=int, default=1000, help="how many jobs are listed per search at most")
+    parser.add_argument("--latency", type=float, default=0.005, help="how long a fragment takes to be served")
+    parser.add_argument("--concurrency", type=int, default=4, help="fragments requested at the same time")
+    args = parser.parse_args()
+
+    for strategy in ("single", "by hand", "planner"):
+        nb_jobs, nb_searches, nb_requests, elapsed = asyncio.run(run(args, strategy))
+        print(f"{strategy:>8}: {nb_jobs}/{args.jobs} jobs, {nb_searches} searches, "
+              f"{nb_requests} requests, {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare how fast the sinks write the jobs, and the memory they take while writing them:
+- "ndjson", "ndjson.gz": `NdjsonSink`
+- "sqlite": `SqliteSink`, then again upserting the same jobs
+- "parquet": `ParquetSink`, if pyarrow is installed
+- "dump": the jobs accumulated in a list, then dumped at once in a json file
+
+    python -m benchmarks.bench_sinks --jobs 100000 --batch-size 1000
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+from jobsscraper.linkedin import models
+from jobsscraper.linkedin.scraper import job_from_card
+from jobsscraper.linkedin.sinks import JobsSink, NdjsonSink, ParquetSink, SqliteSink, pyarrow
+from .fakes import fake_card
+
+
+def jobs(nb_jobs: int) -> Iterator[models.LinkedInJob]:
+    for i in range(nb_jobs):
+        job = job_from_card(fake_card(i))
+        job.description = f"Description of the job {i}. " * 20
+        job.criteria = {"Seniority level": "Entry level", "Employment type": "Full-time"}
+        yield job
+
+
+def dump(path: str, nb_jobs: int) -> int:
+    all_jobs = list(jobs(nb_jobs))
+    with open(path, "w") as f:
+        json.dump([job.model_dump(mode="json") for job in all_jobs], f)
+    return len(all_jobs)
+
+
+def run(write: Callable[[], int]) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    nb_rows = write()
+    rows_per_second = nb_rows / (time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows_per_second, peak
+
+
+def write_all(sink: Callable[[], JobsSink], nb_jobs: int) -> Callable[[], int]:
+    def write() -> int:
+        with sink() as s:
+            return s.write_all(jobs(nb_jobs))
+    return write
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100000, help="number of jobs written")
+    parser.add_argument("--batch-size", type=int, default=1000, help="number of jobs written at once")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        writes = {
+            "ndjson": write_all(lambda: NdjsonSink(f"{directory}/jobs.ndjson", batch_size=args.batch_size), args.jobs),
+            "ndjson.gz": write_all(
+                lambda: NdjsonSink(f"{directory}/jobs.ndjson.gz", batch_size=args.batch_size), args.jobs),
+            "sqlite": write_all(lambda: SqliteSink(f"{directory}/jobs.sqlite", batch_size=args.batch_size), args.jobs),
+            "upsert": write_all(lambda: SqliteSink(f"{directory}/jobs.sqlite", batch_size=args.batch_size), args.jobs),
+        }
+        if pyarrow is not None:
+            writes["parquet"] = write_all(
+                lambda: ParquetSink(f"{directory}/jobs.parquet", batch_size=args.batch_size), args.jobs)
+        writes["dump"] = lambda: dump(f"{directory}/jobs.json", args.jobs)
+
+        for name, write in writes.items():
+            rows_per_second, peak = run(write)
+            print(f"{name:>9}: {rows_per_second:.0f} rows/s, peak memory {peak / 1024 ** 2:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Measure how many jobs per second the search scraper extracts from a page
+showing new jobs `--load-latency` seconds after they are requested.
+
+    python -m benchmarks.bench_waiting --cards 500 --load-latency 0.3
+"""
+import argparse
+import time
+from unittest.mock import patch
+
+from jobsscraper.linkedin import scraper
+from .fakes import FakeDriver
+
+
+def run(nb_cards: int, latency: float, load_latency: float) -> dict[str, float]:
+    driver = FakeDriver(nb_cards, latency=latency, load_latency=load_latency)
+    with patch("selenium.webdriver.Chrome", return_value=driver):
+        all_jobs_scraper = scraper.AllJobsScraper("Munich")
+    start = time.perf_counter()
+    nb_jobs = sum(1 for _ in all_jobs_scraper.scrap_jobs(keywords="Python"))
+    elapsed = time.perf_counter() - start
+    return {"jobs": nb_jobs, "seconds": elapsed, "jobs_per_second": nb_jobs / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=500, help="number of jobs in the search results")
+    parser.add_argument("--latency", type=float, default=0.002, help="latency of each WebDriver call, in seconds")
+    parser.add_argument("--load-latency", type=float, default=0.3, help="how long new jobs take to load, in seconds")
+    args = parser.parse_args()
+
+    res = run(args.cards, args.latency, args.load_latency)
+    print(f"{res['jobs']} jobs, {res['seconds']:.2f}s, {res['jobs_per_second']:.1f} jobs/s")
+
+
+if __name__ == "__main__":
+    main()
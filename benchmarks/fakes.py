@@ -0,0 +1,306 @@
+"""
+Fake browser used to benchmark the search scraper offline.
+
+Every call made through the fake WebDriver, or through one of its elements,
+sleeps `latency` seconds to simulate the HTTP round trip to chromedriver,
+plus `item_latency` seconds for every element or card it returns.
+Newly requested jobs are shown `load_latency` seconds after the request.
+They are fetched as html fragments, found in the performance log (see `AllJobsScraper`'s capture)
+"""
+import json
+import time
+from typing import Any
+
+from selenium.common import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+from jobsscraper.linkedin import scraper
+
+
+def fake_card(i: int) -> dict[str, str | None]:
+    return {
+        "url": f"https://de.linkedin.com/jobs/view/python-developer-at-company-{i}?trk=public_jobs",
+        "title": f"Python Developer {i}",
+        "company_name": f"Company {i}",
+        "company_url": f"https://de.linkedin.com/company/company-{i}",
+        "logo": f"https://media.licdn.com/logo-{i}.png" if i % 3 else None,
+        "benefit": "Actively Hiring" if i % 4 == 0 else None,
+        "location": "Munich, Bavaria, Germany",
+        "posted_time": "2024-03-01",
+    }
+
+
+def render_card(card: dict[str, str | None]) -> str:
+    """Render the card as a job card of the search results' html fragments"""
+    logo = f'<div class="{scraper.logo_class_name}"><a data-ghost-url="{card["logo"]}"></a></div>' \
+        if card["logo"] is not None else ""
+    benefit = f'<span class="{scraper.benefits_class_name}">{card["benefit"]}</span>' \
+        if card["benefit"] is not None else ""
+    return f"""<li><div class="base-card">
+        <a class="base-card__full-link" href="{card["url"]}"><span class="sr-only">{card["title"]}</span></a>
+        {logo}
+        <div class="base-search-card__info">
+            <h3 class="base-search-card__title">{card["title"]}</h3>
+            <h4 class="base-search-card__subtitle"><a href="{card["company_url"]}">{card["company_name"]}</a></h4>
+            <div class="base-search-card__metadata">
+                <span class="{scraper.location_class_name}">{card["location"]}</span>
+                {benefit}
+                <time class="{scraper.posted_time_class_name}" datetime="{card["posted_time"]}">1 day ago</time>
+            </div>
+        </div>
+    </div></li>"""
+
+
+class FakeDriver:
+    """
+    Simulate the LinkedIn search page: `batch_size` cards are loaded each time
+    the "More jobs" button is clicked, until `nb_cards` cards are shown
+
+    The page gets slower and bigger with the cards it holds: every round trip takes `dom_latency`
+    more per card not emptied, and every such card takes `card_memory` bytes
+    """
+
+    def __init__(
+            self,
+            nb_cards: int,
+            *,
+            batch_size: int = 25,
+            latency: float = 0.001,
+            item_latency: float = 0.00005,
+            load_latency: float = 0.3,
+            dom_latency: float = 0.,
+            card_memory: int = 50 * 1024,
+    ):
+        self.cards = [fake_card(i) for i in range(nb_cards)]
+        self.batch_size = batch_size
+        self.latency = latency
+        self.item_latency = item_latency
+        self.load_latency = load_latency
+        self.dom_latency = dom_latency
+        self.card_memory = card_memory
+        self.nb_loaded = 0
+        # when the jobs requested last will be shown
+        self.loaded_at = 0.
+        # indexes of the cards marked as seen on the page side
+        self.seen: set[int] = set()
+        # indexes of the cards emptied
+        self.pruned: set[int] = set()
+        # urls of the jobs seen by a previous browser, see `scraper.seed_seen_keys_script`
+        self.seen_keys: set[str] = set()
+        # urls of the jobs captured from the network traffic, see `scraper.mark_captured_jobs_script`
+        self.captured: set[str] = set()
+        # how many cards were loaded by the fragments already in the performance log
+        self.nb_logged = 0
+        # number of round trips to the browser
+        self.calls = 0
+        self.quitted = False
+
+    def call(self, nb_items: int = 0):
+        self.calls += 1
+        time.sleep(self.latency + nb_items * self.item_latency + self.live_cards() * self.dom_latency)
+
+    def live_cards(self) -> int:
+        """How many cards shown are not emptied"""
+        return min(self.shown(), len(self.cards)) - len(self.pruned)
+
+    def memory(self) -> int:
+        """The browser's memory, in bytes"""
+        return 100 * 1024 ** 2 + self.live_cards() * self.card_memory
+
+    def shown(self) -> int:
+        """How many jobs are shown on the page"""
+        if time.perf_counter() < self.loaded_at:
+            return self.nb_loaded - self.batch_size
+        return self.nb_loaded
+
+    def new_cards(self) -> list[int]:
+        return [i for i in range(min(self.shown(), len(self.cards))) if i not in self.seen]
+
+    def get(self, _: str):
+        self.call()
+        # loaded with the page, not fetched
+        self.nb_loaded = self.nb_logged = self.batch_size
+
+    def load_more(self):
+        if time.perf_counter() < self.loaded_at:
+            return  # still loading
+        self.nb_loaded += self.batch_size
+        self.loaded_at = time.perf_counter() + self.load_latency
+
+    def set_script_timeout(self, _: float):
+        self.call()
+
+    def find_element(self, _: By, value: Any) -> "FakeElement":
+        self.call()
+        if value == scraper.more_button_class_name:
+            if self.shown() >= len(self.cards):
+                raise NoSuchElementException("")
+            return FakeElement(self, click=self.load_more)
+        if value == scraper.jobs_results_class_name:
+            return FakeJobsList(self)
+        raise NoSuchElementException("")
+
+    def execute_script(self, script: str, *args: Any) -> Any:
+        if script == scraper.extract_jobs_script:
+            new_cards = self.new_cards()
+            self.call(len(new_cards))
+            self.seen.update(new_cards)
+            if args[0].get("prune"):
+                self.pruned.update(new_cards)
+            return [dict(self.cards[i]) for i in new_cards]
+        if script == scraper.mark_jobs_script:
+            self.call(len(args[1]))
+            self.seen.update(card.index for card in args[1])
+            return [True] * len(args[1])
+        if script == scraper.prune_jobs_script:
+            self.call(len(args[0]))
+            self.pruned.update(card.index for card in args[0])
+            return None
+        if script == scraper.seen_keys_script:
+            self.call(len(self.seen))
+            return [self.cards[i]["url"] for i in self.seen] + list(self.seen_keys)
+        if script == scraper.seed_seen_keys_script:
+            self.call(len(args[0]))
+            self.seen_keys = set(args[0])
+            return None
+        if script == scraper.mark_captured_jobs_script:
+            scraped = {self.cards[i]["url"].split("?")[0] for i in self.seen} | self.seen_keys
+            is_new = []
+            for url in args[1]:
+                is_new.append(url not in self.captured and url not in scraped)
+                self.captured.add(url)
+            new_cards = self.new_cards()
+            shown = [i for i in new_cards if self.cards[i]["url"].split("?")[0] in self.captured]
+            # the captured cards are only matched by url: 2 of the 8 queries made by the extraction
+            self.call(len(shown) // 4)
+            self.seen.update(shown)
+            if args[0].get("prune"):
+                self.pruned.update(shown)
+            return {"new": is_new, "left": len(new_cards) - len(shown)}
+        if script == scraper.skip_known_jobs_script:
+            known = [i for i in self.new_cards() if self.cards[i]["url"] in self.seen_keys]
+            self.call(len(known))
+            self.seen.update(known)
+            self.pruned.update(known)
+            return len(self.new_cards())
+        self.call()
+        return None
+
+    def quit(self):
+        self.quitted = True
+
+    def get_log(self, _: str) -> list[dict[str, str]]:
+        """The responses of the fragments loaded since the last call"""
+        self.call()
+        entries = []
+        for start in range(self.nb_logged, min(self.shown(), len(self.cards)), self.batch_size):
+            url = f"https://www.linkedin.com{scraper.captured_fragments_path}search?start={start}"
+            for method, params in (
+                    ("Network.responseReceived", {"requestId": str(start), "response": {"url": url, "status": 200}}),
+                    ("Network.loadingFinished", {"requestId": str(start)}),
+            ):
+                entries.append({"message": json.dumps({"message": {"method": method, "params": params}})})
+            self.nb_logged = min(start + self.batch_size, len(self.cards))
+        return entries
+
+    def execute_cdp_cmd(self, command: str, params: dict[str, Any]) -> dict[str, Any]:
+        self.call()
+        if command != "Network.getResponseBody":
+            return {}
+        start = int(params["requestId"])
+        html = "".join(render_card(card) for card in self.cards[start:start + self.batch_size])
+        return {"body": html, "base64Encoded": False}
+
+    def execute_async_script(self, script: str, *args: Any) -> Any:
+        """Simulate the scripts waiting for new jobs to be shown"""
+        deadline = time.perf_counter() + args[1] / 1000
+        if len(self.new_cards()) == 0 and self.shown() < self.nb_loaded:
+            time.sleep(max(min(self.loaded_at, deadline) - time.perf_counter(), 0))
+        else:
+            time.sleep(max(deadline - time.perf_counter(), 0) if len(self.new_cards()) == 0 else 0)
+        self.call()
+        return len(self.new_cards()) > 0
+
+    def save_screenshot(self, _: str):
+        pass
+
+
+class FakeElement:
+    def __init__(
+            self,
+            driver: FakeDriver,
+            *,
+            text: str = "",
+            attributes: dict[str, str | None] | None = None,
+            click=None,
+    ):
+        self._driver = driver
+        self._text = text
+        self._attributes = attributes or {}
+        self._click = click
+
+    @property
+    def text(self) -> str:
+        self._driver.call()
+        return self._text
+
+    def get_attribute(self, name: str) -> str | None:
+        self._driver.call()
+        return self._attributes.get(name)
+
+    def click(self):
+        self._driver.call()
+        self._click()
+
+
+
+class FakeJobsList(FakeElement):
+    """The jobs list, only returning the cards that have not been seen yet"""
+
+    def find_elements(self, _: By, __: Any) -> list["FakeCard"]:
+        new_cards = self._driver.new_cards()
+        self._driver.call(len(new_cards))
+        return [FakeCard(self._driver, i) for i in new_cards]
+
+
+class FakeCard(FakeElement):
+    """A job card, answering the queries made by the WebDriver extraction"""
+
+    def __init__(self, driver: FakeDriver, index: int):
+        super().__init__(driver)
+        self.index = index
+        self._card = driver.cards[index]
+
+    def find_element(self, by: By, value: Any) -> FakeElement:
+        self._driver.call()
+        card = self._card
+        match by, value:
+            case By.TAG_NAME, "a":
+                return FakeElement(self._driver, attributes={"href": card["url"]})
+            case By.TAG_NAME, "h3":
+                return FakeElement(self._driver, text=card["title"])
+            case By.TAG_NAME, "h4":
+                link = FakeElement(self._driver, text=card["company_name"], attributes={"href": card["company_url"]})
+                return FakeContainer(self._driver, link)
+            case By.CLASS_NAME, scraper.logo_class_name if card["logo"] is not None:
+                link = FakeElement(self._driver, attributes={"data-ghost-url": card["logo"]})
+                return FakeContainer(self._driver, link)
+            case By.CLASS_NAME, scraper.benefits_class_name if card["benefit"] is not None:
+                return FakeElement(self._driver, text=card["benefit"])
+            case By.CLASS_NAME, scraper.location_class_name:
+                return FakeElement(self._driver, text=card["location"])
+            case By.CLASS_NAME, scraper.posted_time_class_name:
+                return FakeElement(self._driver, attributes={"datetime": card["posted_time"]})
+        raise NoSuchElementException("")
+
+
+class FakeContainer(FakeElement):
+    """An element whose only child is the given one"""
+
+    def __init__(self, driver: FakeDriver, child: FakeElement):
+        super().__init__(driver)
+        self._child = child
+
+    def find_element(self, _: By, __: Any) -> FakeElement:
+        self._driver.call()
+        return self._child
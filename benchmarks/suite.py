@@ -0,0 +1,218 @@
+"""
+Offline benchmark suite of the search and details scrapers, to catch performance regressions:
+- "search", "search-webdriver": `AllJobsScraper.scrap_jobs` against the fake browser,
+  with the batch and the per-field extractions. The latency is the time between two jobs found
+- "details": `SingleJobScraper.scrap` against a local stub server serving `job.html.test`,
+  answering some requests with a 429. The latency is the time to scrap a job, retries included
+- "ratelimiter": `AdaptiveRateLimiter.acquire`, without any wait. The latency is a call's overhead
+- "parser-lxml", "parser-bs4": `parse_job_page` and `parse_job_page_soup`. The latency is a page's parsing
+
+Every scenario reports jobs/s, p50/p99 latency and peak memory (the python allocations, with tracemalloc,
+measured in a second run not to slow the first one down). The results are saved in
+`benchmarks/results/<commit>.json`, and compared with the ones of another commit with `--compare`:
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --only details parser-lxml --compare benchmarks/results/1a2b3c4.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+from unittest.mock import patch
+
+from jobsscraper import linkedin
+from jobsscraper.linkedin import parsers, ratelimit, scraper
+from .bench_pipeline import job_html, stub_details_server
+from .fakes import FakeDriver
+
+results_dir = Path(__file__).parent / "results"
+
+# metric -> whether higher is better
+metrics = {"jobs_per_second": True, "p50_ms": False, "p99_ms": False, "peak_memory_mib": False}
+
+
+def search(args: argparse.Namespace, *, batch_extraction: bool = True) -> list[float]:
+    driver = FakeDriver(args.cards, latency=args.driver_latency, load_latency=args.load_latency)
+    with patch("selenium.webdriver.Chrome", return_value=driver):
+        all_jobs_scraper = scraper.AllJobsScraper("Munich", batch_extraction=batch_extraction)
+    latencies = []
+    last = time.perf_counter()
+    for _ in all_jobs_scraper.scrap_jobs(keywords="Python"):
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+    return latencies
+
+
+async def details(args: argparse.Namespace) -> list[float]:
+    async with stub_details_server(
+            args.details_latency, throttle_every=args.throttle_every, retry_after=args.retry_after) as server:
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def scrap(i: int):
+            job = linkedin.LinkedInJob(
+                url=str(server.make_url(f"/jobs/view/{i}")),
+                title="Python Developer",
+                company=linkedin.Company(name="Company"),
+                location=linkedin.Location(full_location="Munich"),
+            )
+            async with semaphore:
+                start = time.perf_counter()
+                await single_job_scraper.scrap(job)
+                latencies.append(time.perf_counter() - start)
+
+        async with scraper.SingleJobScraper(
+                rqs=args.rqs, burst=args.concurrency, limit_per_host=args.concurrency) as single_job_scraper:
+            await asyncio.gather(*(scrap(i) for i in range(args.jobs)))
+        return latencies
+
+
+async def rate_limiter(args: argparse.Namespace) -> list[float]:
+    limiter = ratelimit.AdaptiveRateLimiter(1e9, burst=args.calls)
+    latencies = []
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        await limiter.acquire()
+        limiter.on_success()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def parser(args: argparse.Namespace, parse: Callable[[str], tuple]) -> list[float]:
+    latencies = []
+    for _ in range(args.pages):
+        start = time.perf_counter()
+        parse(job_html)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+scenarios: dict[str, Callable[[argparse.Namespace], list[float]]] = {
+    "search": search,
+    "search-webdriver": lambda args: search(args, batch_extraction=False),
+    "details": lambda args: asyncio.run(details(args)),
+    "ratelimiter": lambda args: asyncio.run(rate_limiter(args)),
+    "parser-lxml": lambda args: parser(args, parsers.parse_job_page),
+    "parser-bs4": lambda args: parser(args, parsers.parse_job_page_soup),
+}
+
+
+def measure(scenario: Callable[[argparse.Namespace], list[float]], args: argparse.Namespace) -> dict[str, float]:
+    gc.collect()
+    start = time.perf_counter()
+    latencies = scenario(args)
+    seconds = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    result = {
+        "jobs": len(latencies),
+        "seconds": seconds,
+        "jobs_per_second": len(latencies) / seconds,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+    if not args.no_memory:
+        gc.collect()
+        tracemalloc.start()
+        scenario(args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_memory_mib"] = peak / 1024 ** 2
+    return result
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict[str, dict[str, float]], previous: dict, threshold: float) -> int:
+    """
+    Print the change of every metric since the previous results
+    :return: how many metrics got worse by more than `threshold` (ex: 0.1 for 10%)
+    """
+    print(f"\nCompared with {previous['commit']}:")
+    nb_regressions = 0
+    for name, result in results.items():
+        before = previous["results"].get(name)
+        if before is None:
+            continue
+        for metric, higher_is_better in metrics.items():
+            if metric not in result or metric not in before or before[metric] == 0:
+                continue
+            change = result[metric] / before[metric] - 1
+            regression = -change > threshold if higher_is_better else change > threshold
+            nb_regressions += regression
+            print(f"{name:>16} {metric:>15}: {before[metric]:12.3f} -> {result[metric]:12.3f} "
+                  f"({change:+.1%}){' REGRESSION' if regression else ''}")
+    return nb_regressions
+
+
+def main():
+    parser_ = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser_.add_argument("--only", nargs="+", choices=list(scenarios), default=list(scenarios),
+                         help="the scenarios to run")
+    parser_.add_argument("--cards", type=int, default=200, help="search: number of jobs in the search results")
+    parser_.add_argument("--driver-latency", type=float, default=0.001,
+                         help="search: latency of each WebDriver call, in seconds")
+    parser_.add_argument("--load-latency", type=float, default=0.05,
+                         help="search: how long new jobs take to load, in seconds")
+    parser_.add_argument("--jobs", type=int, default=500, help="details: number of jobs")
+    parser_.add_argument("--details-latency", type=float, default=0.01,
+                         help="details: how long a job's page takes to be served, in seconds")
+    parser_.add_argument("--throttle-every", type=int, default=50,
+                         help="details: answer every n-th request with a 429. 0 to never")
+    parser_.add_argument("--retry-after", type=float, default=0.05,
+                         help="details: the Retry-After of the 429 answers, in seconds")
+    parser_.add_argument("--concurrency", type=int, default=16, help="details: jobs scrapped at the same time")
+    parser_.add_argument("--rqs", type=float, default=500, help="details: requests per second")
+    parser_.add_argument("--calls", type=int, default=100000, help="ratelimiter: number of calls")
+    parser_.add_argument("--pages", type=int, default=300, help="parsers: number of pages parsed")
+    parser_.add_argument("--no-memory", action="store_true", help="don't measure the peak memory")
+    parser_.add_argument("--output", type=Path, help="where to save the results. "
+                                                     "Default to benchmarks/results/<commit>.json")
+    parser_.add_argument("--compare", type=Path, help="results of a previous run to compare with")
+    parser_.add_argument("--threshold", type=float, default=0.1,
+                         help="how much worse a metric can get before being reported as a regression")
+    args = parser_.parse_args()
+
+    results = {}
+    for name in args.only:
+        results[name] = result = measure(scenarios[name], args)
+        memory = f", peak memory {result['peak_memory_mib']:.1f} MiB" if "peak_memory_mib" in result else ""
+        print(f"{name:>16}: {result['jobs']} jobs, {result['jobs_per_second']:.1f} jobs/s, "
+              f"p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms{memory}")
+
+    commit = current_commit()
+    output = args.output or results_dir / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "results": results,
+    }, indent=2))
+    print(f"\nResults saved in {output}")
+
+    if args.compare is not None:
+        nb_regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        sys.exit(1 if nb_regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,41 @@
-from .main import scrap_all_jobs, scrap_single_job
-from .models import LinkedInJob, Company, Location
\ No newline at end of file
+import importlib
+
+from .models import LinkedInJob, JobRecord, Company, Location, Search, SearchProgress
+
+# The scrapers, and their heavy backends (selenium, aiohttp, bs4, lxml), are imported
+# on first use: the consumers of the models only don't pay for them
+_lazy_attributes = {
+    "close_single_job_scraper": "main",
+    "scrap_all_jobs": "main",
+    "scrap_all_jobs_async": "main",
+    "scrap_all_jobs_details": "main",
+    "scrap_all_jobs_split": "main",
+    "scrap_all_searches": "main",
+    "scrap_jobs_details": "main",
+    "scrap_single_job": "main",
+}
+_submodules = {
+    "cache", "dedupe", "drivers", "guest", "index", "main", "metrics", "models", "parsers", "planner",
+    "ratelimit", "runner", "scraper", "sinks", "store", "utils",
+}
+
+__all__ = [
+    "scrap_all_jobs", "scrap_all_jobs_async", "scrap_all_jobs_details", "scrap_all_jobs_split", "scrap_all_searches",
+    "scrap_jobs_details", "scrap_single_job", "close_single_job_scraper",
+    "LinkedInJob", "JobRecord", "Company", "Location", "Search", "SearchProgress",
+]
+
+
+def __getattr__(name: str):
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(f".{_lazy_attributes[name]}", __name__), name)
+    elif name in _submodules:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # found directly from now on
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_lazy_attributes, *_submodules})
@@ -0,0 +1,170 @@
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+__all__ = ["ResponseCache", "CachedResponse", "normalize_url"]
+
+# query parameters LinkedIn adds to track where the job was clicked, not changing the page
+tracking_parameters = {"refId", "trackingId", "trk", "position", "pageNum", "originalSubdomain"}
+
+# bumped whenever the responses table changes: the older caches are emptied
+_schema_version = 1
+
+
+def normalize_url(url: str) -> str:
+    """
+    The cache key of a job's url: the same page is reached through the country
+    subdomains (de.linkedin.com, fr.linkedin.com ...) and with tracking parameters
+    """
+    parts = urlsplit(url)
+    netloc = parts.netloc.lower()
+    if netloc.endswith(".linkedin.com"):
+        netloc = "www.linkedin.com"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in tracking_parameters)
+    return urlunsplit(("https", netloc, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: str
+    etag: str | None
+    last_modified: str | None
+    # when the response was downloaded, or last revalidated (`time.time()`)
+    stored_at: float
+    # whether it can be used without asking the server
+    fresh: bool
+
+    def revalidation_headers(self) -> dict[str, str]:
+        """
+        The headers asking the server to answer with a 304 if the page didn't change
+        """
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    On-disk cache of the job pages, in a SQLite database, keyed on the normalized url
+
+    The pages are served from the cache during `ttl` seconds. After that, they are
+    revalidated with the server (ETag/Last-Modified) when the server gave validators,
+    or downloaded again. The least recently used pages are evicted once
+    the cached pages' size goes over `max_size_mb`
+    """
+
+    def __init__(
+            self,
+            path: str | os.PathLike = "jobsscraper-cache.sqlite",
+            *,
+            ttl: float = 3600,
+            max_size_mb: float = 512,
+    ):
+        """
+        :param path: the SQLite database file. Created if it doesn't exist
+        :param ttl: how long a page is served without asking the server, in seconds
+        :param max_size_mb: the maximal size of the cached pages
+        """
+        self._ttl = ttl
+        self._max_size = int(max_size_mb * 1024 ** 2)
+        self._db = sqlite3.connect(path, isolation_level=None)
+        # the body comes last: the other columns are read without going through the pages' content
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < _schema_version:
+            self._db.execute("DROP TABLE IF EXISTS responses")
+            self._db.execute(f"PRAGMA user_version = {_schema_version}")
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                used_at REAL NOT NULL,
+                stored_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at);
+        """)
+        # the cached pages' size, kept up to date instead of summed on every put
+        self._size: int = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        self.nb_hits = 0
+        self.nb_misses = 0
+        self.nb_revalidated = 0
+        self.nb_evicted = 0
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def get(self, url: str) -> CachedResponse | None:
+        """
+        The cached response of the url, if any, fresh or not
+        A fresh response counts as a hit, anything else as a miss
+        """
+        key = normalize_url(url)
+        row = self._db.execute(
+            "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.nb_misses += 1
+            return None
+        now = time.time()
+        self._db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+        body, etag, last_modified, stored_at = row
+        fresh = now - stored_at < self._ttl
+        if fresh:
+            self.nb_hits += 1
+        else:
+            self.nb_misses += 1
+        return CachedResponse(body, etag, last_modified, stored_at, fresh)
+
+    def put(self, url: str, body: str, *, etag: str | None = None, last_modified: str | None = None):
+        """
+        Cache the url's response, evicting the least recently used ones if needed
+        """
+        now = time.time()
+        size = len(body.encode())
+        if size > self._max_size:
+            return
+        key = normalize_url(url)
+        replaced = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, size, used_at, stored_at, etag, last_modified, body) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, size, now, now, etag, last_modified, body))
+        self._size += size - (replaced[0] if replaced is not None else 0)
+        if self._size > self._max_size:
+            self.__evict()
+
+    def revalidated(self, url: str):
+        """
+        The server said the cached response is still valid (304): it is fresh again
+        """
+        self.nb_revalidated += 1
+        self._db.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), normalize_url(url)))
+
+    def __evict(self):
+        evicted = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY used_at"):
+            if self._size <= self._max_size:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self.nb_evicted += len(evicted)
+        logging.debug(f"Evicted {len(evicted)} responses from the cache")
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
@@ -0,0 +1,112 @@
+import hashlib
+import math
+from typing import Iterable, Iterator
+
+from . import models
+
+__all__ = ["DedupeIndex", "BloomFilter", "dedupe_key", "skip_known"]
+
+
+def dedupe_key(job: models.LinkedInJob | models.JobRecord) -> str:
+    """
+    What identifies a job posting: its LinkedIn job id,
+    or its url if the url has no job id
+    """
+    return job.job_id or job.url
+
+
+class BloomFilter:
+    """
+    A set of strings taking a fixed amount of memory, whatever the number of strings added:
+    about 1.2 bytes per expected string for a 1% false positive rate
+
+    It never forgets a string, but might say a string is in the set while it is not
+    (false positive), with the given rate, as long as at most `capacity` strings are added
+    """
+
+    def __init__(self, capacity: int, *, false_positive_rate: float = 0.001):
+        """
+        :param capacity: how many strings are expected to be added
+        :param false_positive_rate: how likely a string not added is said to be in the set
+        """
+        self._nb_bits = max(int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2), 8)
+        self._nb_hashes = max(round(self._nb_bits / capacity * math.log(2)), 1)
+        self._bits = bytearray((self._nb_bits + 7) // 8)
+
+    def __positions(self, value: str) -> Iterator[int]:
+        # k hashes out of 2 (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self._nb_bits for i in range(self._nb_hashes))
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self.__positions(value))
+
+    def add(self, value: str):
+        for p in self.__positions(value):
+            self._bits[p >> 3] |= 1 << (p & 7)
+
+    @property
+    def nb_bytes(self) -> int:
+        return len(self._bits)
+
+
+class DedupeIndex:
+    """
+    Remember the job postings already handled, to skip them before any network call
+
+    The numeric LinkedIn job ids are kept as integers, taking less memory than
+    their strings. For very large crawls, pass `bloom_capacity` to use a fixed amount
+    of memory instead, at the cost of skipping a few new jobs (see `BloomFilter`)
+    """
+
+    def __init__(self, *, bloom_capacity: int | None = None, false_positive_rate: float = 0.001):
+        """
+        :param bloom_capacity: use a Bloom filter sized for that many jobs, instead of a set
+        :param false_positive_rate: how likely a new job is taken as already handled,
+            with a Bloom filter
+        """
+        self._keys: set[int | str] | BloomFilter
+        if bloom_capacity is not None:
+            self._keys = BloomFilter(bloom_capacity, false_positive_rate=false_positive_rate)
+        else:
+            self._keys = set()
+        self._nb_added = 0
+
+        self.nb_duplicates = 0
+
+    def __key(self, key: str) -> int | str:
+        if isinstance(self._keys, set) and key.isdigit():
+            return int(key)
+        return key
+
+    def __contains__(self, key: str) -> bool:
+        return self.__key(key) in self._keys
+
+    def __len__(self) -> int:
+        return self._nb_added
+
+    def add(self, key: str) -> bool:
+        """
+        Remember the key (see `dedupe_key`)
+        :return: false if it was already known
+        """
+        key = self.__key(key)
+        if key in self._keys:
+            self.nb_duplicates += 1
+            return False
+        self._keys.add(key)
+        self._nb_added += 1
+        return True
+
+
+def skip_known(
+        jobs: Iterable[models.LinkedInJob | models.JobRecord],
+        index: DedupeIndex
+) -> Iterator[models.LinkedInJob | models.JobRecord]:
+    """
+    The jobs not already in the index, which remembers them
+    """
+    for job in jobs:
+        if index.add(dedupe_key(job)):
+            yield job
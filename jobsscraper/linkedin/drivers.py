@@ -0,0 +1,256 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.webdriver import WebDriver, Options
+except ImportError:  # pragma: no cover - selenium is optional, and only needed by the browsers
+    webdriver = None
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is optional, and only needed to measure the browsers' memory
+    psutil = None
+
+__all__ = ["DriverPool", "create_driver", "driver_memory"]
+
+# Chrome features we never use when scraping
+lean_arguments = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-notifications",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--mute-audio",
+    "--no-first-run",
+]
+lean_preferences = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.fonts": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+}
+# resources the browser never downloads
+lean_blocked_urls = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+    "*media.licdn.com/*",
+]
+
+
+def create_driver(*, headless: bool = True, lean: bool = False, capture: bool = False) -> "WebDriver":
+    """
+    Create the WebDriver used to execute command on the Chrome browser
+    :param headless: if true, start a headless browser. Otherwise, it is headfull
+    :param lean: if true, the browser doesn't download images, fonts and media,
+        and the Chrome features we don't need are turned off
+    :param capture: if true, the browser logs its network traffic, read with `driver.get_log("performance")`
+    """
+    if webdriver is None:
+        raise ImportError(
+            "selenium is needed to scrap the LinkedIn search page with a browser, "
+            "install it with `pip install jobsscraper[selenium]`")
+
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    if lean:
+        for argument in lean_arguments:
+            options.add_argument(argument)
+        options.add_experimental_option("prefs", lean_preferences)
+        # don't wait for the sub-resources before handing over the page
+        options.page_load_strategy = "eager"
+    if capture:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    driver = webdriver.Chrome(options=options)
+    if lean or capture:
+        driver.execute_cdp_cmd("Network.enable", {})
+    if lean:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": lean_blocked_urls})
+    return driver
+
+
+def driver_memory(driver: "WebDriver") -> int | None:
+    """
+    The resident memory of the browser, in bytes: chromedriver
+    and all the Chrome processes it started
+    None if it can't be measured (psutil is not installed)
+    """
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        return sum(p.memory_info().rss for p in [process, *process.children(recursive=True)])
+    except (AttributeError, psutil.Error):
+        logging.debug("Can't measure the browser's memory")
+        return None
+
+
+class DriverPool:
+    """
+    Hand out warm, already started browsers, so that the searches
+    don't wait for the browser to start
+
+    A browser is recycled (quit and replaced by a new one) after `max_uses`
+    searches, when its memory grows past `max_memory_mb`, or when the search
+    using it failed
+    """
+
+    def __init__(
+            self,
+            size: int = 1,
+            *,
+            headless: bool = True,
+            lean: bool = True,
+            max_uses: int = 20,
+            max_memory_mb: int | None = None,
+            capture: bool = False,
+    ):
+        """
+        :param size: how many browsers the pool holds
+        :param headless: if true, start headless browsers. Otherwise, they are headfull
+        :param lean: see `create_driver`
+        :param max_uses: how many searches a browser is used for, before being recycled
+        :param max_memory_mb: recycle the browsers using more memory than that
+        :param capture: see `create_driver`
+        """
+        self._size = size
+        self._headless = headless
+        self._lean = lean
+        self._capture = capture
+        self._max_uses = max_uses
+        self._max_memory = max_memory_mb * 1024 ** 2 if max_memory_mb is not None else None
+
+        self._idle: list["WebDriver"] = []
+        self._uses: dict["WebDriver", int] = {}
+        # browsers being started, or in use
+        self._busy = 0
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="driver-pool")
+        self._closed = False
+        # raised to the next borrower, if a browser failed to start
+        self._start_error: Exception | None = None
+
+    def __enter__(self) -> "DriverPool":
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def start(self):
+        """
+        Start all browsers at the same time, in background
+        """
+        with self._condition:
+            for _ in range(self._size - len(self._idle) - self._busy):
+                self.__start_driver()
+
+    def __start_driver(self):
+        """Start a new browser in background. The caller holds the condition's lock"""
+        self._busy += 1
+        self._executor.submit(self.__create_driver)
+
+    def __create_driver(self):
+        try:
+            driver = create_driver(headless=self._headless, lean=self._lean, capture=self._capture)
+        except Exception as e:
+            logging.exception("Failed to start a browser")
+            with self._condition:
+                self._busy -= 1
+                self._start_error = e
+                self._condition.notify()
+            return
+        with self._condition:
+            self._busy -= 1
+            if self._closed:
+                driver.quit()
+                return
+            self._uses[driver] = 0
+            self._idle.append(driver)
+            self._condition.notify()
+
+    @contextmanager
+    def driver(self, timeout: float | None = None) -> Iterator["WebDriver"]:
+        """
+        Borrow a browser from the pool, waiting for one to be available
+        :param timeout: how long we wait for a browser, in seconds. None means no limit
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while not self._idle:
+                if self._start_error is not None:
+                    error, self._start_error = self._start_error, None
+                    raise error
+                if self._busy < self._size:
+                    self.__start_driver()
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0 or not self._condition.wait(remaining):
+                    raise TimeoutError("No browser available")
+            driver = self._idle.pop()
+            self._busy += 1
+
+        failed = True
+        try:
+            yield driver
+            failed = False
+        except (GeneratorExit, SystemExit):  # the borrower stopped early, the browser is fine
+            failed = False
+            raise
+        finally:
+            self.__release(driver, failed=failed)
+
+    def __release(self, driver: "WebDriver", *, failed: bool):
+        self._uses[driver] += 1
+        recycle = failed or self._uses[driver] >= self._max_uses
+        if not recycle and self._max_memory is not None:
+            memory = driver_memory(driver)
+            recycle = memory is not None and memory > self._max_memory
+        if not recycle:
+            try:
+                # free the last page's memory
+                driver.get("about:blank")
+            except Exception:
+                recycle = True
+
+        with self._condition:
+            self._busy -= 1
+            closed = self._closed
+            if recycle or closed:
+                del self._uses[driver]
+                if not closed:
+                    self._executor.submit(self.__quit, driver)
+                    self.__start_driver()
+            else:
+                self._idle.append(driver)
+            self._condition.notify()
+        if closed:
+            self.__quit(driver)
+
+    @staticmethod
+    def __quit(driver: "WebDriver"):
+        try:
+            driver.quit()
+        except Exception:
+            logging.exception("Failed to quit a browser")
+
+    def close(self):
+        """
+        Quit all browsers
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self.__quit(driver)
+        self._executor.shutdown(wait=True)
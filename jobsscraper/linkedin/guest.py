@@ -0,0 +1,211 @@
+import asyncio
+import logging
+from typing import AsyncIterator
+from urllib.parse import urljoin
+
+import aiohttp
+import lxml.html
+from lxml import etree
+
+from . import models
+from .scraper import (
+    job_from_card, logo_class_name, benefits_class_name, location_class_name, posted_time_class_name
+)
+
+__all__ = ["GuestJobsScraper", "parse_job_cards"]
+
+linkedin_url = "https://www.linkedin.com"
+# LinkedIn serves the search results to the logged out users as html
+# fragments, a page of job cards (`li` elements) at a time
+linkedin_guest_search_url = f"{linkedin_url}/jobs-guest/jobs/api/seeMoreJobPostings/search"
+
+
+def _first(xpath: str) -> etree.XPath:
+    return etree.XPath(f"({xpath})[1]")
+
+
+def _first_with_class(class_name: str, xpath: str = "") -> etree.XPath:
+    return _first(f"(.//*[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')])[1]{xpath}")
+
+
+# Same queries as the ones made on the search page, see `scraper.extract_jobs_script`
+_link_xpath = _first(".//a")
+_title_xpath = _first(".//h3")
+_company_link_xpath = _first("(.//h4)[1]//a")
+_logo_xpath = _first_with_class(logo_class_name, "//a")
+_benefit_xpath = _first_with_class(benefits_class_name)
+_location_xpath = _first_with_class(location_class_name)
+_posted_time_xpath = _first_with_class(posted_time_class_name)
+
+
+class GuestJobsScraper:
+    """
+    Scrap the LinkedIn search results without any browser, by paging through
+    the job-listing html fragments served to the logged out users
+    Also, has a retry mechanism in case 429 error codes are caught
+    """
+
+    def __init__(
+            self,
+            location: str,
+            *,
+            search_url: str = linkedin_guest_search_url,
+            page_size: int = 10,
+            concurrency: int = 1,
+            nb_retries: int = 5,
+            retry_delay: float = 1,
+            records: bool = False,
+    ):
+        """
+        :param location: can be a country, state or city
+            ex: Germany | Munich | Munich, Bavaria, Germany
+        :param search_url: where the job-listing fragments are requested
+        :param page_size: how many jobs LinkedIn returns per fragment, until the first fragment tells.
+            The next fragments are requested from the last job found, whatever their size
+        :param concurrency: how many fragments are requested at the same time
+        :param nb_retries: How many times we retry an http call in case of a 429 error code
+        :param retry_delay: how long we wait before the first retry, in seconds.
+            It doubles after each retry
+        :param records: if true, the jobs are lightweight `models.JobRecord`,
+            instead of `models.LinkedInJob`
+        """
+        self._location = location
+        self._search_url = search_url
+        self._page_size = page_size
+        self._concurrency = concurrency
+        self._nb_retries = nb_retries
+        self._retry_delay = retry_delay
+        self._records = records
+
+    async def scrap_jobs(
+            self,
+            keywords: str = "",
+            *,
+            until: int = -1,
+            filters: dict[str, str] | None = None,
+    ) -> AsyncIterator[models.LinkedInJob]:
+        """
+        Page through the LinkedIn search results and scrap all the jobs there
+
+        :param keywords: search using those keywords. If empty, search for all jobs
+        :param until: How long in the past we should scrap jobs. -1 means no limit
+        :param filters: the search page's filters, ex: {"f_WT": "2"} for the remote jobs only
+        :return: An async iterator of LinkedIn Jobs
+        """
+        logging.info(f"Start scrapping jobs from LinkedIn guest search: location={self._location}")
+
+        params = self.__params(keywords, until, filters)
+        counter = 0
+        # all the jobs listed before that one have been scrapped
+        start = 0
+        # how many jobs LinkedIn lists per fragment: the most found in a fragment, once known
+        page_size: int | None = None
+        async with aiohttp.ClientSession() as session:
+            while True:
+                offsets = [start + i * (page_size or self._page_size) for i in range(self._concurrency)]
+                pages = await asyncio.gather(*(self.__request_page(session, params, offset) for offset in offsets))
+                for offset, page in zip(offsets, pages):
+                    if offset > start:  # the previous fragments listed fewer jobs: requested again from `start`
+                        break
+                    cards = parse_job_cards(page)
+                    # the fragments listing more jobs overlap: the jobs before `start` are already scrapped
+                    for card in cards[start - offset:]:
+                        job = job_from_card(card, record=self._records)
+                        if job is not None:
+                            counter += 1
+                            yield job
+                    start = max(start, offset + len(cards))
+                    if len(cards) == 0 or page_size is not None and len(cards) < page_size:  # no more jobs
+                        logging.info(f"Finished scrapping {counter} jobs from LinkedIn guest search: "
+                                     f"location={self._location}")
+                        return
+                    page_size = max(page_size or 0, len(cards))
+                logging.info(f"Scrapped {counter} jobs until now ...")
+
+    async def has_jobs_from(
+            self,
+            start: int,
+            keywords: str = "",
+            *,
+            until: int = -1,
+            filters: dict[str, str] | None = None,
+            session: aiohttp.ClientSession | None = None,
+    ) -> bool:
+        """
+        Whether the search results list at least `start + 1` jobs, with a single request
+
+        :param session: the session to request with. Default to a new one
+        """
+        params = self.__params(keywords, until, filters)
+        if session is not None:
+            return len(parse_job_cards(await self.__request_page(session, params, start))) > 0
+        async with aiohttp.ClientSession() as session:
+            return len(parse_job_cards(await self.__request_page(session, params, start))) > 0
+
+    def __params(self, keywords: str, until: int, filters: dict[str, str] | None) -> dict:
+        params = {"location": self._location}
+        if until >= 0:
+            params["f_TPR"] = until
+        if keywords != "":
+            params["keywords"] = keywords
+        params.update(filters or {})
+        return params
+
+    async def __request_page(self, session: aiohttp.ClientSession, params: dict, start: int) -> str:
+        """
+        Get the html fragment listing the jobs from the `start`-th one
+        Retry if 429 status code. The end of the search results is reached
+        when LinkedIn answers with an empty fragment or a 400 status code
+        """
+        for retry_no in range(self._nb_retries + 1):
+            async with session.get(self._search_url, params={**params, "start": start}) as resp:
+                if resp.status == 429:
+                    logging.debug(f"Too many requests: retrying ... (start={start}, retry={retry_no})")
+                    await asyncio.sleep(self._retry_delay * 2 ** retry_no)
+                    continue
+                if resp.status in (400, 404):
+                    return ""
+                resp.raise_for_status()
+                return await resp.text()
+        logging.error(f"Too many requests, even after {self._nb_retries} retries")
+        raise aiohttp.ClientError(f"Too many requests: start={start}")
+
+
+def parse_job_cards(html: str) -> list[dict[str, str | None]]:
+    """
+    Extract the fields of the job cards listed in the html fragment,
+    as `scraper.extract_jobs_script` does on the search page
+    """
+    if html.strip() == "":
+        return []
+    fragment = lxml.html.fragment_fromstring(html, create_parent="ul")
+    return [_parse_job_card(li) for li in fragment.iterchildren("li")]
+
+
+def _parse_job_card(li: lxml.html.HtmlElement) -> dict[str, str | None]:
+    def first(xpath: etree.XPath) -> lxml.html.HtmlElement | None:
+        found = xpath(li)
+        return found[0] if found else None
+
+    def text(element: lxml.html.HtmlElement | None) -> str | None:
+        # collapse the white spaces, as the browser does when rendering the text
+        return " ".join(element.text_content().split()) if element is not None else None
+
+    def href(element: lxml.html.HtmlElement | None) -> str | None:
+        if element is None or element.get("href") is None:
+            return None
+        return urljoin(linkedin_url, element.get("href"))
+
+    company_link = first(_company_link_xpath)
+    logo = first(_logo_xpath)
+    posted_time = first(_posted_time_xpath)
+    return {
+        "url": href(first(_link_xpath)),
+        "title": text(first(_title_xpath)),
+        "company_name": text(company_link),
+        "company_url": href(company_link),
+        "logo": logo.get("data-ghost-url") if logo is not None else None,
+        "benefit": text(first(_benefit_xpath)),
+        "location": text(first(_location_xpath)),
+        "posted_time": posted_time.get("datetime") if posted_time is not None else None,
+    }
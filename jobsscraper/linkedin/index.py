@@ -0,0 +1,248 @@
+import logging
+import os
+import pickle
+import re
+import time
+from array import array
+from bisect import bisect_left
+from typing import AsyncIterable, Iterable
+
+from . import dedupe, models
+
+__all__ = ["JobIndex", "tokenize"]
+
+Job = models.LinkedInJob | models.JobRecord
+
+# bumped whenever the snapshot's content changes
+_snapshot_version = 1
+
+_word = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """
+    The words of the text, lowercase, as indexed and searched
+    """
+    return _word.findall(text.casefold()) if text else []
+
+
+def _has(postings: array, doc_id: int) -> bool:
+    i = bisect_left(postings, doc_id)
+    return i < len(postings) and postings[i] == doc_id
+
+
+def _intersect(doc_ids: set[int], postings: array | set[int]) -> set[int]:
+    # a few candidates are looked up in the sorted postings, instead of going through all of them
+    if isinstance(postings, array) and len(doc_ids) * 16 < len(postings):
+        return {i for i in doc_ids if _has(postings, i)}
+    return doc_ids.intersection(postings)
+
+
+def _difference(doc_ids: set[int], postings: array | set[int]) -> set[int]:
+    if isinstance(postings, array) and len(doc_ids) * 16 < len(postings):
+        return {i for i in doc_ids if not _has(postings, i)}
+    return doc_ids.difference(postings)
+
+
+class JobIndex:
+    """
+    Search the jobs already scrapped, in memory, without going through all of them:
+    an inverted index of the words of their title and description, and lookups on
+    their company, location and criteria
+
+        index = JobIndex()
+        await index.add_all_async(scrap_all_jobs_details("Munich"))
+        index.search("python django|flask -senior data*", criteria={"Employment type": "Full-time"})
+
+    Every word is mapped to the sorted ids of the jobs having it (postings), 4 bytes per job and word.
+    A job added again (see `dedupe.dedupe_key`), ex: with its details, replaces the previous one
+    """
+
+    def __init__(self):
+        # the jobs by id, in the order they were added. None once replaced
+        self._jobs: list[models.LinkedInJob | None] = []
+        self._doc_ids: dict[int | str, int] = {}
+        self._words: dict[str, array] = {}
+        self._companies: dict[str, array] = {}
+        self._locations: dict[str, array] = {}
+        self._criteria: dict[tuple[str, str], array] = {}
+        # the words, sorted for the prefix queries. Sorted again once new words are added
+        self._vocabulary: list[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def __contains__(self, key: str) -> bool:
+        return self.__key(key) in self._doc_ids
+
+    @staticmethod
+    def __key(key: str) -> int | str:
+        # as `dedupe.DedupeIndex`, the numeric job ids take less memory as integers
+        return int(key) if key.isdigit() else key
+
+    def add(self, job: Job) -> bool:
+        """
+        Index the job, replacing the one with the same id, if any
+        :return: false if it replaced a job
+        """
+        if isinstance(job, models.JobRecord):
+            job = job.to_model()
+        doc_id = len(self._jobs)
+        key = self.__key(dedupe.dedupe_key(job))
+        previous = self._doc_ids.get(key)
+        if previous is not None:
+            self._jobs[previous] = None
+        self._doc_ids[key] = doc_id
+        self._jobs.append(job)
+
+        for word in {*tokenize(job.title), *tokenize(job.description)}:
+            if word not in self._words:
+                self._words[word] = array("I")
+                self._vocabulary = None
+            self._words[word].append(doc_id)
+        self._companies.setdefault(job.company.name.casefold(), array("I")).append(doc_id)
+        for word in set(tokenize(job.location.full_location)):
+            self._locations.setdefault(word, array("I")).append(doc_id)
+        for name, value in job.criteria.items():
+            self._criteria.setdefault((name.casefold(), value.casefold()), array("I")).append(doc_id)
+        return previous is None
+
+    def add_all(self, jobs: Iterable[Job]) -> int:
+        """
+        Index all the jobs
+        :return: the number of jobs not replacing another one
+        """
+        return sum(self.add(job) for job in jobs)
+
+    async def add_all_async(self, jobs: AsyncIterable[Job]) -> int:
+        """
+        Same as `add_all`, for async iterables. ex: `scrap_jobs_details(...)`
+        """
+        nb_added = 0
+        async for job in jobs:
+            nb_added += self.add(job)
+        return nb_added
+
+    def search(
+            self,
+            query: str = "",
+            *,
+            company: str | None = None,
+            location: str | None = None,
+            criteria: dict[str, str] | None = None,
+            limit: int | None = None,
+    ) -> list[models.LinkedInJob]:
+        """
+        The jobs matching the query and all the given lookups, in the order they were added
+
+        :param query: words separated by spaces, all of them in the job's title or description.
+            "django|flask": any of them, "-senior": not that one, "data*": any word starting with it.
+            Case-insensitive, ex: "python django|flask -senior data*"
+        :param company: the company's name, case-insensitive
+        :param location: words all in the job's location, ex: "Munich" for "Munich, Bavaria, Germany"
+        :param criteria: the job's criteria values, case-insensitive, ex: {"Seniority level": "Entry level"}
+        :param limit: return at most that many jobs
+        """
+        included: list[array | set[int]] = []
+        excluded: list[array | set[int]] = []
+        for clause in query.split():
+            if not _word.search(clause):  # no word to search, ex: "-"
+                continue
+            if clause.startswith("-"):
+                excluded.append(self.__any_of(clause[1:]))
+            else:
+                included.append(self.__any_of(clause))
+        if company is not None:
+            included.append(self._companies.get(company.casefold(), array("I")))
+        if location is not None:
+            included += [self._locations.get(word, array("I")) for word in tokenize(location)]
+        for name, value in (criteria or {}).items():
+            included.append(self._criteria.get((name.casefold(), value.casefold()), array("I")))
+
+        # from the fewest jobs, so that the candidates only get fewer
+        included.sort(key=len)
+        doc_ids = set(included[0]) if included else set(range(len(self._jobs)))
+        for postings in included[1:]:
+            doc_ids = _intersect(doc_ids, postings)
+        for postings in excluded:
+            doc_ids = _difference(doc_ids, postings)
+
+        jobs = []
+        for doc_id in sorted(doc_ids):
+            job = self._jobs[doc_id]
+            if job is not None:
+                jobs.append(job)
+                if len(jobs) == limit:
+                    break
+        return jobs
+
+    def __any_of(self, clause: str) -> array | set[int]:
+        """The jobs having any of the "|" separated words of the clause"""
+        alternatives = [self.__word(word) for word in clause.split("|")]
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return set().union(*alternatives)
+
+    def __word(self, word: str) -> array | set[int]:
+        if word.endswith("*"):
+            return set().union(*self.__prefixed(word.rstrip("*").casefold()))
+        # a word with punctuation is several words, all of them in the job, ex: "full-time"
+        postings = [self._words.get(w, array("I")) for w in tokenize(word)]
+        if len(postings) == 1:
+            return postings[0]
+        postings.sort(key=len)
+        doc_ids = set(postings[0]) if postings else set()
+        for p in postings[1:]:
+            doc_ids = _intersect(doc_ids, p)
+        return doc_ids
+
+    def __prefixed(self, prefix: str) -> list[array]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._words)
+        postings = []
+        for i in range(bisect_left(self._vocabulary, prefix), len(self._vocabulary)):
+            if not self._vocabulary[i].startswith(prefix):
+                break
+            postings.append(self._words[self._vocabulary[i]])
+        return postings
+
+    def save(self, path: str | os.PathLike):
+        """
+        Snapshot the index in a file, replaced at once: a crash while saving keeps the previous snapshot
+        """
+        start = time.perf_counter()
+        state = {
+            "version": _snapshot_version,
+            "jobs": self._jobs,
+            "doc_ids": self._doc_ids,
+            "words": self._words,
+            "companies": self._companies,
+            "locations": self._locations,
+            "criteria": self._criteria,
+        }
+        tmp_path = f"{os.fspath(path)}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        logging.info(f"Saved the index of {len(self)} jobs in {time.perf_counter() - start:.2f}s: path={path}")
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "JobIndex":
+        """
+        The index snapshot by `save`, as it was, without indexing the jobs again.
+        The snapshot is a pickle: only load the ones you saved
+        """
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != _snapshot_version:
+            raise ValueError(f"Unsupported index snapshot version: {state.get('version')}, path={path}")
+        index = cls()
+        index._jobs = state["jobs"]
+        index._doc_ids = state["doc_ids"]
+        index._words = state["words"]
+        index._companies = state["companies"]
+        index._locations = state["locations"]
+        index._criteria = state["criteria"]
+        logging.info(f"Loaded the index of {len(index)} jobs in {time.perf_counter() - start:.2f}s: path={path}")
+        return index
@@ -1,24 +1,224 @@
-from typing import Iterator
+import asyncio
+import logging
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Literal
 
-from . import models
+import aiohttp
+
+from . import metrics, models, utils
+from .cache import ResponseCache
+from .dedupe import DedupeIndex, dedupe_key, skip_known
+from .drivers import DriverPool
+from .guest import GuestJobsScraper
+from .planner import SearchPlanner
+from .runner import SearchesRunner
 from .scraper import AllJobsScraper, SingleJobScraper
+from .store import SeenJobsStore
 
 
 def scrap_all_jobs(
+        location: str,
+        *,
+        dedupe_index: DedupeIndex | None = None,
+        **search_options,
+) -> Iterator[models.LinkedInJob | models.JobRecord]:
+    """
+    Navigate the LinkedIn search Webpage and extract all found jobs
+
+    :param dedupe_index: skip the jobs already in this index, found by another search for instance,
+        and add the new ones to it. Any backend
+
+    The search's options, the same for `scrap_all_jobs_async` and `scrap_all_jobs_details`:
+
+    :param keyword: the searched words
+    :param until: only the jobs posted within that many seconds
+    :param headless: if true, start a headless browser. Otherwise, it is headfull
+    :param batch_extraction: see `AllJobsScraper`
+    :param lean: start a browser not downloading images, fonts and media
+    :param driver_pool: borrow an already started browser from this pool, instead of starting one.
+        `headless` and `lean` are then the pool's ones
+    :param backend: "selenium" navigates the search page with a Chrome browser.
+        "http" pages through the search results served to the logged out users,
+        without any browser. The other options only apply to "selenium"
+    :param seen_store: skip the jobs found by the previous runs, and remember the new ones
+    :param stop_after_seen: stop once that many jobs in a row were found by the previous runs
+        (see `AllJobsScraper.scrap_jobs`)
+    :param records: return lightweight `models.JobRecord`, much faster to build and smaller
+        than `models.LinkedInJob`, for searches finding many jobs. Any backend,
+        but only with the batch extraction for "selenium"
+    :param prune: empty the jobs shown by the browser once scraped, for deep searches
+        (see `AllJobsScraper`)
+    :param max_memory_mb: replace the browser once it uses that much memory. Not with a `driver_pool`
+    :param capture: parse the jobs fetched by the search page from the browser's network traffic,
+        instead of extracting them from the page (see `AllJobsScraper`). A `driver_pool` must capture too
+    """
+    jobs = _scrap_all_jobs(location, **search_options)
+    if not isinstance(jobs, Iterator):
+        jobs = utils.iterate_sync(jobs)
+    return skip_known(jobs, dedupe_index) if dedupe_index is not None else jobs
+
+
+async def scrap_all_jobs_async(
+        location: str,
+        *,
+        dedupe_index: DedupeIndex | None = None,
+        queue_size: int = 100,
+        **search_options,
+) -> AsyncIterator[models.LinkedInJob | models.JobRecord]:
+    """
+    Same as `scrap_all_jobs`, as an async iterator not blocking the event loop:
+    with "selenium", the browser is started and driven in a thread dedicated to the search,
+    which hands over the jobs as soon as they are found. Several searches can run at once
+    from the same event loop. "http" runs on the event loop itself
+
+    :param queue_size: how many found jobs can wait to be read. The search waits while that many jobs are waiting
+    :param search_options: the search's options, see `scrap_all_jobs`
+    """
+    jobs = _scrap_all_jobs(location, **search_options)
+    if not isinstance(jobs, AsyncIterator):
+        # the browser is started in the background thread too, on the first job asked for
+        jobs = utils.iterate_in_thread(jobs, maxsize=queue_size)
+    try:
+        async for job in jobs:
+            if dedupe_index is None or dedupe_index.add(dedupe_key(job)):
+                yield job
+    finally:
+        await jobs.aclose()
+
+
+def _scrap_all_jobs(
         location: str,
         *,
         keyword: str = "",
         until: int = 86400,
-        headless: bool = True
+        headless: bool = True,
+        batch_extraction: bool = True,
+        lean: bool = False,
+        driver_pool: DriverPool | None = None,
+        backend: Literal["selenium", "http"] = "selenium",
+        seen_store: SeenJobsStore | None = None,
+        stop_after_seen: int | None = None,
+        records: bool = False,
+        prune: bool = False,
+        max_memory_mb: int | None = None,
+        capture: bool = False,
+) -> Iterator[models.LinkedInJob | models.JobRecord] | AsyncIterator[models.LinkedInJob | models.JobRecord]:
+    """
+    The jobs found by the search, with the options of `scrap_all_jobs`: an async iterator with "http",
+    an iterator starting the browser on the first job asked for with "selenium"
+    """
+    if backend == "http":
+        return GuestJobsScraper(location, records=records).scrap_jobs(keywords=keyword, until=until)
+    if backend != "selenium":
+        raise ValueError(f"Unknown backend={backend}")
+    scraper_kwargs = {"batch_extraction": batch_extraction, "records": records, "prune": prune, "capture": capture}
+    search_kwargs = {"keywords": keyword, "until": until, "seen_store": seen_store, "stop_after_seen": stop_after_seen}
+    if driver_pool is not None:
+        return _scrap_all_jobs_with_pool(driver_pool, location, scraper_kwargs, search_kwargs)
+    scraper_kwargs |= {"headless": headless, "lean": lean, "max_memory_mb": max_memory_mb}
+    return _scrap_all_jobs_with_browser(location, scraper_kwargs, search_kwargs)
+
+
+def _scrap_all_jobs_with_pool(
+        driver_pool: DriverPool,
+        location: str,
+        scraper_kwargs: dict,
+        search_kwargs: dict,
+) -> Iterator[models.LinkedInJob | models.JobRecord]:
+    with driver_pool.driver() as driver:
+        scraper = AllJobsScraper(location, driver=driver, **scraper_kwargs)
+        yield from scraper.scrap_jobs(**search_kwargs)
+
+
+def _scrap_all_jobs_with_browser(
+        location: str,
+        scraper_kwargs: dict,
+        search_kwargs: dict,
+) -> Iterator[models.LinkedInJob | models.JobRecord]:
+    # the browser is started on the first job asked for, and quit once the search is over or stopped
+    scraper = AllJobsScraper(location, **scraper_kwargs)
+    try:
+        yield from scraper.scrap_jobs(**search_kwargs)
+    finally:
+        scraper.close()
+
+
+def scrap_all_searches(
+        searches: list[models.Search],
+        *,
+        workers: int | None = None,
+        headless: bool = True,
+        batch_extraction: bool = True,
+        lean: bool = False,
+        on_progress: Callable[[models.SearchProgress], None] | None = None
 ) -> Iterator[models.LinkedInJob]:
     """
-    Navigate the LinkedIn search Webpage and extract all found jobs
+    Run all searches at the same time on `workers` processes, each owning its own browser,
+    and extract all found jobs. A job found by several searches is only returned once
+
+    :param lean: start browsers not downloading images, fonts and media
+    :param on_progress: called with the search's progress every time it changes.
+        A failing search is reported there, without stopping the other searches
     """
-    scraper = AllJobsScraper(location, headless=headless)
-    return scraper.scrap_jobs(keywords=keyword, until=until)
+    runner = SearchesRunner(
+        searches,
+        workers=workers,
+        headless=headless,
+        batch_extraction=batch_extraction,
+        lean=lean,
+        on_progress=on_progress,
+    )
+    return runner.run()
 
 
-single_job_scraper: SingleJobScraper | None = None
+def scrap_all_jobs_split(
+        location: str,
+        *,
+        keyword: str = "",
+        until: int = 86400,
+        sub_locations: dict[str, list[str]] | None = None,
+        backend: Literal["selenium", "http"] = "selenium",
+        workers: int | None = None,
+        headless: bool = True,
+        batch_extraction: bool = True,
+        lean: bool = False,
+        on_progress: Callable[[models.SearchProgress], None] | None = None
+) -> Iterator[models.LinkedInJob]:
+    """
+    Same as `scrap_all_jobs`, for the searches finding more jobs than LinkedIn lists (about a thousand):
+    the search is split into smaller ones until all of them are listed entirely (see `planner.SearchPlanner`).
+    They are run with `scrap_all_searches` ("selenium"), or one after the other ("http").
+    A job found by several searches is only returned once
+
+    :param sub_locations: the locations covering each location, to split into first.
+        ex: {"Germany": ["Bavaria", "Berlin", ...]}. Otherwise, the search is split by facet only
+    :param on_progress: see `scrap_all_searches`. "selenium" only
+    """
+    if backend not in ("selenium", "http"):
+        raise ValueError(f"Unknown backend={backend}")
+    planner = SearchPlanner(sub_locations=sub_locations)
+    searches = asyncio.run(planner.plan(models.Search(location=location, keyword=keyword, until=until)))
+    if backend == "http":
+        return skip_known(_scrap_guest_searches(searches), DedupeIndex())
+    return scrap_all_searches(
+        searches,
+        workers=workers,
+        headless=headless,
+        batch_extraction=batch_extraction,
+        lean=lean,
+        on_progress=on_progress,
+    )
+
+
+def _scrap_guest_searches(searches: list[models.Search]) -> Iterator[models.LinkedInJob]:
+    for search in searches:
+        guest_scraper = GuestJobsScraper(search.location)
+        yield from utils.iterate_sync(
+            guest_scraper.scrap_jobs(keywords=search.keyword, until=search.until, filters=search.filters))
+
+
+# the scraper of every event loop: its connections can only be used within the loop which opened them.
+# It is closed on the first use after its loop is closed, or by `close_single_job_scraper`
+single_job_scrapers: dict[asyncio.AbstractEventLoop, SingleJobScraper] = {}
 
 
 async def scrap_single_job(data: models.LinkedInJob) -> None:
@@ -27,9 +227,144 @@ async def scrap_single_job(data: models.LinkedInJob) -> None:
     this method scrap this url's webpage, and enhance the given
     data model with the extracted data
     """
-    global single_job_scraper
-    # Construct the scraper if not done once
-    if single_job_scraper is None:
-        single_job_scraper = SingleJobScraper()
+    loop = asyncio.get_running_loop()
+    # Close the scrapers of the event loops since closed, ex: by the previous `asyncio.run`
+    for closed_loop in [other for other in single_job_scrapers if other.is_closed()]:
+        await single_job_scrapers.pop(closed_loop).close()
+    # Construct the scraper if not done once in this event loop
+    if loop not in single_job_scrapers:
+        single_job_scrapers[loop] = SingleJobScraper()
     # scrap the data
-    await single_job_scraper.scrap(data)
+    await single_job_scrapers[loop].scrap(data)
+
+
+async def close_single_job_scraper() -> None:
+    """
+    Close the scraper used by `scrap_single_job` in the running event loop, if any.
+    Call it before the loop is closed, ex: at the end of the coroutine given to `asyncio.run`
+    """
+    scraper = single_job_scrapers.pop(asyncio.get_running_loop(), None)
+    if scraper is not None:
+        await scraper.close()
+
+
+async def scrap_jobs_details(
+        jobs: Iterable[models.LinkedInJob | models.JobRecord] | AsyncIterable[models.LinkedInJob | models.JobRecord],
+        *,
+        concurrency: int = 8,
+        rqs: float = 1,
+        parse_workers: int = 0,
+        response_cache: ResponseCache | None = None,
+        dedupe_index: DedupeIndex | None = None,
+        session: aiohttp.ClientSession | None = None,
+        on_error: Callable[[models.LinkedInJob, Exception], None] | None = None
+) -> AsyncIterator[models.LinkedInJob]:
+    """
+    Scrap the details of all the given jobs (see `scrap_single_job`), and yield
+    every job as soon as its details are scrapped, in completion order
+
+    The jobs are read from `jobs` only when there is room for them:
+    at most `concurrency` jobs are scrapped at the same time, whatever the number of jobs
+
+    :param jobs: the jobs to enhance, sync or async iterable. ex: `scrap_all_jobs(...)`.
+        The `models.JobRecord` are converted to `models.LinkedInJob` when their turn comes
+    :param concurrency: how many jobs are scrapped at the same time
+    :param rqs: number of requests per second to start with (see `SingleJobScraper`)
+    :param parse_workers: parse the pages on that many processes, instead of the event loop
+        (see `SingleJobScraper`)
+    :param response_cache: serve the job pages from this cache when possible (see `cache.ResponseCache`)
+    :param dedupe_index: skip the jobs already in this index, without any request,
+        and add the other ones to it
+    :param session: request the pages with this session, shared with other scrapers (see `scraper.create_session`).
+        By default, a session is opened with a connection per concurrent job, and closed at the end
+    :param on_error: called with the job and the error when a job's details can't be scrapped.
+        Such a job is not yielded. By default, the error is logged
+    """
+    scraper = SingleJobScraper(
+        rqs=rqs,
+        parse_workers=parse_workers,
+        response_cache=response_cache,
+        session=session,
+        limit_per_host=concurrency,
+    )
+    jobs_iterator = utils.iterate_async(jobs)
+    # the job scrapped by each running task
+    running: dict[asyncio.Task, models.LinkedInJob] = {}
+    # reading the next job, while the running tasks complete: a slow iterator doesn't hold back the details
+    next_job: asyncio.Future | None = None
+    exhausted = False
+    try:
+        while True:
+            if next_job is None and not exhausted and len(running) < concurrency:
+                next_job = asyncio.ensure_future(anext(jobs_iterator, None))
+            if next_job is None and not running:
+                return
+
+            done, _ = await asyncio.wait(
+                [*running, *([next_job] if next_job is not None else [])], return_when=asyncio.FIRST_COMPLETED)
+            if next_job in done:
+                done.remove(next_job)
+                job = next_job.result()
+                next_job = None
+                if job is None:
+                    exhausted = True
+                elif dedupe_index is None or dedupe_index.add(dedupe_key(job)):
+                    if isinstance(job, models.JobRecord):
+                        job = job.to_model()
+                    running[asyncio.ensure_future(scraper.scrap(job))] = job
+            for task in done:
+                job = running.pop(task)
+                metrics.inc("jobsscraper_jobs_details_total", result="ok" if task.exception() is None else "failed")
+                if task.exception() is None:
+                    yield job
+                elif on_error is not None:
+                    on_error(job, task.exception())
+                else:
+                    logging.error(f"Failed to scrap the job details: url={job.url} error={task.exception()!r}")
+    finally:
+        # the caller stopped early
+        pending = [*running, *([next_job] if next_job is not None else [])]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await jobs_iterator.aclose()
+        await scraper.close()
+
+
+async def scrap_all_jobs_details(
+        location: str,
+        *,
+        queue_size: int = 100,
+        concurrency: int = 8,
+        rqs: float = 1,
+        parse_workers: int = 0,
+        response_cache: ResponseCache | None = None,
+        session: aiohttp.ClientSession | None = None,
+        on_error: Callable[[models.LinkedInJob, Exception], None] | None = None,
+        **search_options,
+) -> AsyncIterator[models.LinkedInJob]:
+    """
+    Extract all found jobs (see `scrap_all_jobs_async`) and scrap their details (see `scrap_jobs_details`)
+    at the same time: the search runs in a background thread, and every found job is scrapped
+    as soon as it is found, instead of once the search is over
+
+    :param queue_size: how many found jobs can wait for their details to be scrapped.
+        The search waits while that many jobs are waiting
+    :param search_options: the search's options and `dedupe_index`, see `scrap_all_jobs`
+    """
+    jobs = scrap_all_jobs_async(location, queue_size=queue_size, **search_options)
+    details = scrap_jobs_details(
+        jobs,
+        concurrency=concurrency,
+        rqs=rqs,
+        parse_workers=parse_workers,
+        response_cache=response_cache,
+        session=session,
+        on_error=on_error,
+    )
+    try:
+        async for job in details:
+            yield job
+    finally:
+        await details.aclose()
+        await jobs.aclose()
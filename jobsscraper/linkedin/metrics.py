@@ -0,0 +1,254 @@
+"""
+Counters and histograms reported by the scrapers, to see where the time goes
+
+Nothing is recorded by default. Set an `InMemoryMetrics` to record them, and read them
+or export them in the Prometheus text format:
+
+    registry = metrics.InMemoryMetrics()
+    metrics.set_metrics(registry)
+    ...
+    print(registry.to_prometheus())
+
+The reported metrics:
+- jobsscraper_page_loads_total{kind="search"|"more"}: the search pages loaded, and the loads of more jobs
+- jobsscraper_load_wait_seconds: the wait for new jobs to be shown, after a load
+- jobsscraper_driver_recycles_total: the browsers replaced during a search, using too much memory
+- jobsscraper_cards_extracted_total{extraction="batch"|"webdriver"|"capture"}: the job cards found on the search page
+- jobsscraper_capture_fallbacks_total: the loads whose new jobs weren't all captured, extracted from the page
+- jobsscraper_capture_failures_total: the captured responses the browser didn't keep
+- jobsscraper_extraction_failures_total{field}: the job cards failing to be extracted, by missing field
+- jobsscraper_planner_probes_total: the searches probed by `planner.SearchPlanner`, to know whether to split them
+- jobsscraper_errors_total{func}: the errors silenced by `utils.silent_log_error`
+- jobsscraper_http_responses_total{status}: the job pages' responses, by status code
+- jobsscraper_throttled_total: the 429 responses
+- jobsscraper_retries_total: the requests retried after a 429
+- jobsscraper_cache_total{result="hit"|"revalidated"}: the job pages served from the cache
+- jobsscraper_limiter_wait_seconds: the wait for the rate limiter, before a request
+- jobsscraper_network_seconds: a job page's request, until its body is read
+- jobsscraper_parse_seconds{parser}: a job page's parsing
+- jobsscraper_jobs_details_total{result="ok"|"failed"}: the jobs handled by `scrap_jobs_details`
+"""
+import bisect
+import contextlib
+import functools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, ContextManager, Iterator
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+__all__ = [
+    "Metrics", "InMemoryMetrics", "Histogram",
+    "set_metrics", "get_metrics", "inc", "observe", "timer", "count_errors", "serve_prometheus",
+]
+
+# in seconds
+default_buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10., 30.)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Metrics:
+    """
+    Where the scrapers report what they do. This one ignores everything, at the cost of a function call
+
+    Subclass it to send the metrics elsewhere (statsd, OpenTelemetry ...).
+    `timer` is called around the timed operations, and can open a tracing span
+    """
+
+    def inc(self, name: str, value: float = 1., **labels: str):
+        """
+        Increase the counter
+        """
+
+    def observe(self, name: str, value: float, **labels: str):
+        """
+        Add the value to the histogram
+        """
+
+    def timer(self, name: str, **labels: str) -> ContextManager:
+        """
+        Observe how long the block takes, in seconds
+        """
+        return _null_timer
+
+
+_null_timer = contextlib.nullcontext()
+
+
+@dataclass(slots=True)
+class Histogram:
+    # the upper bounds of the buckets, +Inf excluded
+    bounds: tuple[float, ...]
+    # how many values fell into each bucket (not cumulative), the last one being +Inf
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    sum: float = 0.
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class InMemoryMetrics(Metrics):
+    """
+    Keep the metrics in memory, thread-safe
+    """
+
+    def __init__(self, *, buckets: tuple[float, ...] = default_buckets):
+        """
+        :param buckets: the upper bounds of the histograms' buckets
+        """
+        self._buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+
+    @staticmethod
+    def __labels(labels: dict[str, str]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1., **labels: str):
+        key = self.__labels(labels)
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[key] = counters.get(key, 0.) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = self.__labels(labels)
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            if key not in histograms:
+                histograms[key] = Histogram(self._buckets)
+            histograms[key].observe(value)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """
+        The counter's value, 0 if never increased
+        """
+        with self._lock:
+            return self._counters.get(name, {}).get(self.__labels(labels), 0.)
+
+    def histogram(self, name: str, **labels: str) -> Histogram | None:
+        """
+        The histogram, none if nothing was observed
+        """
+        with self._lock:
+            return self._histograms.get(name, {}).get(self.__labels(labels))
+
+    def to_prometheus(self) -> str:
+        """
+        The metrics in the Prometheus text exposition format
+        """
+        lines = []
+        with self._lock:
+            for name, counters in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(counters.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name, histograms in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(histograms.items()):
+                    cumulated = 0
+                    for bound, count in zip((*histogram.bounds, float("inf")), histogram.counts):
+                        cumulated += count
+                        bucket_labels = (*labels, ("le", _format_value(bound)))
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulated}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+_metrics = Metrics()
+# the reporting functions of the current metrics, bound once to keep the default ones cheap
+inc = _metrics.inc
+observe = _metrics.observe
+timer = _metrics.timer
+
+
+def set_metrics(metrics: Metrics | None):
+    """
+    Report the metrics to `metrics` from now on. None to stop recording them
+    """
+    global _metrics, inc, observe, timer
+    _metrics = metrics if metrics is not None else Metrics()
+    inc, observe, timer = _metrics.inc, _metrics.observe, _metrics.timer
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def count_errors(name: str, **labels: str):
+    """
+    Increase the counter every time the decorated function raises. The exception is raised again
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except:
+                inc(name, **labels)
+                raise
+        return wrapper
+    return decorator
+
+
+def serve_prometheus(metrics: InMemoryMetrics, port: int = 9100, *, address: str = "") -> "ThreadingHTTPServer":
+    """
+    Serve the metrics to Prometheus on http://<address>:<port>/metrics, in a background thread
+    :return: the server. Stop it with `server.shutdown()`
+    """
+    # imported here: importing the http server takes longer than importing the whole models
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            pass  # no access logs on stderr
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,7 +1,11 @@
+from dataclasses import dataclass
+
 import pydantic
 from pydantic import Field
 
-__all__ = ["Company", "Location", "LinkedInJob"]
+from . import utils
+
+__all__ = ["Company", "Location", "LinkedInJob", "JobRecord", "Search", "SearchProgress"]
 
 
 class Company(pydantic.BaseModel):
@@ -29,3 +33,61 @@ class LinkedInJob(pydantic.BaseModel):
     description: str | None = None
     tags: set[str] = Field(default_factory=set)
     criteria: dict[str, str] = Field(default_factory=dict)
+
+    @pydantic.computed_field
+    @property
+    def job_id(self) -> str | None:
+        """The LinkedIn id of the job, the same whatever url the job was found with"""
+        return utils.job_id_from_url(self.url)
+
+
+@dataclass(slots=True)
+class JobRecord:
+    """
+    A job as found on the search page, flat and without the details:
+    much lighter and faster to build than a `LinkedInJob`, for searches finding many jobs.
+    Its fields come from the scraper, and are not validated until converted with `to_model`
+    """
+    url: str
+    title: str
+    company_name: str
+    company_url: str | None
+    company_logo: str | None
+    actively_hiring: bool | None
+    location: str
+    posted_time: str | None
+
+    @property
+    def job_id(self) -> str | None:
+        """See `LinkedInJob.job_id`"""
+        return utils.job_id_from_url(self.url)
+
+    def to_model(self) -> LinkedInJob:
+        return LinkedInJob(
+            url=self.url,
+            title=self.title,
+            company=Company(
+                name=self.company_name,
+                url=self.company_url,
+                logo=self.company_logo,
+                actively_hiring=self.actively_hiring,
+            ),
+            location=Location(full_location=self.location),
+            posted_time=self.posted_time,
+        )
+
+
+class Search(pydantic.BaseModel):
+    location: str = ...
+    keyword: str = ""
+    until: int = 86400
+    # the search page's filters, ex: {"f_WT": "2"} for the remote jobs only
+    filters: dict[str, str] = {}
+
+
+class SearchProgress(pydantic.BaseModel):
+    search: Search = ...
+    status: str = "pending"  # pending | running | done | failed
+    nb_jobs: int = 0  # new jobs found by this search
+    nb_duplicates: int = 0  # jobs already found by another search
+    error: str | None = None
@@ -0,0 +1,126 @@
+import lxml.html
+from bs4 import BeautifulSoup, Tag
+from lxml import etree
+
+from . import utils
+
+__all__ = ["parse_job_page", "parse_job_page_soup", "get_criterium"]
+
+description_class_name = "show-more-less-html__markup"
+criteria_class_name = "description__job-criteria-item"
+
+
+def _with_class(tag: str, class_name: str) -> str:
+    # matches the elements having the class, as bs4's `find_all(tag, attrs={"class": ...})` does
+    return f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+
+# same text as bs4's: the strings of those elements are not part of their parent's text
+_hidden_text_tags = {"script", "style", "template", "rt", "rp"}
+# and the strings made of white spaces only are collapsed, except in those elements
+_preserve_whitespace_tags = {"pre", "textarea"}
+_ascii_spaces = " \n\t\x0c\r"
+
+# the pages declaring their encoding can only be parsed as bytes, once encoded back
+_utf8_parser = lxml.html.HTMLParser(encoding="utf-8")
+
+_description_xpath = etree.XPath(f"({_with_class('div', description_class_name)})[1]")
+_criteria_xpath = etree.XPath(_with_class("li", criteria_class_name))
+
+
+def parse_job_page(html: str) -> tuple[str | None, dict[str, str]]:
+    """
+    Extract the description and the criteria of a LinkedIn job page
+    Only the needed elements are queried, with precompiled XPath on the lxml tree
+
+    :return: the description, None if not found, and the criteria
+    """
+    try:
+        tree = lxml.html.document_fromstring(html)
+    except ValueError:  # starts with an xml declaration, ex: <?xml version="1.0" encoding="utf-8"?>
+        tree = lxml.html.document_fromstring(html.encode(), parser=_utf8_parser)
+    except etree.ParserError:  # nothing to parse, ex: an empty page
+        return None, {}
+    return _description(tree), _criteria(tree)
+
+
+@utils.silent_log_error()
+def _description(tree: lxml.html.HtmlElement) -> str | None:
+    return _text(_description_xpath(tree)[0])
+
+
+@utils.silent_log_error(default={})
+def _criteria(tree: lxml.html.HtmlElement) -> dict[str, str]:
+    criteria = {}
+    for li in _criteria_xpath(tree):
+        criterium: str | None = None
+        value: str | None = None
+        for element in li.iterchildren():
+            if element.tag == "h3":
+                criterium = _text(element).strip(" \n")
+            if element.tag == "span":
+                value = _text(element).strip(" \n")
+        if criterium is not None and value is not None:
+            criteria[criterium] = value
+    return criteria
+
+
+def _text(element: lxml.html.HtmlElement) -> str:
+    """
+    The element's text, exactly as BeautifulSoup's `.text` gives it
+    """
+    parts = []
+
+    def add(text: str, preserve: bool):
+        if not preserve and text.strip(_ascii_spaces) == "":
+            text = "\n" if "\n" in text else " "
+        parts.append(text)
+
+    def walk(el: lxml.html.HtmlElement, preserve: bool):
+        preserve = preserve or el.tag in _preserve_whitespace_tags
+        if el.text:
+            add(el.text, preserve)
+        for child in el:
+            # comments are skipped, but not what follows them
+            if isinstance(child.tag, str) and child.tag not in _hidden_text_tags:
+                walk(child, preserve)
+            if child.tail:
+                add(child.tail, preserve)
+
+    walk(element, any(a.tag in _preserve_whitespace_tags for a in element.iterancestors()))
+    return "".join(parts)
+
+
+def parse_job_page_soup(html: str) -> tuple[str | None, dict[str, str]]:
+    """
+    Same as `parse_job_page`, building the whole BeautifulSoup tree of the page
+    """
+    soup = BeautifulSoup(html, "lxml")
+    return _soup_description(soup), _soup_criteria(soup)
+
+
+@utils.silent_log_error()
+def _soup_description(soup: BeautifulSoup) -> str | None:
+    return soup.find_all("div", attrs={"class": description_class_name})[0].text
+
+
+@utils.silent_log_error(default={})
+def _soup_criteria(soup: BeautifulSoup) -> dict[str, str]:
+    criteria = {}
+    for li in soup.find_all("li", attrs={"class": criteria_class_name}):
+        criterium, value = get_criterium(li)
+        if criterium is not None and value is not None:
+            criteria[criterium] = value
+    return criteria
+
+
+@utils.silent_log_error(default=(None, None))
+def get_criterium(li: Tag) -> (str | None, str | None):
+    criterium: str | None = None
+    value: str | None = None
+    for element in li:
+        if element.name == "h3":
+            criterium = element.text.strip(" \n")
+        if element.name == "span":
+            value = element.text.strip(" \n")
+    return criterium, value
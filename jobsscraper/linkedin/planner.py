@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Mapping, Sequence
+
+import aiohttp
+
+from . import metrics, models
+from .guest import GuestJobsScraper, linkedin_guest_search_url
+
+__all__ = ["SearchPlanner", "default_facets", "results_cap"]
+
+# LinkedIn doesn't list more than about that many jobs per search
+results_cap = 1000
+
+# The search filters splitting a search into searches not sharing any job, tried in that order,
+# with all their values. Every job has a workplace and a job type. The experience level (f_E) is
+# not one of them: the jobs without any level would be found by none of the split searches
+default_facets: dict[str, tuple[str, ...]] = {
+    # on-site, remote, hybrid
+    "f_WT": ("1", "2", "3"),
+    # full-time, part-time, contract, temporary, internship, volunteer, other
+    "f_JT": ("F", "P", "C", "T", "I", "V", "O"),
+}
+
+
+class SearchPlanner:
+    """
+    Split the searches finding more jobs than LinkedIn lists (`results_cap`) into smaller ones,
+    recursively, until all of them are listed entirely: into sub-locations first, then by facet
+
+    Whether a search is capped is probed with a single request to the guest search, for the last
+    jobs it can list. The time window (`until`, f_TPR) is never split: it only bounds how recent
+    the jobs are, so the jobs older than a narrower window can't be searched on their own
+    """
+
+    def __init__(
+            self,
+            *,
+            sub_locations: Mapping[str, Sequence[str]] | None = None,
+            facets: Mapping[str, Sequence[str]] = default_facets,
+            cap: int = results_cap,
+            concurrency: int = 4,
+            search_url: str = linkedin_guest_search_url,
+            page_size: int = 10,
+            nb_retries: int = 5,
+            retry_delay: float = 1,
+    ):
+        """
+        :param sub_locations: the locations covering each location, ex: {"Germany": ["Bavaria", "Berlin", ...]}.
+            Sub-locations can be split too, if listed. Jobs matching none of them are missed
+        :param facets: the search filters to split by, with all their values, see `default_facets`.
+            Every job must have one of the values of each of them, or it is missed
+        :param cap: how many jobs LinkedIn lists per search at most
+        :param concurrency: how many searches are probed at the same time
+        :param search_url: see `GuestJobsScraper`
+        :param page_size: see `GuestJobsScraper`
+        :param nb_retries: see `GuestJobsScraper`
+        :param retry_delay: see `GuestJobsScraper`
+        """
+        self._sub_locations = sub_locations or {}
+        self._facets = facets
+        self._cap = cap
+        self._concurrency = concurrency
+        self._scraper_kwargs = {
+            "search_url": search_url, "page_size": page_size, "nb_retries": nb_retries, "retry_delay": retry_delay,
+        }
+        self._page_size = page_size
+
+    async def plan(self, search: models.Search) -> list[models.Search]:
+        """
+        The searches listing together all the jobs found by `search`. Only itself if it is not capped
+        """
+        semaphore = asyncio.Semaphore(self._concurrency)
+        async with aiohttp.ClientSession() as session:
+            searches = await self.__plan(search, session, semaphore)
+        logging.info(f"Split the search into {len(searches)} searches: search={search}")
+        return searches
+
+    async def is_capped(self, search: models.Search, *, session: aiohttp.ClientSession | None = None) -> bool:
+        """
+        Whether LinkedIn lists as many jobs as it can for the search, and might find more
+        """
+        metrics.inc("jobsscraper_planner_probes_total")
+        scraper = GuestJobsScraper(search.location, **self._scraper_kwargs)
+        return await scraper.has_jobs_from(
+            self._cap - self._page_size, search.keyword, until=search.until, filters=search.filters, session=session)
+
+    async def __plan(
+            self,
+            search: models.Search,
+            session: aiohttp.ClientSession,
+            semaphore: asyncio.Semaphore
+    ) -> list[models.Search]:
+        async with semaphore:
+            capped = await self.is_capped(search, session=session)
+        if not capped:
+            return [search]
+        searches = self.__split(search)
+        if not searches:
+            logging.warning(f"The search can't be split, and finds more than {self._cap} jobs: search={search}")
+            return [search]
+        plans = await asyncio.gather(*(self.__plan(s, session, semaphore) for s in searches))
+        return [s for plan in plans for s in plan]
+
+    def __split(self, search: models.Search) -> list[models.Search]:
+        """
+        The searches finding together the same jobs as `search`, none if it can't be split
+        """
+        sub_locations = self._sub_locations.get(search.location)
+        if sub_locations:
+            return [search.model_copy(update={"location": location}) for location in sub_locations]
+        for name, values in self._facets.items():
+            if name not in search.filters:
+                return [search.model_copy(update={"filters": {**search.filters, name: value}}) for value in values]
+        return []
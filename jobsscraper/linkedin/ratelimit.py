@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+__all__ = ["TokenBucket", "AdaptiveRateLimiter", "parse_retry_after"]
+
+
+class TokenBucket:
+    """
+    Allow `rate` calls per second on average, and up to `burst` calls at once
+    The rate can be fractional: 0.5 means one call every 2 seconds
+    """
+
+    def __init__(self, rate: float, *, burst: int = 1):
+        """
+        :param rate: number of calls allowed per second
+        :param burst: how many calls can be made at once, after being idle
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        # no call is allowed before that
+        self._paused_until = 0.
+        # calls are allowed in the order they were asked for
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def _refill(self, now: float):
+        if now <= self._updated_at:
+            return  # paused
+        self._tokens = min(self._tokens + (now - self._updated_at) * self._rate, self._burst)
+        self._updated_at = now
+
+    async def acquire(self) -> float:
+        """
+        Wait until a call is allowed
+        :return: how long we waited, in seconds
+        """
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return time.monotonic() - start
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def pause(self, seconds: float):
+        """
+        Allow no call during the next `seconds`, and start again with an empty bucket
+        """
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.
+        self._updated_at = max(self._updated_at, self._paused_until)
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    A token bucket adapting its rate to the server (AIMD):
+    - the rate increases by `increase` calls per second after every successful call,
+      up to `max_rate`
+    - the rate is multiplied by `decrease` when the server says there are too many
+      requests (429), down to `min_rate`. All calls are paused for the time
+      the server asked for (Retry-After), or for `backoff` seconds
+
+    The calls that were already in flight when the rate decreased don't decrease it again
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            *,
+            burst: int = 1,
+            min_rate: float = 0.05,
+            max_rate: float | None = None,
+            increase: float = 0.05,
+            decrease: float = 0.5,
+            backoff: float = 1.,
+    ):
+        """
+        :param rate: number of calls allowed per second, to start with
+        :param burst: how many calls can be made at once, after being idle
+        :param min_rate: the rate never goes below that
+        :param max_rate: the rate never goes above that. Default to 4 times `rate`
+        :param increase: added to the rate after every successful call
+        :param decrease: factor applied to the rate after a 429
+        :param backoff: how long calls are paused after a 429 without Retry-After, in seconds
+        """
+        super().__init__(rate, burst=burst)
+        self._min_rate = min(min_rate, rate)
+        self._max_rate = max_rate if max_rate is not None else 4 * rate
+        self._increase = increase
+        self._decrease = decrease
+        self._backoff = backoff
+        self._decreased_at = 0.
+
+        self.nb_throttled = 0
+
+    def on_success(self):
+        """A call succeeded"""
+        self._refill(time.monotonic())
+        self._rate = min(self._rate + self._increase, self._max_rate)
+
+    def on_throttled(self, started_at: float, retry_after: float | None = None):
+        """
+        The server answered a call with a 429
+        :param started_at: when the call was allowed (`time.monotonic()`)
+        :param retry_after: how long the server asked to wait, in seconds
+        """
+        self.nb_throttled += 1
+        self.pause(retry_after if retry_after is not None else self._backoff)
+        if started_at < self._decreased_at:
+            return  # the rate already decreased since this call started
+        self._decreased_at = time.monotonic()
+        self._rate = max(self._rate * self._decrease, self._min_rate)
+        logging.debug(f"Too many requests: decreasing the rate to {self._rate:.2f} requests/s")
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Read the Retry-After header: either a number of seconds, or a date
+    :return: how long we should wait, in seconds. None if the header is missing or invalid
+    """
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.)
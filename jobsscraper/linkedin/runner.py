@@ -0,0 +1,202 @@
+import logging
+import multiprocessing
+import os
+import signal
+from multiprocessing.connection import Connection, wait
+from multiprocessing.process import BaseProcess
+from typing import Callable, Iterator
+
+from . import dedupe, drivers, models
+from .scraper import AllJobsScraper
+
+__all__ = ["SearchesRunner"]
+
+# how long a stopped worker has to quit its browser, before being killed
+_stop_timeout = 10
+
+
+class SearchesRunner:
+    """
+    Run several LinkedIn searches at the same time, on a pool of worker
+    processes. Each worker owns its own browser, and runs one search at a time.
+    The browser is started as soon as the worker starts, and reused by the
+    worker's searches (see `drivers.DriverPool`)
+
+    The jobs found by all searches are merged in a single iterator,
+    without duplicates. A search failing, or a worker crashing, doesn't stop
+    the other searches: the search is reported as failed
+
+    Every worker talks with the runner through its own pipe, so that
+    a crashing worker can't block the other ones
+    """
+
+    def __init__(
+            self,
+            searches: list[models.Search],
+            *,
+            workers: int | None = None,
+            headless: bool = True,
+            batch_extraction: bool = True,
+            lean: bool = False,
+            on_progress: Callable[[models.SearchProgress], None] | None = None,
+            mp_context: str | None = None,
+    ):
+        """
+        :param searches: the searches to run
+        :param workers: how many searches run at the same time. Default to the number of cpus
+        :param headless: if true, start headless browsers. Otherwise, they are headfull
+        :param batch_extraction: see `AllJobsScraper`
+        :param lean: see `drivers.create_driver`
+        :param on_progress: called with the search's progress every time it changes
+        :param mp_context: the multiprocessing start method. Default to the platform's one
+        """
+        self._searches = searches
+        self._nb_workers = max(min(workers or os.cpu_count() or 1, len(searches)), 1)
+        self._scraper_kwargs = {"batch_extraction": batch_extraction}
+        self._pool_kwargs = {"headless": headless, "lean": lean}
+        self._on_progress = on_progress
+        self._context = multiprocessing.get_context(mp_context)
+
+        self.progress = [models.SearchProgress(search=search) for search in searches]
+
+    def run(self) -> Iterator[models.LinkedInJob]:
+        """
+        Run all searches, and yield the found jobs as soon as they are found
+        """
+        pending = list(range(len(self._searches)))
+        # the worker's process and pipe, and the search it runs, by worker
+        workers: dict[BaseProcess, tuple[Connection, int | None]] = {}
+        seen = dedupe.DedupeIndex()
+        try:
+            for _ in range(self._nb_workers):
+                process, conn = self.__start_worker()
+                workers[process] = (conn, self.__send_next_search(conn, pending))
+
+            while workers:
+                conns = {conn: process for process, (conn, _) in workers.items()}
+                sentinels = {process.sentinel: process for process in workers}
+                # read what the workers sent before handling the ones that stopped
+                for ready in sorted(wait([*conns, *sentinels]), key=lambda r: r not in conns):
+                    # the worker sent something
+                    if ready in conns:
+                        process = conns[ready]
+                        try:
+                            kind, payload = ready.recv()
+                        except (EOFError, OSError):  # the worker died while sending
+                            self.__handle_dead_worker(process, workers, pending)
+                            continue
+                        progress = self.progress[workers[process][1]]
+                        match kind:
+                            case "job":
+                                if not seen.add(dedupe.dedupe_key(payload)):
+                                    progress.nb_duplicates += 1
+                                    continue
+                                progress.nb_jobs += 1
+                                self.__report(progress)
+                                yield payload
+                                continue
+                            case "done":
+                                progress.status = "done"
+                            case "error":
+                                self.__fail(progress, payload)
+                        self.__report(progress)
+                        workers[process] = (ready, self.__send_next_search(ready, pending))
+                    # the worker stopped, once everything it sent has been read
+                    elif sentinels[ready] in workers and not workers[sentinels[ready]][0].poll():
+                        self.__handle_dead_worker(sentinels[ready], workers, pending)
+        finally:
+            # the caller stopped early: the workers running a search quit their browser and stop (see `run_searches`).
+            # The other ones were told to stop already
+            for process, (_, index) in workers.items():
+                if index is not None and process.is_alive():
+                    process.terminate()
+            for process, (conn, _) in workers.items():
+                process.join(_stop_timeout)
+                if process.is_alive():
+                    logging.error(f"Killing the worker not stopped after {_stop_timeout}s: pid={process.pid}")
+                    process.kill()
+                    process.join()
+                conn.close()
+
+    def __start_worker(self) -> tuple[BaseProcess, Connection]:
+        conn, worker_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=run_searches, args=(worker_conn, self._scraper_kwargs, self._pool_kwargs), daemon=True)
+        process.start()
+        worker_conn.close()
+        return process, conn
+
+    def __send_next_search(self, conn: Connection, pending: list[int]) -> int | None:
+        """
+        Send the next pending search to the worker, or tell it to stop if there are none
+        :return: the sent search's index
+        """
+        if not pending:
+            conn.send(None)
+            return None
+        index = pending.pop(0)
+        conn.send(self._searches[index])
+        self.progress[index].status = "running"
+        self.__report(self.progress[index])
+        return index
+
+    def __handle_dead_worker(
+            self,
+            process: BaseProcess,
+            workers: dict[BaseProcess, tuple[Connection, int | None]],
+            pending: list[int]
+    ):
+        """
+        Fail the search the stopped worker was running, if any,
+        and replace it if some searches are still pending
+        """
+        process.join()
+        conn, index = workers.pop(process)
+        conn.close()
+        if index is not None:
+            progress = self.progress[index]
+            self.__fail(progress, f"worker died with exitcode={process.exitcode}")
+            self.__report(progress)
+        if pending:
+            process, conn = self.__start_worker()
+            workers[process] = (conn, self.__send_next_search(conn, pending))
+
+    @staticmethod
+    def __fail(progress: models.SearchProgress, error: str):
+        logging.error(f"Search failed: search={progress.search} error={error}")
+        progress.status = "failed"
+        progress.error = error
+
+    def __report(self, progress: models.SearchProgress):
+        if self._on_progress is not None:
+            self._on_progress(progress.model_copy())
+
+
+def run_searches(conn: Connection, scraper_kwargs: dict, pool_kwargs: dict):
+    """
+    Worker process: run the searches received from the runner one after the other,
+    until told to stop. Every found job is sent back to the runner, followed by
+    the search's outcome
+
+    Once terminated (SIGTERM), the worker quits its browser before stopping
+    """
+    previous_handler = signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    try:
+        with drivers.DriverPool(1, **pool_kwargs) as pool:
+            while (search := conn.recv()) is not None:
+                try:
+                    with pool.driver() as driver:
+                        scraper = AllJobsScraper(search.location, driver=driver, **scraper_kwargs)
+                        for job in scraper.scrap_jobs(
+                                keywords=search.keyword, until=search.until, filters=search.filters):
+                            conn.send(("job", job))
+                    conn.send(("done", None))
+                except Exception as e:
+                    conn.send(("error", repr(e)))
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+
+
+def _exit_on_sigterm(signum: int, _):
+    # leave the pool's context, quitting the browser, instead of dying at once
+    raise SystemExit(128 + signum)
@@ -1,21 +1,26 @@
 import asyncio
+import base64
+import json
 import logging
 import time
-from asyncio import Semaphore
-from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterator, Literal
 from urllib.parse import urlencode
 
 import aiohttp
-from bs4 import BeautifulSoup, Tag
-from selenium import webdriver
-from selenium.common import NoSuchElementException, ElementNotInteractableException
-from selenium.webdriver.chrome.webdriver import WebDriver, Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
 
-from . import models, utils
+try:
+    from selenium.common import NoSuchElementException, ElementNotInteractableException, WebDriverException
+    from selenium.webdriver.chrome.webdriver import WebDriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.remote.webelement import WebElement
+except ImportError:  # pragma: no cover - selenium is optional, and only needed by AllJobsScraper
+    pass
 
-__all__ = ["AllJobsScraper", "SingleJobScraper"]
+from . import cache, dedupe, drivers, metrics, models, parsers, ratelimit, store, utils
+
+__all__ = ["AllJobsScraper", "SingleJobScraper", "create_session", "job_from_card"]
 
 linkedin_search_url = "https://www.linkedin.com/jobs/search"
 
@@ -23,38 +28,252 @@ more_button_class_name = "infinite-scroller__show-more-button"
 jobs_results_class_name = "jobs-search__results-list"
 logo_class_name = "search-entity-media"
 benefits_class_name = "result-benefits__text"
+location_class_name = "job-search-card__location"
+posted_time_class_name = "job-search-card__listdate--new"
+# The search page fetches the next jobs as html fragments of job cards from there,
+# the same ones as served to `guest.GuestJobsScraper`
+captured_fragments_path = "/jobs-guest/jobs/api/seeMoreJobPostings/"
+
+# Attribute set on the job cards (the `li` elements of the jobs list) once they
+# have been scraped, so that only the new ones are fetched after each load
+seen_job_attribute = "data-jobsscraper-seen"
+new_jobs_css_selector = f":scope > li:not([{seen_job_attribute}])"
+
+# Mark the given job cards as seen, and tell which of them are new.
+# LinkedIn may re-render cards that have already been scraped: the job's URN
+# of every scraped card is remembered on the page side to filter them out,
+# and its url too, for the jobs captured from the network traffic
+mark_new_jobs_js = """
+const jobUrl = (li) => {
+    const link = li.querySelector("a");
+    return link ? link.href.split("?")[0] : null;
+};
+const jobKey = (li) => {
+    const urn = li.querySelector("[data-entity-urn]");
+    return urn ? urn.getAttribute("data-entity-urn") : jobUrl(li);
+};
+const markNewJobs = (cards, seenAttribute) => {
+    const seen = window.jobsscraperSeen = window.jobsscraperSeen || new Set();
+    const captured = window.jobsscraperCaptured || new Set();
+    return cards.map((li) => {
+        li.setAttribute(seenAttribute, "");
+        const key = jobKey(li);
+        if (key === null) return true;
+        if (seen.has(key)) return false;
+        seen.add(key);
+        const url = jobUrl(li);
+        if (url !== null) seen.add(url);
+        // already scraped from the network traffic, see `mark_captured_jobs_script`
+        return !captured.has(jobUrl(li));
+    });
+};
+"""
+
+# Called with the options and the list of new job cards found by the WebDriver
+mark_jobs_script = mark_new_jobs_js + """
+return markNewJobs(arguments[1], arguments[0].seen);
+"""
+
+# Extract the fields of every new job card in a single WebDriver round trip.
+# Returns null if the jobs list is not loaded yet.
+# Each card is returned as a plain object, see `job_from_card`
+extract_jobs_script = mark_new_jobs_js + """
+const {jobsList, seen, logo, benefits, location, postedTime, prune} = arguments[0];
+const list = document.getElementsByClassName(jobsList)[0];
+if (list === undefined) return null;
+const text = (element) => element ? element.innerText : null;
+const href = (element) => element && element.hasAttribute("href") ? element.href : null;
+const cards = Array.from(list.querySelectorAll(`:scope > li:not([${seen}])`));
+const isNew = markNewJobs(cards, seen);
+const extracted = cards.filter((_, i) => isNew[i]).map((li) => {
+    const company = li.querySelector("h4");
+    const companyLink = company ? company.querySelector("a") : null;
+    const logoContainer = li.getElementsByClassName(logo)[0];
+    const logoLink = logoContainer ? logoContainer.querySelector("a") : null;
+    const posted = li.getElementsByClassName(postedTime)[0];
+    return {
+        url: href(li.querySelector("a")),
+        title: text(li.querySelector("h3")),
+        company_name: text(companyLink),
+        company_url: href(companyLink),
+        logo: logoLink ? logoLink.getAttribute("data-ghost-url") : null,
+        benefit: text(li.getElementsByClassName(benefits)[0]),
+        location: text(li.getElementsByClassName(location)[0]),
+        posted_time: posted ? posted.getAttribute("datetime") : null,
+    };
+});
+if (prune) cards.forEach((li) => li.replaceChildren());
+return extracted;
+"""
+
+# Empty the given job cards, already scraped: only their `li` element is kept, so that
+# the jobs list keeps its length, which LinkedIn counts to request the next jobs
+prune_jobs_script = """
+arguments[0].forEach((li) => li.replaceChildren());
+"""
+
+# The keys of the job cards scraped on the page, see `mark_new_jobs_js`
+seen_keys_script = """
+return Array.from(window.jobsscraperSeen || []);
+"""
+
+# Remember the given keys as the ones of job cards already scraped, see `mark_new_jobs_js`
+seed_seen_keys_script = """
+window.jobsscraperSeen = new Set(arguments[0]);
+"""
+
+# Mark and empty the job cards shown again, already scraped by a previous browser.
+# Returns how many new job cards are shown, or null if the jobs list is not loaded yet
+skip_known_jobs_script = mark_new_jobs_js + """
+const {jobsList, seen} = arguments[0];
+const list = document.getElementsByClassName(jobsList)[0];
+if (list === undefined) return null;
+const known = window.jobsscraperSeen || new Set();
+let nbNew = 0;
+list.querySelectorAll(`:scope > li:not([${seen}])`).forEach((li) => {
+    const key = jobKey(li);
+    if (key === null || !known.has(key)) {
+        nbNew += 1;
+        return;
+    }
+    li.setAttribute(seen, "");
+    li.replaceChildren();
+});
+return nbNew;
+"""
+
+# Remember the urls (without query) of the given job cards, scraped from the network traffic,
+# and mark the ones shown as seen. Returns which of the given job cards are new, neither captured
+# nor extracted from the page before, and how many new job cards are shown, not captured
+# (null if the jobs list is not loaded yet)
+mark_captured_jobs_script = mark_new_jobs_js + """
+const {jobsList, seen, prune} = arguments[0];
+const captured = window.jobsscraperCaptured = window.jobsscraperCaptured || new Set();
+const scraped = window.jobsscraperSeen = window.jobsscraperSeen || new Set();
+const isNew = arguments[1].map((url) => {
+    if (url === null) return true;
+    if (captured.has(url) || scraped.has(url)) return false;
+    captured.add(url);
+    return true;
+});
+const list = document.getElementsByClassName(jobsList)[0];
+if (list === undefined) return {new: isNew, left: null};
+const cards = Array.from(list.querySelectorAll(`:scope > li:not([${seen}])`));
+const shown = cards.filter((li) => captured.has(jobUrl(li)));
+markNewJobs(shown, seen);
+if (prune) shown.forEach((li) => li.replaceChildren());
+return {new: isNew, left: cards.length - shown.length};
+"""
+
+# Resolve as soon as the jobs list shows new job cards, or with false
+# after the given timeout (in milliseconds)
+wait_new_jobs_script = """
+const [{jobsList, seen}, timeout, done] = arguments;
+const selector = `.${jobsList} > li:not([${seen}])`;
+if (document.querySelector(selector) !== null) return done(true);
+let timer = null;
+const observer = new MutationObserver(() => {
+    if (document.querySelector(selector) !== null) finish(true);
+});
+const finish = (found) => {
+    observer.disconnect();
+    clearTimeout(timer);
+    done(found);
+};
+timer = setTimeout(() => finish(false), timeout);
+observer.observe(document.body, {childList: true, subtree: true});
+"""
 
 
 class AllJobsScraper:
-    # how long we try to scrap new jobs after
-    # scrolling down or clicking on More Jobs button
+    # how long we wait for new jobs after scrolling down or clicking on
+    # More Jobs button. We stop waiting as soon as new jobs are shown,
+    # and the timeout adapts to the observed loading time of the jobs,
+    # from `_min_scraping_jobs_timeout` to `_scraping_jobs_timeout`
     _scraping_jobs_timeout = 6
-
-    def __init__(self, location: str, *, headless: bool = True):
-        # location can be a country, state or city
-        # ex: Germany | Munich | Munich, Bavaria, Germany
+    _min_scraping_jobs_timeout = 1
+    # how many loads of more jobs between two measures of the browser's memory, see `max_memory_mb`
+    _memory_check_every = 10
+
+    def __init__(
+            self,
+            location: str,
+            *,
+            headless: bool = True,
+            batch_extraction: bool = True,
+            lean: bool = False,
+            driver: "WebDriver | None" = None,
+            records: bool = False,
+            prune: bool = False,
+            max_memory_mb: int | None = None,
+            capture: bool = False,
+    ):
+        """
+        :param location: can be a country, state or city
+            ex: Germany | Munich | Munich, Bavaria, Germany
+        :param headless: if true, start a headless browser. Otherwise, it is headfull
+        :param batch_extraction: if true, extract all new jobs with a single javascript call
+            per load, instead of querying every job's fields one by one through the WebDriver
+        :param lean: if true, start a browser not downloading images, fonts and media,
+            see `drivers.create_driver`
+        :param driver: use this browser instead of starting a new one,
+            for instance one borrowed from a `drivers.DriverPool`. It is not quit on `close`
+        :param records: if true, the jobs extracted in batch are lightweight `models.JobRecord`,
+            instead of `models.LinkedInJob`
+        :param prune: if true, the job cards are emptied once scraped, so that the page doesn't grow
+            with the number of jobs scraped: the browser's memory and the page's queries stay flat
+        :param max_memory_mb: replace the browser by a new one once its memory grows past that,
+            during a search (needs psutil). The new browser skips the jobs scraped by the previous one.
+            Only applies to the browsers started by this scraper
+        :param capture: if true, parse the job cards the page fetches from the browser's network traffic,
+            instead of extracting them from the page. The page is only queried for the ones not captured,
+            the first ones for instance. Needs the batch extraction, and a browser capturing its traffic:
+            see `drivers.create_driver`. Otherwise, the jobs are extracted from the page
+        """
+        if capture and not batch_extraction:
+            raise ValueError("The capture needs the batch extraction")
         self._location = location
-
-        # The index of the job that has been last scraped
+        self._batch_extraction = batch_extraction
+        self._records = records
+        self._prune = prune
+        self._max_memory = max_memory_mb * 1024 ** 2 if max_memory_mb is not None else None
+        self._headless = headless
+        self._lean = lean
+        self._capture = capture
+        # the requests of job cards' fragments whose response is not fully received yet
+        self._pending_fragments: set[str] = set()
+
+        # How many jobs have been scraped until now
         # Since LinkedIn has an infinite scrolling, this is important
-        # to remember where we are with the scraping
+        # to remember where we are with the scraping. Already scraped
+        # jobs are marked on the page side, see `seen_job_attribute`
         self._job_index: int = 0
 
-        self._driver = self.__create_driver(headless=headless)
+        # How long we wait for new jobs, see `_scraping_jobs_timeout`
+        # It is reset on every search
+        self._load_timeout: utils.AdaptiveTimeout | None = None
 
-    @staticmethod
-    def __create_driver(headless: bool = True) -> WebDriver:
+        self._owns_driver = driver is None
+        self._driver = driver if driver is not None else \
+            drivers.create_driver(headless=headless, lean=lean, capture=capture)
+
+    def close(self):
         """
-        Create the WebDriver used to execute command on the Chrome browser
-        :param headless: if true, start a headless browser. Otherwise, it is headfull
+        Quit the browser, if it has been started by this scraper
         """
-        options = Options()
-        if headless:
-            options.add_argument("--headless=new")
-        return webdriver.Chrome(options=options)
+        if self._owns_driver:
+            self._driver.quit()
 
     @utils.take_screenshot_on_error
-    def scrap_jobs(self, keywords: str = "", *, until: int = -1) -> Iterator[models.LinkedInJob]:
+    def scrap_jobs(
+            self,
+            keywords: str = "",
+            *,
+            until: int = -1,
+            seen_store: store.SeenJobsStore | None = None,
+            stop_after_seen: int | None = None,
+            filters: dict[str, str] | None = None,
+    ) -> Iterator[models.LinkedInJob]:
         """
         Go through the LinkedIn search page and scrap all the jobs there
         Not everything is shown, one need to scroll down or click on "Load More"
@@ -62,6 +281,11 @@ class AllJobsScraper:
 
         :param keywords: search using those keywords. If empty, search for all jobs
         :param until: How long in the past we should scrap jobs. -1 means no limit
+        :param seen_store: skip the jobs found by the previous runs, and remember the new ones
+        :param stop_after_seen: stop the search once that many jobs in a row were already seen,
+            the next ones having been found by the previous runs too.
+            If the previous run didn't finish, the search doesn't stop before where it went
+        :param filters: the search page's filters, ex: {"f_WT": "2"} for the remote jobs only
         :return: An iterator of LinkedIn Jobs
         """
         logging.info(f"Start scrapping jobs from LinkedIn: location={self._location}")
@@ -72,33 +296,112 @@ class AllJobsScraper:
             params["f_TPR"] = until
         if keywords != "":
             params["keywords"] = keywords
+        params.update(filters or {})
         url = f"{linkedin_search_url}?{urlencode(params)}"
 
+        # where the previous run stopped, if it didn't finish
+        key = store.search_key(self._location, keywords, until, filters)
+        checkpoint = seen_store.checkpoint(key) if seen_store is not None else None
+        resume_position = checkpoint.position if checkpoint is not None and not checkpoint.done else 0
+        if resume_position > 0:
+            logging.info(f"Resuming the search after {resume_position} jobs: location={self._location}")
+
         # navigate to the page
+        self._load_timeout = utils.AdaptiveTimeout(
+            min(self._min_scraping_jobs_timeout, self._scraping_jobs_timeout), self._scraping_jobs_timeout)
+        self._driver.set_script_timeout(self._scraping_jobs_timeout + 1)
         self._driver.get(url)
+        metrics.inc("jobsscraper_page_loads_total", kind="search")
 
         # Start scraping
         jobs = self.__scrap_new_jobs()
         nb_tries = 0
         counter = 0
+        # how many jobs of the search results have been walked through
+        position = 0
+        nb_seen_in_a_row = 0
+        nb_loads = 0
         while nb_tries < 10:
             for job in jobs:
+                position += 1
+                nb_tries = 0  # reset it since we were able to fetch jobs
+                job_id = dedupe.dedupe_key(job)
+                if seen_store is not None and job_id in seen_store:
+                    nb_seen_in_a_row += 1
+                    continue
+                nb_seen_in_a_row = 0
                 yield job
                 counter += 1
-                nb_tries = 0  # reset it since we were able to fetch jobs
+                # the job is seen once the caller asked for the next one
+                if seen_store is not None:
+                    seen_store.add(job_id)
+                    seen_store.save_checkpoint(key, max(position, resume_position), done=False)
+            if (seen_store is not None and stop_after_seen is not None
+                    and nb_seen_in_a_row >= stop_after_seen and position > resume_position):
+                logging.info(f"Found {nb_seen_in_a_row} already seen jobs in a row, stopping the search")
+                break
+            nb_loads += 1
+            if self.__needs_recycling(nb_loads):
+                self.__recycle_driver(url)
             # scroll down/click button to load more jobs
-            if not self.__load_more_jobs():
+            elif not self.__load_more_jobs():
                 break
+            else:
+                metrics.inc("jobsscraper_page_loads_total", kind="more")
             jobs = self.__scrap_new_jobs()
             if len(jobs) == 0:
                 logging.debug("No jobs found. Retrying ...")
                 nb_tries += 1
-                time.sleep(1)
                 continue
             logging.info(f"Scrapped {counter} jobs until now ...")
 
+        if seen_store is not None:
+            seen_store.save_checkpoint(key, position, done=True)
         logging.info(f"Finished scrapping jobs from LinkedIn: country={self._location}")
 
+    def __needs_recycling(self, nb_loads: int) -> bool:
+        """
+        Whether the browser uses more memory than allowed.
+        It is measured every `_memory_check_every` loads only
+        """
+        if self._max_memory is None or not self._owns_driver or nb_loads % self._memory_check_every != 0:
+            return False
+        memory = drivers.driver_memory(self._driver)
+        return memory is not None and memory > self._max_memory
+
+    def __recycle_driver(self, url: str):
+        """
+        Replace the browser by a new one, and walk the search results again up to where
+        the previous one was: the jobs it scraped are emptied without being scraped again
+        """
+        logging.info(f"Recycling the browser after {self._job_index} jobs: location={self._location}")
+        metrics.inc("jobsscraper_driver_recycles_total")
+        seen_keys = self._driver.execute_script(seen_keys_script)
+        self._driver.quit()
+        self._driver = drivers.create_driver(headless=self._headless, lean=self._lean, capture=self._capture)
+        self._driver.set_script_timeout(self._scraping_jobs_timeout + 1)
+        self._driver.get(url)
+        metrics.inc("jobsscraper_page_loads_total", kind="search")
+        self._driver.execute_script(seed_seen_keys_script, seen_keys)
+
+        options = {"jobsList": jobs_results_class_name, "seen": seen_job_attribute}
+        nb_tries = 0
+        while nb_tries < 10:
+            if not self.__wait_for_new_jobs(self._load_timeout.timeout):
+                self._load_timeout.miss()
+                nb_tries += 1
+            elif self._driver.execute_script(skip_known_jobs_script, options):
+                break  # new jobs are shown
+            else:
+                nb_tries = 0
+            if not self.__load_more_jobs():
+                break
+            metrics.inc("jobsscraper_page_loads_total", kind="more")
+        if self._capture:
+            # the known jobs fetched again
+            self._pending_fragments.clear()
+            self._driver.get_log("performance")
+
     def __load_more_jobs(self) -> bool:
         """
         LinkedIn has 2 solutions to load more jobs:
@@ -126,34 +429,139 @@ class AllJobsScraper:
         and we need to fetch the new jobs. We might need to wait until it the content is fully
         loaded
 
-        :param driver: Chrome driver
-
         :return: the list of new found jobs
         """
-        # Find all list elements. Since we just scrolled down, retry several times
-        jobs: list[WebElement] = []
+        if self._capture:
+            find_new_jobs = self.__find_captured_job_cards
+            scrap_job = partial(job_from_card, record=self._records)
+        elif self._batch_extraction:
+            find_new_jobs = self.__find_new_job_cards
+            scrap_job = partial(job_from_card, record=self._records)
+        else:
+            find_new_jobs, scrap_job = self.__find_new_job_elements, self.__scrap_single_job
+
+        # Wait for the new jobs. Since we just scrolled down, they might not be loaded yet
+        jobs: list = []
         start = time.time()
-        while time.time() - start < self._scraping_jobs_timeout and len(jobs) == 0:
+        with metrics.timer("jobsscraper_load_wait_seconds"):
+            shown = self.__wait_for_new_jobs(self._load_timeout.timeout)
+        if not shown:
+            # LinkedIn might just be slower for now: wait longer next time
+            self._load_timeout.miss()
+        else:
+            self._load_timeout.observe(time.time() - start)
             try:
-                jobs_list = self._driver.find_element(By.CLASS_NAME, jobs_results_class_name)
-                jobs = jobs_list.find_elements(By.TAG_NAME, "li")[self._job_index:]
+                jobs = find_new_jobs()
             except NoSuchElementException:
-                pass  # continue: it might load later
-            time.sleep(0.2)  # sleep a bit
+                pass  # the jobs list has been re-rendered in the meantime
 
         self._job_index += len(jobs)
+        extraction = "capture" if self._capture else "batch" if self._batch_extraction else "webdriver"
+        metrics.inc("jobsscraper_cards_extracted_total", len(jobs), extraction=extraction)
 
         # format found jobs
         res: list[models.LinkedInJob] = []
         for job in jobs:
-            linkedin_job = self.__scrap_single_job(job)
+            linkedin_job = scrap_job(job)
             if linkedin_job is None:
                 continue
             res.append(linkedin_job)
+        if self._prune and not self._batch_extraction and jobs:
+            # emptied by the extraction itself in batch
+            self._driver.execute_script(prune_jobs_script, jobs)
         return res
 
+    def __wait_for_new_jobs(self, timeout: float) -> bool:
+        """
+        Wait until the page shows new jobs, for at most `timeout` seconds
+
+        :return: false if no new jobs were shown before the timeout
+        """
+        return self._driver.execute_async_script(
+            wait_new_jobs_script, {"jobsList": jobs_results_class_name, "seen": seen_job_attribute}, timeout * 1000)
+
+    def __find_new_job_elements(self) -> list["WebElement"]:
+        """
+        Find the jobs' list elements that have not been scraped yet,
+        and mark them as seen
+        """
+        jobs_list = self._driver.find_element(By.CLASS_NAME, jobs_results_class_name)
+        jobs = jobs_list.find_elements(By.CSS_SELECTOR, new_jobs_css_selector)
+        if len(jobs) == 0:
+            return jobs
+        is_new = self._driver.execute_script(mark_jobs_script, {"seen": seen_job_attribute}, jobs)
+        return [job for job, new in zip(jobs, is_new) if new]
+
+    def __find_new_job_cards(self) -> list[dict[str, str | None]]:
+        """
+        Extract the fields of the jobs that have not been scraped yet,
+        with a single call to the browser
+        """
+        return self._driver.execute_script(extract_jobs_script, {
+            "jobsList": jobs_results_class_name,
+            "seen": seen_job_attribute,
+            "logo": logo_class_name,
+            "benefits": benefits_class_name,
+            "location": location_class_name,
+            "postedTime": posted_time_class_name,
+            "prune": self._prune,
+        }) or []
+
+    def __find_captured_job_cards(self) -> list[dict[str, str | None]]:
+        """
+        The job cards the page fetched since the last call, parsed from the network traffic,
+        then the new ones shown but not captured, extracted from the page
+        """
+        cards = self.__captured_job_cards()
+        marked = self._driver.execute_script(mark_captured_jobs_script, {
+            "jobsList": jobs_results_class_name,
+            "seen": seen_job_attribute,
+            "prune": self._prune,
+        }, [card["url"].split("?")[0] if card["url"] is not None else None for card in cards])
+        # the jobs already scraped, from the page or from another fragment, are skipped
+        cards = [card for card, new in zip(cards, marked["new"]) if new]
+        if marked["left"]:
+            metrics.inc("jobsscraper_capture_fallbacks_total")
+            cards += self.__find_new_job_cards()
+        return cards
+
+    def __captured_job_cards(self) -> list[dict[str, str | None]]:
+        """
+        Parse the job cards' fragments fetched by the page, from the browser's performance log.
+        Their responses are only read once fully received
+        """
+        from .guest import parse_job_cards  # guest depends on this module
+
+        try:
+            entries = self._driver.get_log("performance")
+        except WebDriverException:
+            logging.warning("The browser doesn't capture its network traffic, extracting the jobs from the page")
+            self._capture = False
+            return []
+        cards = []
+        for entry in entries:
+            # most events are not about the fragments: skip them before decoding
+            if "Network.responseReceived" not in entry["message"] and "Network.loadingFinished" not in entry["message"]:
+                continue
+            event = json.loads(entry["message"])["message"]
+            params = event["params"]
+            if event["method"] == "Network.responseReceived":
+                response = params["response"]
+                if captured_fragments_path in response["url"] and response["status"] == 200:
+                    self._pending_fragments.add(params["requestId"])
+            elif event["method"] == "Network.loadingFinished" and params["requestId"] in self._pending_fragments:
+                self._pending_fragments.discard(params["requestId"])
+                try:
+                    body = self._driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+                except WebDriverException:  # not kept by the browser: the page is queried instead
+                    metrics.inc("jobsscraper_capture_failures_total")
+                    continue
+                html = base64.b64decode(body["body"]).decode() if body["base64Encoded"] else body["body"]
+                cards += parse_job_cards(html)
+        return cards
+
     @utils.silent_log_error()
-    def __scrap_single_job(self, job: WebElement) -> models.LinkedInJob:
+    def __scrap_single_job(self, job: "WebElement") -> models.LinkedInJob:
         return models.LinkedInJob(
             url=self.__get_job_link(job),
             title=self.__get_job_title(job),
@@ -163,15 +571,18 @@ class AllJobsScraper:
         )
 
     @staticmethod
-    def __get_job_link(job: WebElement) -> str:
+    @metrics.count_errors("jobsscraper_extraction_failures_total", field="url")
+    def __get_job_link(job: "WebElement") -> str:
         return job.find_element(By.TAG_NAME, "a").get_attribute("href")
 
     @staticmethod
-    def __get_job_title(job: WebElement) -> str:
+    @metrics.count_errors("jobsscraper_extraction_failures_total", field="title")
+    def __get_job_title(job: "WebElement") -> str:
         return job.find_element(By.TAG_NAME, "h3").text.strip()
 
     @staticmethod
-    def __get_job_company(job: WebElement) -> models.Company:
+    @metrics.count_errors("jobsscraper_extraction_failures_total", field="company_name")
+    def __get_job_company(job: "WebElement") -> models.Company:
         link = job.find_element(By.TAG_NAME, "h4").find_element(By.TAG_NAME, "a")
         try:
             logo = job.find_element(
@@ -192,15 +603,104 @@ class AllJobsScraper:
         )
 
     @staticmethod
-    def __get_job_location(job: WebElement) -> models.Location:
-        loc = job.find_element(By.CLASS_NAME, "job-search-card__location").text.strip()
+    @metrics.count_errors("jobsscraper_extraction_failures_total", field="location")
+    def __get_job_location(job: "WebElement") -> models.Location:
+        loc = job.find_element(By.CLASS_NAME, location_class_name).text.strip()
         return models.Location(full_location=loc)
 
     @staticmethod
     @utils.silent_log_error(log_level=logging.DEBUG)
-    def __get_job_posted_time(job: WebElement) -> str:
-        return job.find_element(
-            By.CLASS_NAME, "job-search-card__listdate--new").get_attribute("datetime")
+    def __get_job_posted_time(job: "WebElement") -> str | None:
+        # only the recent jobs have one: not an extraction failure, as with the batch extraction
+        try:
+            return job.find_element(By.CLASS_NAME, posted_time_class_name).get_attribute("datetime")
+        except NoSuchElementException:
+            return None
+
+
+# the fields a job can't be built without
+mandatory_card_fields = ("url", "title", "company_name", "location")
+
+
+@utils.silent_log_error()
+def job_from_card(
+        card: dict[str, str | None],
+        *,
+        record: bool = False
+) -> models.LinkedInJob | models.JobRecord | None:
+    """
+    Build the job out of the fields extracted by `extract_jobs_script`.
+    The same rules as for the WebDriver's extraction apply
+
+    :param record: if true, build a lightweight `models.JobRecord` instead of a `models.LinkedInJob`
+    """
+    try:
+        benefit = card["benefit"]
+        actively_hiring = benefit.strip(' "').lower() == "actively hiring" if benefit is not None else None
+        if not record:
+            return models.LinkedInJob(
+                url=card["url"],
+                title=card["title"].strip(),
+                company=models.Company(
+                    name=card["company_name"].strip(),
+                    url=card["company_url"],
+                    logo=card["logo"],
+                    actively_hiring=actively_hiring,
+                ),
+                location=models.Location(full_location=card["location"].strip()),
+                posted_time=card["posted_time"],
+            )
+
+        # not validated: the mandatory fields are checked here
+        if card["url"] is None:
+            raise ValueError("The job has no url")
+        return models.JobRecord(
+            url=card["url"],
+            title=card["title"].strip(),
+            company_name=card["company_name"].strip(),
+            company_url=card["company_url"],
+            company_logo=card["logo"],
+            actively_hiring=actively_hiring,
+            location=card["location"].strip(),
+            posted_time=card["posted_time"],
+        )
+    except Exception:
+        missing = [field for field in mandatory_card_fields if card.get(field) is None]
+        for field in missing or ["unknown"]:
+            metrics.inc("jobsscraper_extraction_failures_total", field=field)
+        raise
+
+
+def create_session(
+        *,
+        limit: int = 100,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int | None = 300,
+        timeout: float | None = 30,
+) -> aiohttp.ClientSession:
+    """
+    Create the http session requesting the job pages, and its pool of connections
+    It must be created, used and closed within the same event loop.
+    The responses are compressed (gzip, deflate), and decompressed by aiohttp
+
+    :param limit: the maximal number of connections open at once
+    :param limit_per_host: the maximal number of connections open at once to the same host
+    :param keepalive_timeout: how long an idle connection is kept open for the next requests, in seconds
+    :param dns_cache_ttl: how long the resolved addresses are cached, in seconds. None to cache them for ever
+    :param timeout: the maximal duration of a request, in seconds. None for no limit
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            ssl=False,
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=dns_cache_ttl,
+        ),
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    )
 
 
 class SingleJobScraper:
@@ -208,86 +708,159 @@ class SingleJobScraper:
     Scrap LinkedIn single job pages
     Control the number of request per second to the linkedin servers
     Also, has a retry mechanism in case 429 error codes are caught
+
+    Close it once done, to close its connections:
+
+        async with SingleJobScraper() as scraper:
+            await scraper.scrap(job)
     """
 
-    def __init__(self, *, nb_retries: int = 5, rqs: int = 1):
+    def __init__(
+            self,
+            *,
+            nb_retries: int = 5,
+            rqs: float = 1,
+            burst: int = 1,
+            adaptive: bool = True,
+            max_rqs: float | None = None,
+            backoff: float = 1,
+            parser: Literal["lxml", "bs4"] = "lxml",
+            parse_workers: int = 0,
+            response_cache: cache.ResponseCache | None = None,
+            session: aiohttp.ClientSession | None = None,
+            limit: int = 100,
+            limit_per_host: int = 8,
+            keepalive_timeout: float = 30,
+            dns_cache_ttl: int | None = 300,
+            timeout: float | None = 30,
+    ):
         """
         :param nb_retries: How many times we retry an http call in case of a 429 error code
-        :param rqs: number of requests allowed per second
+        :param rqs: number of requests allowed per second. Can be fractional, ex: 0.5
+        :param burst: how many requests can be made at once, after being idle
+        :param adaptive: if true, the number of requests per second adapts to the 429 error codes
+            we get: it starts at `rqs`, and goes up to `max_rqs` as long as LinkedIn accepts it
+        :param max_rqs: the maximal number of requests per second. Default to 4 times `rqs`
+        :param backoff: how long we pause the requests after a 429 error code, in seconds,
+            unless LinkedIn tells how long to wait (Retry-After header)
+        :param parser: "lxml" queries only the needed elements of the page, "bs4" builds
+            the whole BeautifulSoup tree of the page (slower). Both extract the same data
+        :param parse_workers: if positive, the pages are parsed on a pool of that many processes,
+            instead of blocking the event loop while parsing
+        :param response_cache: serve the pages from this cache when they are fresh enough,
+            or when the server says they didn't change
+        :param session: request the pages with this session, for instance one shared by several
+            scrapers (see `create_session`). It is not closed on `close`. By default, the scraper
+            creates its own session on its first request, with the following parameters
+        :param limit: see `create_session`
+        :param limit_per_host: see `create_session`
+        :param keepalive_timeout: see `create_session`
+        :param dns_cache_ttl: see `create_session`
+        :param timeout: see `create_session`
         """
-        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
-            ssl=False,
-        ))
+        if parser not in ("lxml", "bs4"):
+            raise ValueError(f"Unknown parser={parser}")
+        self._owns_session = session is None
+        self._session = session
+        self._session_options = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "dns_cache_ttl": dns_cache_ttl,
+            "timeout": timeout,
+        }
 
         self._nb_retries = nb_retries
-        self._sem = Semaphore(rqs)
+        if adaptive:
+            self._limiter = ratelimit.AdaptiveRateLimiter(rqs, burst=burst, max_rate=max_rqs, backoff=backoff)
+        else:
+            self._limiter = ratelimit.AdaptiveRateLimiter(
+                rqs, burst=burst, min_rate=rqs, max_rate=rqs, increase=0, decrease=1, backoff=backoff)
+        self._parser = parser
+        self._parse = parsers.parse_job_page if parser == "lxml" else parsers.parse_job_page_soup
+        self._parse_executor = ProcessPoolExecutor(parse_workers) if parse_workers > 0 else None
+        self._cache = response_cache
 
     def __del__(self):
-        self._session._connector._close()
+        if not hasattr(self, "_parse_executor"):
+            return  # failed to initialize
+        if self._owns_session and self._session is not None and not self._session.closed:
+            logging.warning("SingleJobScraper not closed: use `async with SingleJobScraper()`, or `await close()`")
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> "SingleJobScraper":
+        return self
 
-    async def __request(self, url: str, *, retry_no: int = 0) -> str:
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def close(self):
         """
-        Get the html page by requesting the URL
-        Retry if 429 status code
+        Close the http session if it has been created by this scraper, and stop the parsing processes
         """
-        # acquire the right to make a call depending on how many per second we can do
-        await self.__acquire_call()
-        status: int = -1
-        try:
-            async with self._session.get(url) as resp:
-                status = resp.status
-                print(status)
-                resp.raise_for_status()
-                return await resp.text()
-        except aiohttp.ClientError:
-            if status == 429:
-                if retry_no >= self._nb_retries:
-                    logging.exception(f"Too many requests, even after {retry_no} retries")
-                    raise
-                return await self.__request(url, retry_no=retry_no + 1)
-            logging.exception(f"Failed with status={status}")
-            raise
-
-    async def __acquire_call(self):
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(wait=False, cancel_futures=True)
+
+    def __get_session(self) -> aiohttp.ClientSession:
+        # created on the first request, within the event loop using it
+        if self._session is None:
+            self._session = create_session(**self._session_options)
+        return self._session
+
+    async def __request(self, url: str) -> str:
         """
-        acquire a call during 1sec
-        releasing the semaphore is done in background
-        independently on the status of any other tasks
+        Get the html page by requesting the URL, unless it is cached
+        Retry if 429 status code
         """
-        await self._sem.acquire()
-
-        async def release():
-            await asyncio.sleep(1)
-            self._sem.release()
-
-        asyncio.ensure_future(asyncio.shield(release()))
+        cached = self._cache.get(url) if self._cache is not None else None
+        if cached is not None and cached.fresh:
+            metrics.inc("jobsscraper_cache_total", result="hit")
+            return cached.body
+        headers = cached.revalidation_headers() if cached is not None else {}
+
+        for retry_no in range(self._nb_retries + 1):
+            # acquire the right to make a call depending on how many per second we can do
+            metrics.observe("jobsscraper_limiter_wait_seconds", await self._limiter.acquire())
+            started_at = time.monotonic()
+            with metrics.timer("jobsscraper_network_seconds"):
+                async with self.__get_session().get(url, headers=headers) as resp:
+                    metrics.inc("jobsscraper_http_responses_total", status=resp.status)
+                    if resp.status == 429:
+                        metrics.inc("jobsscraper_throttled_total")
+                        self._limiter.on_throttled(
+                            started_at, ratelimit.parse_retry_after(resp.headers.get("Retry-After")))
+                        if retry_no < self._nb_retries:
+                            logging.debug(f"Too many requests: retrying ... (url={url}, retry={retry_no})")
+                            metrics.inc("jobsscraper_retries_total")
+                            continue
+                        logging.error(f"Too many requests, even after {retry_no} retries")
+                    elif resp.status == 304 and cached is not None:  # the page didn't change
+                        self._limiter.on_success()
+                        self._cache.revalidated(url)
+                        metrics.inc("jobsscraper_cache_total", result="revalidated")
+                        return cached.body
+                    elif resp.status >= 400:
+                        logging.error(f"Failed with status={resp.status}")
+                    resp.raise_for_status()
+                    self._limiter.on_success()
+                    html = await resp.text()
+            if self._cache is not None:
+                self._cache.put(
+                    url, html, etag=resp.headers.get("ETag"), last_modified=resp.headers.get("Last-Modified"))
+            return html
 
     async def scrap(self, data: models.LinkedInJob):
         html = await self.__request(data.url)
-        soup = BeautifulSoup(html, "lxml")
-        self.__scrap_description(data, soup)
-        self.__scrap_criteria(data, soup)
-
-    @staticmethod
-    @utils.silent_log_error()
-    def __scrap_description(data: models.LinkedInJob, soup: BeautifulSoup):
-        data.description = soup.find_all("div", attrs={"class": "show-more-less-html__markup"})[0].text
-
-    @utils.silent_log_error()
-    def __scrap_criteria(self, data: models.LinkedInJob, soup: BeautifulSoup):
-        for li in soup.find_all("li", attrs={"class": "description__job-criteria-item"}):
-            criterium, value = get_criterium(li)
-            if criterium is not None and value is not None:
-                data.criteria[criterium] = value
-
-
-@utils.silent_log_error(default=(None, None))
-def get_criterium(li: Tag) -> (str | None, str | None):
-    criterium: str | None = None
-    value: str | None = None
-    for element in li:
-        if element.name == "h3":
-            criterium = element.text.strip(" \n")
-        if element.name == "span":
-            value = element.text.strip(" \n")
-    return criterium, value
+        with metrics.timer("jobsscraper_parse_seconds", parser=self._parser):
+            if self._parse_executor is not None:
+                # only the extracted fields are sent back by the parsing process
+                loop = asyncio.get_running_loop()
+                description, criteria = await loop.run_in_executor(self._parse_executor, self._parse, html)
+            else:
+                description, criteria = self._parse(html)
+        if description is not None:
+            data.description = description
+        data.criteria.update(criteria)
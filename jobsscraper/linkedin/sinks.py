@@ -0,0 +1,267 @@
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterable, Iterable, TextIO
+
+from . import dedupe, models
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - pyarrow is optional, and only needed by the parquet sink
+    pyarrow = None
+
+__all__ = ["JobsSink", "NdjsonSink", "SqliteSink", "ParquetSink", "job_row"]
+
+Job = models.LinkedInJob | models.JobRecord
+
+
+def job_row(job: Job) -> dict[str, Any]:
+    """
+    The job as a flat row, for the tabular sinks
+    """
+    if isinstance(job, models.JobRecord):
+        job = job.to_model()
+    return {
+        "job_id": dedupe.dedupe_key(job),
+        "url": job.url,
+        "title": job.title,
+        "company_name": job.company.name,
+        "company_url": job.company.url,
+        "company_logo": job.company.logo,
+        "actively_hiring": job.company.actively_hiring,
+        "location": job.location.full_location,
+        "posted_time": job.posted_time,
+        "description": job.description,
+        "tags": sorted(job.tags),
+        "criteria": job.criteria,
+    }
+
+
+class JobsSink(ABC):
+    """
+    Write the jobs as they come, `batch_size` jobs at a time:
+    only the current batch is kept in memory, whatever the number of jobs
+
+        with NdjsonSink("jobs.ndjson.gz") as sink:
+            sink.write_all(scrap_all_jobs("Munich"))
+    """
+
+    def __init__(self, *, batch_size: int = 1000):
+        """
+        :param batch_size: how many jobs are written at once
+        """
+        self._batch_size = batch_size
+        self._batch: list[Job] = []
+        self._started_at: float | None = None
+        self._elapsed = 0.
+
+        self.nb_rows = 0
+
+    def __enter__(self) -> "JobsSink":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def write(self, job: Job):
+        """
+        Write the job, once its batch is full
+        """
+        if self._started_at is None:
+            self._started_at = time.perf_counter()
+        self._batch.append(job)
+        if len(self._batch) >= self._batch_size:
+            self.flush()
+
+    def write_all(self, jobs: Iterable[Job]) -> int:
+        """
+        Write all the jobs, and flush
+        :return: the number of written jobs
+        """
+        nb_rows = self.nb_rows
+        for job in jobs:
+            self.write(job)
+        self.flush()
+        return self.nb_rows - nb_rows
+
+    async def write_all_async(self, jobs: AsyncIterable[Job]) -> int:
+        """
+        Same as `write_all`, for async iterables. ex: `scrap_jobs_details(...)`
+        """
+        nb_rows = self.nb_rows
+        async for job in jobs:
+            self.write(job)
+        self.flush()
+        return self.nb_rows - nb_rows
+
+    def flush(self):
+        """
+        Write the current batch
+        """
+        if self._batch:
+            self._write_batch(self._batch)
+            self.nb_rows += len(self._batch)
+            self._batch = []
+        if self._started_at is not None:
+            self._elapsed = time.perf_counter() - self._started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        How many jobs were written per second, from the first one until the last flush
+        """
+        return self.nb_rows / self._elapsed if self._elapsed > 0 else 0.
+
+    def close(self):
+        """
+        Flush, and release the sink's resources
+        """
+        self.flush()
+        self._close()
+        logging.info(f"Wrote {self.nb_rows} jobs: {type(self).__name__}, {self.rows_per_second:.0f} rows/s")
+
+    @abstractmethod
+    def _write_batch(self, jobs: list[Job]):
+        """Write the jobs of the batch, at once"""
+
+    def _close(self):
+        pass
+
+
+class NdjsonSink(JobsSink):
+    """
+    Write the jobs as json, one per line. Compressed with gzip if the path ends with ".gz"
+    """
+
+    def __init__(self, path: str | os.PathLike, *, batch_size: int = 1000, compress: bool | None = None):
+        """
+        :param path: the file to write. Appended to if it exists
+        :param compress: gzip the file. Default to whether the path ends with ".gz"
+        """
+        super().__init__(batch_size=batch_size)
+        if compress is None:
+            compress = os.fspath(path).endswith(".gz")
+        self._file: TextIO = gzip.open(path, "at", encoding="utf-8") if compress else open(path, "a", encoding="utf-8")
+
+    def _write_batch(self, jobs: list[Job]):
+        self._file.write("".join(
+            (job.to_model() if isinstance(job, models.JobRecord) else job).model_dump_json() + "\n"
+            for job in jobs
+        ))
+
+    def _close(self):
+        self._file.close()
+
+
+class SqliteSink(JobsSink):
+    """
+    Insert or update the jobs in a SQLite table, keyed on the job id, a transaction per batch
+
+    A job found again keeps the details scrapped before (description, tags, criteria)
+    if it has none
+    """
+    _columns = [
+        "job_id", "url", "title", "company_name", "company_url", "company_logo", "actively_hiring",
+        "location", "posted_time", "description", "tags", "criteria",
+    ]
+    # kept if the new row has none
+    _details_columns = {"description", "tags", "criteria"}
+
+    def __init__(self, path: str | os.PathLike, *, table: str = "jobs", batch_size: int = 1000):
+        """
+        :param path: the SQLite database file. Created if it doesn't exist
+        :param table: the jobs' table, a Python-like identifier. Created if it doesn't exist
+        """
+        # not a query parameter, but part of the queries
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        super().__init__(batch_size=batch_size)
+        self._db = sqlite3.connect(path)
+        self._db.execute(f"""
+            CREATE TABLE IF NOT EXISTS "{table}" (
+                job_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                company_name TEXT NOT NULL,
+                company_url TEXT,
+                company_logo TEXT,
+                actively_hiring INTEGER,
+                location TEXT NOT NULL,
+                posted_time TEXT,
+                description TEXT,
+                tags TEXT,
+                criteria TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        updates = ", ".join(
+            f"{column} = COALESCE(excluded.{column}, {column})" if column in self._details_columns
+            else f"{column} = excluded.{column}"
+            for column in [*self._columns[1:], "updated_at"]
+        )
+        self._upsert = f"""
+            INSERT INTO "{table}" ({", ".join(self._columns)}, updated_at)
+            VALUES ({", ".join("?" for _ in self._columns)}, ?)
+            ON CONFLICT (job_id) DO UPDATE SET {updates}
+        """
+
+    def _write_batch(self, jobs: list[Job]):
+        now = time.time()
+        with self._db:  # a transaction per batch
+            self._db.executemany(self._upsert, (self.__values(job_row(job), now) for job in jobs))
+
+    @staticmethod
+    def __values(row: dict[str, Any], now: float) -> tuple:
+        # no details: NULL, so that the ones already stored are kept
+        row["tags"] = json.dumps(row["tags"]) if row["tags"] else None
+        row["criteria"] = json.dumps(row["criteria"]) if row["criteria"] else None
+        return *row.values(), now
+
+    def _close(self):
+        self._db.close()
+
+
+class ParquetSink(JobsSink):
+    """
+    Write the jobs in a Parquet file, a row group per batch
+    Needs pyarrow: `pip install jobsscraper[parquet]`
+    """
+
+    def __init__(self, path: str | os.PathLike, *, batch_size: int = 10000, compression: str = "zstd"):
+        """
+        :param path: the file to write. Overwritten if it exists
+        :param compression: the Parquet compression codec
+        """
+        if pyarrow is None:
+            raise ImportError("pyarrow is needed to write Parquet files, "
+                              "install it with `pip install jobsscraper[parquet]`")
+        super().__init__(batch_size=batch_size)
+        self._schema = pyarrow.schema([
+            ("job_id", pyarrow.string()),
+            ("url", pyarrow.string()),
+            ("title", pyarrow.string()),
+            ("company_name", pyarrow.string()),
+            ("company_url", pyarrow.string()),
+            ("company_logo", pyarrow.string()),
+            ("actively_hiring", pyarrow.bool_()),
+            ("location", pyarrow.string()),
+            ("posted_time", pyarrow.string()),
+            ("description", pyarrow.string()),
+            ("tags", pyarrow.list_(pyarrow.string())),
+            ("criteria", pyarrow.map_(pyarrow.string(), pyarrow.string())),
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema, compression=compression)
+
+    def _write_batch(self, jobs: list[Job]):
+        rows = [job_row(job) for job in jobs]
+        for row in rows:
+            row["criteria"] = list(row["criteria"].items())
+        self._writer.write_table(pyarrow.Table.from_pylist(rows, schema=self._schema))
+
+    def _close(self):
+        self._writer.close()
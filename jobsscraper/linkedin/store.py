@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+
+__all__ = ["SeenJobsStore", "Checkpoint", "search_key"]
+
+
+def search_key(location: str, keywords: str, until: int, filters: dict[str, str] | None = None) -> str:
+    """Identify a search, to checkpoint it"""
+    key = f"{location}|{keywords}|{until}"
+    if filters:
+        key += "|" + "&".join(f"{name}={value}" for name, value in sorted(filters.items()))
+    return key
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    # how many jobs of the search results have been walked through
+    position: int
+    # whether the search went until its end, or stopped early on already seen jobs.
+    # If not, the search crashed, or its caller stopped it
+    done: bool
+    # `time.time()`
+    updated_at: float
+
+
+class SeenJobsStore:
+    """
+    Remember the jobs already found by the previous runs, by LinkedIn job id,
+    and how far every search went, in a SQLite database
+
+    It lets a search stop early, once it finds jobs already found before
+    (see `AllJobsScraper.scrap_jobs`)
+    """
+
+    def __init__(self, path: str | os.PathLike = "jobsscraper-seen.sqlite"):
+        """
+        :param path: the SQLite database file. Created if it doesn't exist
+        """
+        # the searches can run in a background thread, one at a time
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS seen_jobs (
+                job_id TEXT PRIMARY KEY,
+                seen_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                search TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                done INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+
+    def __enter__(self) -> "SeenJobsStore":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def __contains__(self, job_id: str) -> bool:
+        return self._db.execute("SELECT 1 FROM seen_jobs WHERE job_id = ?", (job_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM seen_jobs").fetchone()[0]
+
+    def add(self, job_id: str):
+        """
+        Remember the job as seen
+        """
+        self._db.execute("INSERT OR IGNORE INTO seen_jobs VALUES (?, ?)", (job_id, time.time()))
+
+    def checkpoint(self, search: str) -> Checkpoint | None:
+        """
+        How far the search went during its last run. None if it never ran
+        :param search: see `search_key`
+        """
+        row = self._db.execute(
+            "SELECT position, done, updated_at FROM checkpoints WHERE search = ?", (search,)).fetchone()
+        if row is None:
+            return None
+        position, done, updated_at = row
+        return Checkpoint(position, bool(done), updated_at)
+
+    def save_checkpoint(self, search: str, position: int, *, done: bool):
+        """
+        :param search: see `search_key`
+        """
+        self._db.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)", (search, position, int(done), time.time()))
@@ -1,9 +1,20 @@
+import asyncio
 import logging
 import os
-from typing import Any
+import re
+import threading
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, TypeVar
+from urllib.parse import parse_qs, urlsplit
+
+from . import metrics
+
+T = TypeVar("T")
 
 screenshot_on_error_env_name = "LINKEDIN_SCREENSHOT_ON_ERROR"
 
+# ex: /jobs/view/python-developer-at-acme-3812345678 or /jobs/view/3812345678
+job_id_regex = re.compile(r"/jobs/view/(?:[^/]*-)?(\d+)/?$")
+
 
 def silent_log_error(default: Any = None, log_level: int = logging.ERROR):
     def decorator(func):
@@ -12,6 +23,7 @@ def silent_log_error(default: Any = None, log_level: int = logging.ERROR):
                 return func(*args, **kwargs)
             except:
                 logging.log(log_level, f"Error calling func={func.__name__}")
+                metrics.inc("jobsscraper_errors_total", func=func.__name__)
                 return default
 
         return wrapper
@@ -35,3 +47,126 @@ def take_screenshot_on_error(func):
                 self._driver.save_screenshot("screenshot.png")
             raise
     return wrapper
+
+
+class AdaptiveTimeout:
+    """
+    A timeout following the latency actually observed:
+    `factor` times the moving average of the observed latencies,
+    bounded by `minimum` and `maximum`.
+    As long as no latency has been observed, the timeout is `maximum`.
+    Every miss (nothing came in time) doubles the timeout, until latencies are observed again
+    """
+
+    def __init__(self, minimum: float, maximum: float, *, factor: float = 4., smoothing: float = 0.3):
+        self._minimum = minimum
+        self._maximum = maximum
+        self._factor = factor
+        self._smoothing = smoothing
+        self._average: float | None = None
+
+    def observe(self, latency: float):
+        if self._average is None:
+            self._average = latency
+        else:
+            self._average = self._smoothing * latency + (1 - self._smoothing) * self._average
+
+    def miss(self):
+        if self._average is not None:
+            self._average = min(2 * self.timeout, self._maximum) / self._factor
+
+    @property
+    def timeout(self) -> float:
+        if self._average is None:
+            return self._maximum
+        return min(max(self._factor * self._average, self._minimum), self._maximum)
+
+
+def iterate_sync(iterator: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Iterate over an async iterator from synchronous code,
+    running it on its own event loop
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(anext(iterator))
+            except StopAsyncIteration:
+                break
+    finally:
+        if hasattr(iterator, "aclose"):
+            loop.run_until_complete(iterator.aclose())
+        loop.close()
+
+
+async def iterate_async(iterable: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    """
+    Iterate over a sync or async iterable, from asynchronous code
+    """
+    if isinstance(iterable, AsyncIterable):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+async def iterate_in_thread(iterator: Iterator[T], *, maxsize: int = 100) -> AsyncIterator[T]:
+    """
+    Iterate over a blocking iterator from asynchronous code, without blocking the event loop:
+    the iterator runs in a background thread, and its items are handed over
+    through a queue of at most `maxsize` items. The thread waits while the queue is full
+
+    Once the async iterator is closed, the background thread stops, and closes the iterator,
+    after the item it is computing, if any
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[tuple[str, Any]] = asyncio.Queue(maxsize)
+    stopped = threading.Event()
+
+    def put(kind: str, payload: Any):
+        asyncio.run_coroutine_threadsafe(queue.put((kind, payload)), loop).result()
+
+    def run():
+        try:
+            for item in iterator:
+                if stopped.is_set():
+                    break
+                put("item", item)
+            else:
+                put("done", None)
+        except Exception as e:
+            if not stopped.is_set():
+                put("error", e)
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    threading.Thread(target=run, name="iterate-in-thread", daemon=True).start()
+    try:
+        while True:
+            kind, payload = await queue.get()
+            match kind:
+                case "item":
+                    yield payload
+                case "done":
+                    return
+                case "error":
+                    raise payload
+    finally:
+        stopped.set()
+        # unblock the thread if it waits for the queue
+        while not queue.empty():
+            queue.get_nowait()
+
+
+def job_id_from_url(url: str) -> str | None:
+    """
+    The LinkedIn id of the job, from its url. None if the url has none
+    """
+    parts = urlsplit(url)
+    if (match := job_id_regex.search(parts.path)) is not None:
+        return match.group(1)
+    current_job_id = parse_qs(parts.query).get("currentJobId")
+    return current_job_id[0] if current_job_id else None
@@ -0,0 +1,40 @@
+from jobsscraper.linkedin import JobRecord, LinkedInJob
+
+
+def make_job(
+        i: int = 1,
+        *,
+        url: str | None = None,
+        title: str | None = None,
+        company: str | None = None,
+        location: str = "Munich, Bavaria, Germany",
+        **fields,
+) -> LinkedInJob:
+    """
+    A job with all the mandatory fields, its job id being `i` unless its url is given
+    :param fields: the other fields, ex: description, criteria
+    """
+    return LinkedInJob(
+        url=url if url is not None else f"https://www.linkedin.com/jobs/view/python-developer-{i}",
+        title=title if title is not None else f"Python Developer {i}",
+        company={"name": company if company is not None else f"Company {i}"},
+        location={"full_location": location},
+        **fields,
+    )
+
+
+def make_record(i: int = 1, **kwargs) -> JobRecord:
+    """
+    Same as `make_job`, as a lightweight record: `make_record(...).to_model() == make_job(...)`
+    """
+    job = make_job(i, **kwargs)
+    return JobRecord(
+        url=job.url,
+        title=job.title,
+        company_name=job.company.name,
+        company_url=job.company.url,
+        company_logo=job.company.logo,
+        actively_hiring=job.company.actively_hiring,
+        location=job.location.full_location,
+        posted_time=job.posted_time,
+    )
@@ -0,0 +1,161 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import jobsscraper.linkedin as lkd
+from jobsscraper.linkedin.cache import ResponseCache, normalize_url
+from .factories import make_job
+
+dir_ = os.path.dirname(os.path.abspath(__file__))
+
+
+with open(f"{dir_}/job.html.test") as f:
+    html_data = f.read()
+
+
+def test_normalize_url():
+    url = "https://www.linkedin.com/jobs/view/python-developer-3812345678"
+    assert normalize_url(url) == url
+    assert normalize_url("https://de.linkedin.com/jobs/view/python-developer-3812345678/?refId=abc&trk=public_jobs"
+                         "&trackingId=xyz&position=2&pageNum=0") == url
+    assert normalize_url("http://WWW.LinkedIn.com/jobs/view/python-developer-3812345678#top") == url
+    assert normalize_url("https://example.com/job?b=2&a=1") == "https://example.com/job?a=1&b=2"
+
+
+def test_ResponseCache(tmp_path):
+    url = "https://de.linkedin.com/jobs/view/python-developer-1?trk=public_jobs"
+    with patch("time.time", return_value=1000):
+        with ResponseCache(tmp_path / "cache.sqlite", ttl=60) as cache:
+            assert cache.get(url) is None
+            cache.put(url, "page", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+            cached = cache.get("https://fr.linkedin.com/jobs/view/python-developer-1")
+            assert cached.body == "page" and cached.fresh
+            assert cache.nb_hits == 1 and cache.nb_misses == 1
+
+    # persisted on disk, and stale after the ttl
+    with patch("time.time", return_value=1061):
+        with ResponseCache(tmp_path / "cache.sqlite", ttl=60) as cache:
+            cached = cache.get(url)
+            assert not cached.fresh
+            assert cached.revalidation_headers() == {
+                "If-None-Match": '"v1"',
+                "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+            }
+            assert cache.nb_misses == 1
+
+            # fresh again once revalidated
+            cache.revalidated(url)
+            assert cache.get(url).fresh
+            assert cache.nb_revalidated == 1 and cache.nb_hits == 1
+
+
+def test_ResponseCache_eviction(tmp_path):
+    page = "x" * 400 * 1024
+    with ResponseCache(tmp_path / "cache.sqlite", max_size_mb=1) as cache:
+        for i in range(3):
+            with patch("time.time", return_value=1000 + i):
+                cache.put(f"https://example.com/{i}", page)
+        assert len(cache) == 2
+        # the least recently used one is evicted
+        with patch("time.time", return_value=1010):
+            cache.get("https://example.com/1")
+        with patch("time.time", return_value=1011):
+            cache.put("https://example.com/3", page)
+        assert cache.get("https://example.com/1") is not None
+        assert cache.get("https://example.com/2") is None
+        assert cache.nb_evicted == 2
+
+        # too big to be cached
+        cache.put("https://example.com/big", page * 3)
+        assert cache.get("https://example.com/big") is None
+
+        # a page cached again replaces its size
+        for _ in range(3):
+            cache.put("https://example.com/3", page)
+        assert len(cache) == 2 and cache.nb_evicted == 2
+
+    # the size is kept when reopened
+    with ResponseCache(tmp_path / "cache.sqlite", max_size_mb=1) as cache:
+        cache.put("https://example.com/4", page)
+        assert len(cache) == 2 and cache.nb_evicted == 1
+
+
+def test_ResponseCache_put_work(tmp_path):
+    def put_work(cache: ResponseCache, url: str) -> int:
+        """How many SQLite instructions caching a page takes"""
+        nb_instructions = 0
+
+        def count() -> int:
+            nonlocal nb_instructions
+            nb_instructions += 1
+            return 0
+
+        cache._db.set_progress_handler(count, 1)
+        cache.put(url, page)
+        cache._db.set_progress_handler(None, 1)
+        return nb_instructions
+
+    page = "x" * 150 * 1024
+    with ResponseCache(tmp_path / "cache.sqlite") as cache:
+        first = put_work(cache, "https://example.com/first")
+        for i in range(200):
+            cache.put(f"https://example.com/{i}", page)
+        # the same, whatever the number of cached pages
+        assert put_work(cache, "https://example.com/last") <= first * 1.2
+
+
+def test_ResponseCache_older_schema(tmp_path):
+    with ResponseCache(tmp_path / "cache.sqlite") as cache:
+        cache.put("https://example.com/1", "page")
+        cache._db.execute("PRAGMA user_version = 0")
+    # emptied
+    with ResponseCache(tmp_path / "cache.sqlite") as cache:
+        assert len(cache) == 0
+
+
+def stub_job_server(*, etag: str | None) -> tuple[TestServer, list[web.Request]]:
+    requests = []
+
+    async def job(request: web.Request) -> web.Response:
+        requests.append(request)
+        if etag is not None and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        headers = {"ETag": etag} if etag is not None else {}
+        return web.Response(text=html_data, content_type="text/html", headers=headers)
+
+    app = web.Application()
+    app.router.add_get("/jobs/view/{id}", job)
+    return TestServer(app), requests
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("etag", ['"v1"', None])
+async def test_SingleJobScraper_cache(tmp_path, etag):
+    server, requests = stub_job_server(etag=etag)
+    async with server:
+        url = str(server.make_url("/jobs/view/1"))
+        with ResponseCache(tmp_path / "cache.sqlite", ttl=60) as cache:
+            scraper = lkd.scraper.SingleJobScraper(rqs=100, response_cache=cache)
+            first = make_job(url=url)
+            await scraper.scrap(first)
+            assert len(requests) == 1
+
+            # served from the cache
+            second = make_job(url=url)
+            await scraper.scrap(second)
+            assert len(requests) == 1
+            assert second.description == first.description and second.criteria == first.criteria
+
+            # revalidated, or downloaded again, once stale
+            with patch("time.time", return_value=cache.get(url).stored_at + 61):
+                third = make_job(url=url)
+                await scraper.scrap(third)
+            assert len(requests) == 2
+            assert third.description == first.description
+            assert cache.nb_revalidated == (1 if etag is not None else 0)
+            if etag is not None:
+                assert requests[-1].headers["If-None-Match"] == etag
+            await scraper.close()
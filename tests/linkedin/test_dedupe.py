@@ -0,0 +1,52 @@
+from jobsscraper.linkedin.dedupe import BloomFilter, DedupeIndex, dedupe_key, skip_known
+from .factories import make_job
+
+
+def test_LinkedInJob_job_id():
+    first = make_job(url="https://de.linkedin.com/jobs/view/python-developer-at-acme-3812345678?refId=abc&trackingId=1")
+    second = make_job(url="https://www.linkedin.com/jobs/view/python-developer-at-acme-3812345678?refId=def&position=4")
+    assert first.job_id == second.job_id == "3812345678"
+    assert first.model_dump()["job_id"] == "3812345678"
+    assert dedupe_key(first) == dedupe_key(second)
+    # no id in the url
+    assert dedupe_key(make_job(url="https://example.com/job")) == "https://example.com/job"
+
+
+def test_DedupeIndex():
+    index = DedupeIndex()
+    assert index.add("3812345678")
+    assert not index.add("3812345678")
+    assert index.add("https://example.com/job")
+    assert "3812345678" in index and "https://example.com/job" in index and "1" not in index
+    assert len(index) == 2
+    assert index.nb_duplicates == 1
+
+    # the jobs found through other urls are skipped
+    jobs = [
+        make_job(url="https://de.linkedin.com/jobs/view/python-developer-1?trk=a"),
+        make_job(url="https://de.linkedin.com/jobs/view/python-developer-2"),
+        make_job(url="https://fr.linkedin.com/jobs/view/python-developer-1?trk=b"),
+    ]
+    assert list(skip_known(jobs, DedupeIndex())) == jobs[:2]
+
+
+def test_DedupeIndex_bloom():
+    index = DedupeIndex(bloom_capacity=10000, false_positive_rate=0.01)
+    added = [str(3_800_000_000 + i) for i in range(10000)]
+    assert all(index.add(key) for key in added[:5000])
+    assert not any(index.add(key) for key in added[:5000])
+    nb_new = sum(index.add(key) for key in added[5000:])
+    # never forgets, and only a few new jobs are taken as duplicates
+    assert all(key in index for key in added)
+    assert nb_new > 4900
+
+
+def test_BloomFilter():
+    bloom = BloomFilter(100_000, false_positive_rate=0.01)
+    # ~1.2 bytes per string
+    assert 110_000 < bloom.nb_bytes < 130_000
+    for i in range(100_000):
+        bloom.add(f"job-{i}")
+    assert all(f"job-{i}" in bloom for i in range(100_000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 200
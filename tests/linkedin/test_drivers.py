@@ -0,0 +1,155 @@
+import os
+import time
+from unittest.mock import patch, Mock
+
+import pytest
+
+import jobsscraper.linkedin as lkd
+
+
+@patch("selenium.webdriver.Chrome")
+def test_create_driver(chrome: Mock):
+    lkd.drivers.create_driver()
+    options = chrome.call_args.kwargs["options"]
+    assert options.arguments == ["--headless=new"]
+    assert chrome.return_value.execute_cdp_cmd.call_count == 0
+
+    lkd.drivers.create_driver(headless=False, lean=True)
+    options = chrome.call_args.kwargs["options"]
+    assert options.arguments == lkd.drivers.lean_arguments
+    assert options.experimental_options["prefs"] == lkd.drivers.lean_preferences
+    assert options.page_load_strategy == "eager"
+    chrome.return_value.execute_cdp_cmd.assert_called_with(
+        "Network.setBlockedURLs", {"urls": lkd.drivers.lean_blocked_urls})
+
+    # the network traffic is logged
+    chrome.return_value.execute_cdp_cmd.reset_mock()
+    lkd.drivers.create_driver(capture=True)
+    options = chrome.call_args.kwargs["options"]
+    assert options.to_capabilities()["goog:loggingPrefs"] == {"performance": "ALL"}
+    assert options.experimental_options["perfLoggingPrefs"]["enableNetwork"] is True
+    chrome.return_value.execute_cdp_cmd.assert_called_once_with("Network.enable", {})
+
+    with patch.object(lkd.drivers, "webdriver", None):
+        with pytest.raises(ImportError):
+            lkd.drivers.create_driver()
+
+
+def test_driver_memory():
+    driver = Mock()
+    driver.service.process.pid = os.getpid()
+    assert lkd.drivers.driver_memory(driver) > 0
+
+    # the browser is not running anymore
+    driver.service.process = None
+    assert lkd.drivers.driver_memory(driver) is None
+
+    with patch.object(lkd.drivers, "psutil", None):
+        assert lkd.drivers.driver_memory(driver) is None
+
+
+@patch("jobsscraper.linkedin.drivers.create_driver", side_effect=lambda **_: Mock())
+def test_DriverPool(create_driver: Mock):
+    with lkd.drivers.DriverPool(2, headless=False, lean=True, max_uses=2) as pool:
+        # the browsers are started in background
+        with pool.driver() as first:
+            pass
+        create_driver.assert_called_with(headless=False, lean=True, capture=False)
+        assert create_driver.call_count == 2
+
+        # the browsers are reused, until they have been used max_uses times
+        with pool.driver() as second, pool.driver() as third:
+            assert first in (second, third)
+        first.quit.assert_not_called()
+        assert create_driver.call_count == 2
+        with pool.driver() as driver:
+            pass
+        with pool.driver() as driver:
+            pass
+        assert create_driver.call_count >= 3
+
+        # a failing search recycles the browser
+        with pytest.raises(ValueError):
+            with pool.driver() as driver:
+                raise ValueError
+        time.sleep(0.1)
+        driver.quit.assert_called_once_with()
+
+        # a browser that can't be reset is recycled
+        with pool.driver() as driver:
+            driver.get.side_effect = ValueError
+        time.sleep(0.1)
+        driver.quit.assert_called_once_with()
+
+        # no browser available
+        with pool.driver(), pool.driver():
+            with pytest.raises(TimeoutError):
+                with pool.driver(timeout=0.1):
+                    pass
+
+    # browsers are quit when the pool is closed
+    driver.quit.assert_called_once_with()
+
+
+@patch("jobsscraper.linkedin.drivers.create_driver", side_effect=lambda **_: Mock())
+def test_DriverPool_max_memory(_):
+    with lkd.drivers.DriverPool(max_memory_mb=100) as pool:
+        with patch("jobsscraper.linkedin.drivers.driver_memory", return_value=50 * 1024 ** 2):
+            with pool.driver() as driver:
+                pass
+            driver.quit.assert_not_called()
+        with patch("jobsscraper.linkedin.drivers.driver_memory", return_value=200 * 1024 ** 2):
+            with pool.driver() as driver:
+                pass
+        time.sleep(0.1)
+        driver.quit.assert_called_once_with()
+
+        # the browser is still used when the pool is closed
+        with patch("jobsscraper.linkedin.drivers.driver_memory", return_value=None):
+            with pool.driver() as driver:
+                pool.close()
+        driver.quit.assert_called_once_with()
+
+
+@patch("jobsscraper.linkedin.drivers.create_driver", side_effect=lambda **_: Mock(quit=Mock(side_effect=OSError)))
+def test_DriverPool_quit_error(_, caplog):
+    # a browser failing to quit doesn't fail the pool
+    with lkd.drivers.DriverPool() as pool:
+        with pool.driver() as driver:
+            pass
+    driver.quit.assert_called_once_with()
+    assert "Failed to quit a browser" in caplog.text
+
+
+def test_DriverPool_start_error():
+    with patch("jobsscraper.linkedin.drivers.create_driver", side_effect=ValueError):
+        pool = lkd.drivers.DriverPool()
+        with pytest.raises(ValueError):
+            with pool.driver():
+                pass
+        pool.close()
+
+    # the browser is closed right after being started
+    driver = Mock()
+    with patch("jobsscraper.linkedin.drivers.create_driver", return_value=driver):
+        pool = lkd.drivers.DriverPool()
+        pool._closed = True
+        pool.start()
+        pool._executor.shutdown(wait=True)
+        driver.quit.assert_called_once_with()
+
+
+def test_DriverPool_stopped_early():
+    def search(pool: lkd.drivers.DriverPool):
+        with pool.driver() as driver:
+            yield driver
+            yield driver
+
+    with patch("jobsscraper.linkedin.drivers.create_driver", side_effect=lambda **_: Mock()):
+        with lkd.drivers.DriverPool() as pool:
+            jobs = search(pool)
+            driver = next(jobs)
+            jobs.close()
+            # the browser is reused
+            with pool.driver() as other:
+                assert other is driver
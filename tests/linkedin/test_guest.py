@@ -0,0 +1,140 @@
+import os
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import jobsscraper.linkedin as lkd
+
+dir_ = os.path.dirname(os.path.abspath(__file__))
+
+
+with open(f"{dir_}/search.html.test") as f:
+    search_data = f.read()
+
+
+def test_parse_job_cards():
+    cards = lkd.guest.parse_job_cards(search_data)
+    assert len(cards) == 3
+
+    # every field is found
+    assert cards[0]["url"].startswith("https://de.linkedin.com/jobs/view/senior-python-developer-at-acme-gmbh-3861234567")
+    assert cards[0]["title"] == "Senior Python Developer"
+    assert cards[0]["company_name"] == "Acme GmbH"
+    assert cards[0]["company_url"].startswith("https://de.linkedin.com/company/acme-gmbh")
+    assert cards[0]["logo"] == "https://media.licdn.com/dms/image/C4E0BAQH/company-logo_100_100/acme.png"
+    assert cards[0]["benefit"] == "Actively Hiring"
+    assert cards[0]["location"] == "Garmisch-Partenkirchen, Bavaria, Germany"
+    assert cards[0]["posted_time"] == "2024-03-25"
+
+    # no logo, benefit nor new posted time. Relative links are made absolute
+    assert cards[1]["company_url"].startswith("https://www.linkedin.com/company/bergbahn-ag")
+    assert cards[1]["logo"] is None
+    assert cards[1]["benefit"] is None
+    assert cards[1]["posted_time"] is None
+
+    # no title
+    assert cards[2]["title"] is None
+
+    assert lkd.guest.parse_job_cards("  \n") == []
+
+    # a link without any url
+    assert lkd.guest.parse_job_cards("<li><a>link</a><h3>title</h3></li>")[0]["url"] is None
+
+
+# the recorded job cards, and their job ids
+recorded_cards = [f"{li}</li>" for li in search_data.split("</li>")[:-1]]
+recorded_ids = ["3861234567", "3860987654", "3859111222"]
+
+
+def stub_server(*, nb_jobs: int = 25, page_size: int = 10, statuses: list[int] | None = None) -> TestServer:
+    """
+    Serve the recorded job cards, again and again with another job id, `nb_jobs` cards in all,
+    in fragments of `page_size` cards. `statuses` are the status codes of the first responses
+    """
+    statuses = list(statuses or [])
+    requests: list[dict[str, str]] = []
+    cards = [recorded_cards[i % 3].replace(recorded_ids[i % 3], str(i + 1)) for i in range(nb_jobs)]
+
+    async def search(request: web.Request) -> web.Response:
+        requests.append(dict(request.query))
+        if statuses:
+            return web.Response(status=statuses.pop(0))
+        start = int(request.query["start"])
+        return web.Response(text="".join(cards[start:start + page_size]), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/search", search)
+    server = TestServer(app)
+    server.requests = requests
+    return server
+
+
+@pytest.mark.asyncio
+async def test_GuestJobsScraper_scrap_jobs():
+    async with stub_server() as server:
+        scraper = lkd.guest.GuestJobsScraper("Garmisch", search_url=str(server.make_url("/search")))
+        jobs = [job async for job in scraper.scrap_jobs(keywords="Python", until=86400)]
+
+    # the jobs without title can't be scraped
+    assert len(jobs) == 17
+    assert jobs[0].title == "Senior Python Developer"
+    assert jobs[0].company.actively_hiring is True
+    assert jobs[1].company.actively_hiring is None
+    # the last fragment, not full, is the end of the search results
+    assert [r["start"] for r in server.requests] == ["0", "10", "20"]
+    assert server.requests[0] == {"location": "Garmisch", "f_TPR": "86400", "keywords": "Python", "start": "0"}
+
+
+@pytest.mark.asyncio
+async def test_GuestJobsScraper_scrap_jobs_concurrently():
+    async with stub_server(nb_jobs=30) as server:
+        scraper = lkd.guest.GuestJobsScraper(
+            "Garmisch", search_url=str(server.make_url("/search")), concurrency=2)
+        jobs = [job async for job in scraper.scrap_jobs()]
+
+    assert len(jobs) == 20
+    assert sorted(r["start"] for r in server.requests) == ["0", "10", "20", "30"]
+    assert server.requests[0] == {"location": "Garmisch", "start": "0"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page_size", [7, 25])
+@pytest.mark.parametrize("concurrency", [1, 3])
+async def test_GuestJobsScraper_scrap_jobs_page_size(page_size, concurrency):
+    # LinkedIn lists another number of jobs per fragment than expected
+    async with stub_server(nb_jobs=60, page_size=page_size) as server:
+        scraper = lkd.guest.GuestJobsScraper(
+            "Garmisch", search_url=str(server.make_url("/search")), concurrency=concurrency, records=True)
+        jobs = [job async for job in scraper.scrap_jobs()]
+
+    # every job is found once, none is skipped
+    assert [job.job_id for job in jobs] == [str(i + 1) for i in range(60) if i % 3 != 2]
+    if concurrency == 1:
+        assert [int(r["start"]) for r in server.requests] == list(range(0, 60, page_size))
+
+
+@pytest.mark.asyncio
+async def test_GuestJobsScraper_scrap_jobs_errors():
+    # too many requests, then the end of the search results
+    async with stub_server(statuses=[429, 429, 400]) as server:
+        scraper = lkd.guest.GuestJobsScraper("Garmisch", search_url=str(server.make_url("/search")), retry_delay=0)
+        jobs = [job async for job in scraper.scrap_jobs()]
+    assert len(jobs) == 0
+    assert len(server.requests) == 3
+
+    # too many requests, even after retrying
+    async with stub_server(statuses=[429] * 3) as server:
+        scraper = lkd.guest.GuestJobsScraper(
+            "Garmisch", search_url=str(server.make_url("/search")), nb_retries=2, retry_delay=0)
+        with pytest.raises(aiohttp.ClientError):
+            [job async for job in scraper.scrap_jobs()]
+    assert len(server.requests) == 3
+
+    # server error
+    async with stub_server(statuses=[500]) as server:
+        scraper = lkd.guest.GuestJobsScraper("Garmisch", search_url=str(server.make_url("/search")))
+        with pytest.raises(aiohttp.ClientResponseError):
+            [job async for job in scraper.scrap_jobs()]
+
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+import pytest
+
+import jobsscraper.linkedin as lkd
+
+# how long `import jobsscraper.linkedin` may take, in seconds
+import_time_limit = 0.5
+
+heavy_modules = ("aiohttp", "selenium", "bs4", "lxml", "http.server")
+
+
+def run_python(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+
+def test_import_is_lazy():
+    # only the models are imported
+    imported = run_python(
+        "import sys, jobsscraper.linkedin as lkd\n"
+        "lkd.LinkedInJob, lkd.JobRecord\n"
+        f"print(*[m for m in {heavy_modules!r} if m in sys.modules])"
+    )
+    assert imported.split() == []
+
+    # the scrapers are imported on first use
+    imported = run_python(
+        "import sys, jobsscraper.linkedin as lkd\n"
+        "lkd.scrap_all_jobs\n"
+        "print(*[m for m in ('aiohttp', 'bs4', 'lxml') if m in sys.modules])"
+    )
+    assert imported.split() == ["aiohttp", "bs4", "lxml"]
+
+
+def test_import_time():
+    # the fastest of a few imports, in new interpreters
+    elapsed = min(float(run_python(
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import jobsscraper.linkedin\n"
+        "print(time.perf_counter() - start)"
+    )) for _ in range(3))
+    assert elapsed < import_time_limit
+
+
+def test_lazy_attributes():
+    assert lkd.scrap_all_jobs is lkd.main.scrap_all_jobs
+    assert lkd.scraper.SingleJobScraper is not None
+    assert {"scrap_jobs_details", "sinks", "LinkedInJob"} <= set(dir(lkd))
+    for name in lkd.__all__:
+        assert getattr(lkd, name) is not None
+    with pytest.raises(AttributeError):
+        lkd.unknown
@@ -0,0 +1,116 @@
+import pytest
+
+from jobsscraper.linkedin import LinkedInJob
+from jobsscraper.linkedin.index import JobIndex, tokenize
+from .factories import make_job, make_record
+
+jobs = [
+    make_job(1, title="Senior Python Developer", description="Django and PostgreSQL",
+             criteria={"Seniority level": "Mid-Senior level"}),
+    make_job(2, title="Python Developer", description="Flask, full-time", company="Globex",
+             criteria={"Employment type": "Full-time"}),
+    make_job(3, title="Data Engineer", description="Python and Spark", location="Berlin, Germany"),
+    make_job(4, title="Database Administrator", description="PostgreSQL", company="globex"),
+]
+
+
+def job_ids(found: list[LinkedInJob]) -> list[str]:
+    return [job.job_id for job in found]
+
+
+def test_tokenize():
+    assert tokenize("Senior Python-Developer (m/w/d), München") == [
+        "senior", "python", "developer", "m", "w", "d", "münchen"]
+    assert tokenize(None) == []
+
+
+def test_JobIndex_search():
+    index = JobIndex()
+    assert index.add_all(jobs) == 4
+    assert len(index) == 4 and "1" in index and "5" not in index
+
+    # all the words, in the title or the description
+    assert job_ids(index.search("python")) == ["1", "2", "3"]
+    assert job_ids(index.search("PYTHON developer")) == ["1", "2"]
+    # any of them, none of them, prefixes
+    assert job_ids(index.search("django|flask")) == ["1", "2"]
+    assert job_ids(index.search("python -senior")) == ["2", "3"]
+    assert job_ids(index.search("-senior|data")) == ["2", "4"]
+    assert job_ids(index.search("data*")) == ["3", "4"]
+    assert job_ids(index.search("postgre* -data*|django")) == []
+    assert job_ids(index.search("full-time")) == ["2"]
+    assert index.search("unknown") == [] and index.search("python unknown") == []
+    assert job_ids(index.search("- *")) == ["1", "2", "3", "4"]
+    assert job_ids(index.search("python", limit=2)) == ["1", "2"]
+
+    # the lookups
+    assert job_ids(index.search(company="GLOBEX")) == ["2", "4"]
+    assert job_ids(index.search("python", location="germany")) == ["1", "2", "3"]
+    assert job_ids(index.search(location="Bavaria, Munich")) == ["1", "2", "4"]
+    assert job_ids(index.search(criteria={"employment type": "full-time"})) == ["2"]
+    assert index.search(criteria={"Employment type": "Part-time"}) == []
+
+
+def test_JobIndex_search_intersections():
+    # few candidates are looked up in the many jobs having the other words
+    index = JobIndex()
+    index.add_all(make_job(i, title="Python Developer", location="Berlin") for i in range(100))
+    index.add(make_job(100, title="Rust Developer"))
+    assert job_ids(index.search("python developer", location="Berlin")) == [str(i) for i in range(100)]
+    assert job_ids(index.search("rust developer")) == ["100"]
+    assert job_ids(index.search("rust -python")) == ["100"]
+    assert job_ids(index.search("developer -python", location="Munich")) == ["100"]
+    assert index.search("rust python") == []
+
+
+def test_JobIndex_replace():
+    index = JobIndex()
+    index.add(make_record(url="https://de.linkedin.com/jobs/view/python-developer-1?trk=a", title="Python Developer"))
+    assert job_ids(index.search("python")) == ["1"]
+
+    # found again, with its details
+    assert not index.add(make_job(1, title="Python Developer", description="Rust"))
+    assert len(index) == 1
+    assert [job.description for job in index.search("python")] == ["Rust"]
+    assert job_ids(index.search("rust")) == ["1"]
+    # the words added since the last prefix query are found too
+    assert job_ids(index.search("ru*")) == ["1"]
+    index.add(make_job(2, title="Ruby Developer"))
+    assert job_ids(index.search("ru*")) == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_JobIndex_add_all_async():
+    async def scrap():
+        for job in jobs:
+            yield job
+
+    index = JobIndex()
+    assert await index.add_all_async(scrap()) == 4
+    assert job_ids(index.search("python")) == ["1", "2", "3"]
+
+
+def test_JobIndex_snapshot(tmp_path):
+    index = JobIndex()
+    index.add_all(jobs)
+    index.add(make_job(1, title="Staff Python Developer"))
+    index.save(tmp_path / "jobs.index")
+
+    loaded = JobIndex.load(tmp_path / "jobs.index")
+    assert len(loaded) == 4
+    assert job_ids(loaded.search("python")) == ["2", "3", "1"]
+    assert job_ids(loaded.search("sta*")) == ["1"]
+    assert job_ids(loaded.search(company="globex", criteria={"Employment type": "Full-time"})) == ["2"]
+    assert loaded.search("python")[0] == jobs[1]
+    assert not (tmp_path / "jobs.index.tmp").exists()
+
+    # still indexing
+    loaded.add(make_job(5, title="Python Architect"))
+    assert job_ids(loaded.search("python arch*")) == ["5"]
+
+
+def test_JobIndex_snapshot_version(tmp_path, monkeypatch):
+    JobIndex().save(tmp_path / "jobs.index")
+    monkeypatch.setattr("jobsscraper.linkedin.index._snapshot_version", 2)
+    with pytest.raises(ValueError):
+        JobIndex.load(tmp_path / "jobs.index")
@@ -1,17 +1,125 @@
-from unittest.mock import patch, Mock, AsyncMock
+import asyncio
+import threading
+import time
+from unittest.mock import patch, Mock, AsyncMock, MagicMock
 
+import aiohttp
 import pytest
 
-from jobsscraper.linkedin import scrap_all_jobs, scrap_single_job
+from jobsscraper.linkedin import (
+    LinkedInJob, scrap_all_jobs, scrap_all_jobs_async, scrap_all_jobs_details, scrap_jobs_details,
+    scrap_single_job, close_single_job_scraper,
+)
+from jobsscraper.linkedin import main
+from jobsscraper.linkedin.dedupe import DedupeIndex
+from .factories import make_record
 
 
 @patch("jobsscraper.linkedin.main.AllJobsScraper")
 def test_scrap_all_jobs(scraper: Mock):
-    list(scrap_all_jobs("Garmisch"))
-    scraper.assert_called_once_with("Garmisch", headless=True)
+    list(scrap_all_jobs("Garmisch", prune=True, max_memory_mb=1024, capture=True))
+    scraper.assert_called_once_with(
+        "Garmisch", headless=True, batch_extraction=True, lean=False, records=False, prune=True, max_memory_mb=1024,
+        capture=True)
+    scraper.return_value.scrap_jobs.assert_called_once_with(
+        keywords="", until=86400, seen_store=None, stop_after_seen=None)
+    # the browser is quit once the search is over
+    scraper.return_value.close.assert_called_once_with()
+
+
+@patch("jobsscraper.linkedin.main.AllJobsScraper")
+def test_scrap_all_jobs_stopped_early(scraper: Mock):
+    scraper.return_value.scrap_jobs.return_value = iter(["job 1", "job 2"])
+    jobs = scrap_all_jobs("Garmisch")
+    # the browser is only started once a job is asked for
+    scraper.assert_not_called()
+    assert next(jobs) == "job 1"
+    jobs.close()
+    scraper.return_value.close.assert_called_once_with()
+
+
+@patch("jobsscraper.linkedin.main.AllJobsScraper")
+def test_scrap_all_jobs_driver_pool(scraper: Mock):
+    pool = MagicMock()
+    scraper.return_value.scrap_jobs.return_value = iter(["job"])
+    assert list(scrap_all_jobs("Garmisch", driver_pool=pool)) == ["job"]
+    driver = pool.driver.return_value.__enter__.return_value
+    scraper.assert_called_once_with(
+        "Garmisch", batch_extraction=True, driver=driver, records=False, prune=False, capture=False)
+    scraper.return_value.scrap_jobs.assert_called_once_with(
+        keywords="", until=86400, seen_store=None, stop_after_seen=None)
+
+
+@patch("jobsscraper.linkedin.main.GuestJobsScraper")
+def test_scrap_all_jobs_http(scraper: Mock):
+    async def scrap_jobs(**_):
+        yield "job"
+
+    scraper.return_value.scrap_jobs = Mock(side_effect=scrap_jobs)
+    assert list(scrap_all_jobs("Garmisch", keyword="Python", backend="http", records=True)) == ["job"]
+    scraper.assert_called_once_with("Garmisch", records=True)
+    scraper.return_value.scrap_jobs.assert_called_once_with(keywords="Python", until=86400)
+
+    with pytest.raises(ValueError):
+        scrap_all_jobs("Garmisch", backend="firefox")
+    # whatever the backend, the options are checked
+    with pytest.raises(TypeError):
+        scrap_all_jobs("Garmisch", backend="http", prunne=True)
+
+
+@patch("jobsscraper.linkedin.main.AllJobsScraper")
+@pytest.mark.asyncio
+async def test_scrap_all_jobs_async(scraper: Mock):
+    threads = set()
+    # the two searches run at the same time
+    both_running = threading.Barrier(2, timeout=5)
+    # while the event loop keeps running
+    loop_running = threading.Event()
+
+    def scrap_jobs(**_):
+        # the browser is driven with blocking calls
+        threads.add(threading.current_thread())
+        both_running.wait()
+        assert loop_running.wait(5)
+        for i in range(4):
+            yield Mock(job_id=str(i))
+
+    scraper.return_value.scrap_jobs = Mock(side_effect=scrap_jobs)
+
+    async def search(location: str) -> list:
+        return [job.job_id async for job in scrap_all_jobs_async(location, keyword="Python")]
+
+    asyncio.get_running_loop().call_soon(loop_running.set)
+    # two searches at once, each in its own thread
+    assert await asyncio.gather(search("Garmisch"), search("Munich")) == [["0", "1", "2", "3"]] * 2
+    assert len(threads) == 2 and threading.current_thread() not in threads
+    assert scraper.return_value.close.call_count == 2
+    scraper.assert_called_with(
+        "Munich", headless=True, batch_extraction=True, lean=False, records=False, prune=False, max_memory_mb=None,
+        capture=False)
+    scraper.return_value.scrap_jobs.assert_called_with(
+        keywords="Python", until=86400, seen_store=None, stop_after_seen=None)
+
+    # the known jobs are skipped
+    index = DedupeIndex()
+    index.add("1")
+    scraper.return_value.scrap_jobs = Mock(side_effect=lambda **_: (Mock(job_id=str(i)) for i in range(4)))
+    assert [job.job_id async for job in scrap_all_jobs_async("Garmisch", dedupe_index=index)] == ["0", "2", "3"]
+
+
+@patch("jobsscraper.linkedin.main.GuestJobsScraper")
+@pytest.mark.asyncio
+async def test_scrap_all_jobs_async_http(scraper: Mock):
+    async def scrap_jobs(**_):
+        yield "job"
+
+    scraper.return_value.scrap_jobs = Mock(side_effect=scrap_jobs)
+    assert [job async for job in scrap_all_jobs_async("Garmisch", backend="http", records=True)] == ["job"]
+    scraper.assert_called_once_with("Garmisch", records=True)
     scraper.return_value.scrap_jobs.assert_called_once_with(keywords="", until=86400)
 
 
+@patch.dict("jobsscraper.linkedin.main.single_job_scrapers", clear=True)
 @patch("jobsscraper.linkedin.main.SingleJobScraper")
 @pytest.mark.asyncio
 async def test_scrap_single_job(scraper: Mock):
@@ -26,3 +134,189 @@ async def test_scrap_single_job(scraper: Mock):
     scraper.assert_called_once_with()
     assert scraper.return_value.scrap.call_count == 2
     scraper.return_value.scrap.assert_awaited_with(data)
+
+
+@patch.dict("jobsscraper.linkedin.main.single_job_scrapers", clear=True)
+@patch("jobsscraper.linkedin.main.SingleJobScraper")
+def test_scrap_single_job_event_loops(scraper: Mock):
+    scrapers = []
+
+    def new_scraper():
+        scrapers.append(Mock(scrap=AsyncMock(), close=AsyncMock()))
+        return scrapers[-1]
+
+    scraper.side_effect = new_scraper
+    # the scraper of an event loop is not used by the next ones, and is closed by the next one
+    asyncio.run(scrap_single_job(Mock()))
+    asyncio.run(scrap_single_job(Mock()))
+    assert scraper.call_count == 2
+    scrapers[0].close.assert_awaited_once_with()
+    scrapers[1].close.assert_not_awaited()
+
+    # or when asked to, before its loop is closed
+    async def scrap_and_close():
+        await scrap_single_job(Mock())
+        await scrap_single_job(Mock())
+        await close_single_job_scraper()
+        await close_single_job_scraper()
+
+    asyncio.run(scrap_and_close())
+    assert scraper.call_count == 3
+    assert all(s.close.await_count == 1 for s in scrapers)
+    assert main.single_job_scrapers == {}
+
+
+@patch("jobsscraper.linkedin.main.SingleJobScraper")
+@pytest.mark.asyncio
+async def test_scrap_jobs_details(scraper: Mock):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def scrap(job: Mock):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # the first jobs take longer
+        await asyncio.sleep(0.05 if job.index < 2 else 0.01)
+        in_flight -= 1
+        if job.index == 5:
+            raise aiohttp.ClientError("failed")
+
+    scraper.return_value.scrap = AsyncMock(side_effect=scrap)
+    scraper.return_value.close = AsyncMock()
+    jobs = [Mock(index=i) for i in range(10)]
+
+    # sync iterable, failures reported
+    errors = []
+    done = [job async for job in scrap_jobs_details(
+        iter(jobs), concurrency=3, rqs=2, on_error=lambda job, e: errors.append((job, e)))]
+    scraper.assert_called_once_with(
+        rqs=2, parse_workers=0, response_cache=None, session=None, limit_per_host=3)
+    scraper.return_value.close.assert_awaited_once_with()
+    assert max_in_flight == 3
+    assert len(done) == 9 and set(done) == set(jobs) - {jobs[5]}
+    # the jobs are yielded as they complete
+    assert done[0] is jobs[2]
+    assert len(errors) == 1 and errors[0][0] is jobs[5] and isinstance(errors[0][1], aiohttp.ClientError)
+
+    # async iterable, failures logged
+    async def async_jobs():
+        for job in jobs:
+            yield job
+
+    done = [job async for job in scrap_jobs_details(async_jobs())]
+    assert len(done) == 9
+
+    # the caller stops early: the running scraps are cancelled
+    read = []
+
+    def lazy_jobs():
+        for job in jobs:
+            read.append(job)
+            yield job
+
+    details = scrap_jobs_details(lazy_jobs(), concurrency=2)
+    assert await anext(details) in jobs[:2]
+    await details.aclose()
+    # no more job is read, and nothing is left running
+    assert len(read) == 2
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+
+
+@patch("jobsscraper.linkedin.main.SingleJobScraper")
+@pytest.mark.asyncio
+async def test_scrap_jobs_details_slow_jobs(scraper: Mock):
+    scraper.return_value.scrap = AsyncMock()
+    scraper.return_value.close = AsyncMock()
+    jobs = [Mock(index=i) for i in range(4)]
+    # the last job only comes once the details of the first ones are yielded
+    first_ones_done = asyncio.Event()
+
+    async def slow_jobs():
+        yield jobs[0]
+        yield jobs[1]
+        yield jobs[2]
+        await first_ones_done.wait()
+        yield jobs[3]
+
+    done = []
+
+    async def read_details():
+        async for job in scrap_jobs_details(slow_jobs()):
+            done.append(job)
+            if len(done) == 3:
+                first_ones_done.set()
+
+    # waits for ever if the details wait for the next job
+    await asyncio.wait_for(read_details(), timeout=5)
+    assert done == jobs
+
+
+@patch("jobsscraper.linkedin.main.SingleJobScraper")
+@patch("jobsscraper.linkedin.main.AllJobsScraper")
+@pytest.mark.asyncio
+async def test_scrap_all_jobs_details(all_jobs_scraper: Mock, single_job_scraper: Mock):
+    events = []
+    jobs = [Mock(index=i) for i in range(3)]
+
+    def scrap_jobs(**_):
+        for job in jobs:
+            time.sleep(0.05)
+            events.append(("found", job.index))
+            yield job
+        events.append(("search done", None))
+
+    async def scrap(job: Mock):
+        events.append(("scrapped", job.index))
+
+    all_jobs_scraper.return_value.scrap_jobs = Mock(side_effect=scrap_jobs)
+    single_job_scraper.return_value.scrap = AsyncMock(side_effect=scrap)
+    single_job_scraper.return_value.close = AsyncMock()
+
+    done = [job async for job in scrap_all_jobs_details(
+        "Garmisch", keyword="Python", lean=True, rqs=3, records=True, prune=True, max_memory_mb=1024, capture=True)]
+    assert set(done) == set(jobs)
+    all_jobs_scraper.assert_called_once_with(
+        "Garmisch", headless=True, batch_extraction=True, lean=True, records=True, prune=True, max_memory_mb=1024,
+        capture=True)
+    all_jobs_scraper.return_value.scrap_jobs.assert_called_once_with(
+        keywords="Python", until=86400, seen_store=None, stop_after_seen=None)
+    single_job_scraper.assert_called_once_with(
+        rqs=3, parse_workers=0, response_cache=None, session=None, limit_per_host=8)
+    # the details are scrapped while the search is still running
+    assert events.index(("scrapped", 0)) < events.index(("found", 1))
+    assert ("search done", None) in events
+
+
+@patch("jobsscraper.linkedin.main.AllJobsScraper")
+def test_scrap_all_jobs_dedupe_index(scraper: Mock):
+    jobs = [Mock(job_id="1"), Mock(job_id="2"), Mock(job_id="1")]
+    scraper.return_value.scrap_jobs.return_value = iter(jobs)
+    index = DedupeIndex()
+    index.add("2")
+    assert list(scrap_all_jobs("Garmisch", dedupe_index=index)) == jobs[:1]
+    assert index.nb_duplicates == 2
+
+
+@patch("jobsscraper.linkedin.main.SingleJobScraper")
+@pytest.mark.asyncio
+async def test_scrap_jobs_details_dedupe_index(scraper: Mock):
+    scraper.return_value.scrap = AsyncMock()
+    scraper.return_value.close = AsyncMock()
+    jobs = [Mock(job_id="1"), Mock(job_id="2"), Mock(job_id="1")]
+    index = DedupeIndex()
+    index.add("2")
+    assert [job async for job in scrap_jobs_details(jobs, dedupe_index=index)] == jobs[:1]
+    # the known jobs are not even requested
+    scraper.return_value.scrap.assert_awaited_once_with(jobs[0])
+
+
+@patch("jobsscraper.linkedin.main.SingleJobScraper")
+@pytest.mark.asyncio
+async def test_scrap_jobs_details_records(scraper: Mock):
+    scraper.return_value.scrap = AsyncMock()
+    scraper.return_value.close = AsyncMock()
+    record = make_record()
+    # the records are converted before scrapping their details
+    assert [job async for job in scrap_jobs_details([record], dedupe_index=DedupeIndex())] == [record.to_model()]
+    assert isinstance(scraper.return_value.scrap.await_args.args[0], LinkedInJob)
@@ -0,0 +1,203 @@
+import os
+import urllib.error
+import urllib.request
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import jobsscraper.linkedin as lkd
+from jobsscraper.linkedin import metrics
+from jobsscraper.linkedin.cache import ResponseCache
+from .factories import make_job
+from .test_scraper import job_card, mock_driver
+
+dir_ = os.path.dirname(os.path.abspath(__file__))
+
+
+with open(f"{dir_}/job.html.test") as f:
+    html_data = f.read()
+
+
+@pytest.fixture
+def registry():
+    registry = metrics.InMemoryMetrics()
+    metrics.set_metrics(registry)
+    yield registry
+    metrics.set_metrics(None)
+
+
+def test_Metrics_noop():
+    noop = metrics.get_metrics()
+    assert type(noop) is metrics.Metrics
+    metrics.inc("counter", status=200)
+    metrics.observe("histogram", 1.)
+    with metrics.timer("timer"):
+        pass
+    with metrics.timer("timer"):  # reusable
+        pass
+
+
+def test_InMemoryMetrics(registry):
+    metrics.inc("jobs_total", status=200)
+    metrics.inc("jobs_total", 2, status="200")
+    metrics.inc("jobs_total", status=429)
+    assert registry.counter("jobs_total", status=200) == 3
+    assert registry.counter("jobs_total", status=429) == 1
+    assert registry.counter("jobs_total") == 0
+
+    metrics.observe("wait_seconds", 0.003)
+    metrics.observe("wait_seconds", 0.003)
+    metrics.observe("wait_seconds", 100)
+    with patch("time.perf_counter", side_effect=[1., 1.2]):
+        with metrics.timer("wait_seconds"):
+            pass
+    histogram = registry.histogram("wait_seconds")
+    assert histogram.count == 4 and histogram.sum == pytest.approx(100.206)
+    assert histogram.counts[1] == 2 and histogram.counts[6] == 1 and histogram.counts[-1] == 1
+    assert registry.histogram("parse_seconds") is None
+
+    # timed, even if the block fails
+    with pytest.raises(ValueError):
+        with metrics.timer("parse_seconds", parser="lxml"):
+            raise ValueError()
+    assert registry.histogram("parse_seconds", parser="lxml").count == 1
+
+
+def test_InMemoryMetrics_to_prometheus():
+    registry = metrics.InMemoryMetrics(buckets=(1., 0.1))
+    registry.inc("responses_total", status=200)
+    registry.inc("throttled_total")
+    registry.inc("errors_total", func='say "hi"\\\n')
+    registry.observe("wait_seconds", 0.05, kind="search")
+    registry.observe("wait_seconds", 0.5, kind="search")
+    registry.observe("wait_seconds", 5, kind="search")
+    assert registry.to_prometheus() == "\n".join([
+        "# TYPE errors_total counter",
+        'errors_total{func="say \\"hi\\"\\\\\\n"} 1.0',
+        "# TYPE responses_total counter",
+        'responses_total{status="200"} 1.0',
+        "# TYPE throttled_total counter",
+        "throttled_total 1.0",
+        "# TYPE wait_seconds histogram",
+        'wait_seconds_bucket{kind="search",le="0.1"} 1',
+        'wait_seconds_bucket{kind="search",le="1.0"} 2',
+        'wait_seconds_bucket{kind="search",le="+Inf"} 3',
+        'wait_seconds_sum{kind="search"} 5.55',
+        'wait_seconds_count{kind="search"} 3',
+    ]) + "\n"
+
+
+def test_count_errors(registry):
+    @metrics.count_errors("failures_total", field="title")
+    def get_title(fail: bool) -> str:
+        if fail:
+            raise ValueError()
+        return "title"
+
+    assert get_title(False) == "title"
+    with pytest.raises(ValueError):
+        get_title(True)
+    assert registry.counter("failures_total", field="title") == 1
+
+    # the errors silenced are counted too
+    assert lkd.utils.silent_log_error()(get_title)(True) is None
+    assert registry.counter("jobsscraper_errors_total", func="get_title") == 1
+
+
+def test_serve_prometheus(registry):
+    registry.inc("throttled_total")
+    server = metrics.serve_prometheus(registry, 0, address="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics") as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain")
+            assert resp.read().decode() == registry.to_prometheus()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@patch('time.sleep', return_value=None)
+def test_AllJobsScraper_metrics(_, registry):
+    # every 5th card has no title
+    cards = [job_card(i) for i in range(1, 11)]
+    driver = mock_driver()
+    driver.execute_script = Mock(side_effect=lambda script, *_: cards if script == lkd.scraper.extract_jobs_script
+                                 else None)
+    driver.execute_async_script = Mock(side_effect=[True, False])
+    driver.find_element = Mock(side_effect=[Mock(), lkd.scraper.NoSuchElementException("")])
+    with patch("selenium.webdriver.Chrome", return_value=driver):
+        jobs = list(lkd.scraper.AllJobsScraper("Garmisch").scrap_jobs())
+    assert len(jobs) == 8
+    assert registry.counter("jobsscraper_page_loads_total", kind="search") == 1
+    assert registry.counter("jobsscraper_page_loads_total", kind="more") == 1
+    assert registry.counter("jobsscraper_cards_extracted_total", extraction="batch") == 10
+    assert registry.counter("jobsscraper_extraction_failures_total", field="title") == 2
+    assert registry.histogram("jobsscraper_load_wait_seconds").count == 2
+
+    # the failures not due to a missing field
+    card = {**job_card(1), "benefit": 1}
+    assert lkd.scraper.job_from_card(card) is None
+    assert registry.counter("jobsscraper_extraction_failures_total", field="unknown") == 1
+
+    # the fields failing to be extracted one by one
+    driver = mock_driver()
+    with patch("selenium.webdriver.Chrome", return_value=driver):
+        jobs = list(lkd.scraper.AllJobsScraper("Garmisch", batch_extraction=False).scrap_jobs())
+    assert registry.counter("jobsscraper_cards_extracted_total", extraction="webdriver") == 30
+    assert registry.counter("jobsscraper_extraction_failures_total", field="url") == 5
+    # the jobs without posted time are not failures
+    assert any(job.posted_time is None for job in jobs)
+    assert registry.counter("jobsscraper_extraction_failures_total", field="posted_time") == 0
+    assert registry.counter("jobsscraper_errors_total", func="__get_job_posted_time") == 0
+
+
+@pytest.mark.asyncio
+async def test_SingleJobScraper_metrics(registry, tmp_path):
+    nb_requests = 0
+
+    async def job(_: web.Request) -> web.Response:
+        nonlocal nb_requests
+        nb_requests += 1
+        # throttled once
+        if nb_requests == 1:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        return web.Response(text=html_data, content_type="text/html", headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/jobs/view/{id}", job)
+    async with TestServer(app) as server:
+        with ResponseCache(tmp_path / "cache.sqlite") as cache:
+            scraper = lkd.scraper.SingleJobScraper(rqs=100, response_cache=cache)
+            url = str(server.make_url("/jobs/view/1"))
+            for _ in range(2):
+                await scraper.scrap(make_job(url=url))
+            await scraper.close()
+
+    assert registry.counter("jobsscraper_http_responses_total", status=429) == 1
+    assert registry.counter("jobsscraper_http_responses_total", status=200) == 1
+    assert registry.counter("jobsscraper_throttled_total") == 1
+    assert registry.counter("jobsscraper_retries_total") == 1
+    assert registry.counter("jobsscraper_cache_total", result="hit") == 1
+    assert registry.histogram("jobsscraper_limiter_wait_seconds").count == 2
+    assert registry.histogram("jobsscraper_network_seconds").count == 2
+    assert registry.histogram("jobsscraper_parse_seconds", parser="lxml").count == 2
+
+
+@patch("jobsscraper.linkedin.main.SingleJobScraper")
+@pytest.mark.asyncio
+async def test_scrap_jobs_details_metrics(scraper: Mock, registry):
+    async def scrap(job: Any):
+        if job == 1:
+            raise ValueError()
+
+    scraper.return_value.scrap = AsyncMock(side_effect=scrap)
+    scraper.return_value.close = AsyncMock()
+    assert {job async for job in lkd.scrap_jobs_details([0, 1, 2], on_error=lambda *_: None)} == {0, 2}
+    assert registry.counter("jobsscraper_jobs_details_total", result="ok") == 2
+    assert registry.counter("jobsscraper_jobs_details_total", result="failed") == 1
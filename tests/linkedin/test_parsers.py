@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+import jobsscraper.linkedin as lkd
+
+dir_ = os.path.dirname(__file__)
+with open(f"{dir_}/job.html.test") as f:
+    html_data = f.read()
+
+parsers = [lkd.parsers.parse_job_page, lkd.parsers.parse_job_page_soup]
+
+
+def test_parse_job_page_same_output():
+    description, criteria = lkd.parsers.parse_job_page(html_data)
+    assert (description, criteria) == lkd.parsers.parse_job_page_soup(html_data)
+    assert "Python" in description
+    assert criteria == {
+        "Seniority level": "Mid-Senior level",
+        "Employment type": "Full-time",
+        "Job function": "Engineering and Information Technology",
+        "Industries": "Software Development, Travel Arrangements & Tourism",
+    }
+
+
+@pytest.mark.parametrize("parse", parsers)
+def test_parse_job_page(parse):
+    # the first matching div, having the class among others
+    description, criteria = parse("""<html><body>
+        <div class="other show-more-less-html__markup--clamp">not this one</div>
+        <div class="a show-more-less-html__markup b">Hello <b>world</b><!-- comment --></div>
+        <div class="show-more-less-html__markup">nor this one</div>
+        <ul>
+            <li class="description__job-criteria-item"><h3> Level
+            </h3><span> Senior </span></li>
+            <li class="description__job-criteria-item"><h3>Missing value</h3></li>
+            <li class="description__job-criteria-item"><span>Missing criterium</span></li>
+            <li class="description__job-criteria-item--other"><h3>Other</h3><span>Other</span></li>
+        </ul>
+    </body></html>""")
+    assert description == "Hello world"
+    assert criteria == {"Level": "Senior"}
+
+    # nothing to extract
+    assert parse("<html><body><p>Not a job</p></body></html>") == (None, {})
+    assert parse("") == (None, {})
+    assert parse(" \n") == (None, {})
+
+    # declaring its encoding
+    assert parse('<?xml version="1.0" encoding="iso-8859-1"?><html><body>'
+                 '<div class="show-more-less-html__markup">Café</div></body></html>') == ("Café", {})
+
+
+@pytest.mark.parametrize("html", [
+    "<div>a<!--c--> <script>x</script><style>y</style><template>z<b>w</b></template><pre>  </pre>  </div>",
+    "<div>\n  <p> a  b </p>\t<pre>\n  <b> </b>\n</pre><textarea> </textarea>\r</div>",
+    "<pre><div>\n  <b> </b></div></pre>",
+])
+def test_parse_job_page_text(html):
+    # the text of the description is the same as bs4's
+    html = html.replace("<div>", '<div class="show-more-less-html__markup">')
+    assert lkd.parsers.parse_job_page(html) == lkd.parsers.parse_job_page_soup(html)
@@ -0,0 +1,147 @@
+import logging
+from unittest.mock import AsyncMock, Mock, call, patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import jobsscraper.linkedin as lkd
+from .factories import make_job
+
+
+def stub_server(jobs: list[dict[str, str]], *, cap: int = 100) -> TestServer:
+    """
+    Serve the jobs matching the searched location and filters, 10 at a time,
+    but never more than the `cap` first ones. Germany has all the jobs
+    """
+    requests: list[dict[str, str]] = []
+
+    async def search(request: web.Request) -> web.Response:
+        requests.append(dict(request.query))
+        filters = {k: v for k, v in request.query.items() if k.startswith("f_") and k != "f_TPR"}
+        found = [
+            job for job in jobs
+            if request.query["location"] in ("Germany", job["location"])
+            and all(job.get(name) == value for name, value in filters.items())
+        ][:cap]
+        start = int(request.query["start"])
+        return web.Response(text="".join(
+            f'<li><a href="https://www.linkedin.com/jobs/view/{job["id"]}"></a><h3>title</h3>'
+            f'<h4><a href="https://www.linkedin.com/company/c">company</a></h4>'
+            f'<span class="{lkd.scraper.location_class_name}">{job["location"]}</span></li>'
+            for job in found[start:start + 10]
+        ), content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/search", search)
+    server = TestServer(app)
+    server.requests = requests
+    return server
+
+
+def population() -> list[dict[str, str]]:
+    """240 jobs in Bavaria, 60 in Berlin, 30 in Hamburg. Every workplace and job type"""
+    return [
+        {"id": str(i), "location": location, "f_WT": str(i % 3 + 1), "f_JT": "FPC"[i // 3 % 3]}
+        for i, location in enumerate(["Bavaria"] * 240 + ["Berlin"] * 60 + ["Hamburg"] * 30)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_SearchPlanner_plan():
+    jobs = population()
+    async with stub_server(jobs) as server:
+        planner = lkd.planner.SearchPlanner(
+            sub_locations={"Germany": ["Bavaria", "Berlin", "Hamburg"]},
+            search_url=str(server.make_url("/search")),
+            cap=100,
+        )
+        search = lkd.Search(location="Germany", keyword="Python")
+        searches = await planner.plan(search)
+
+        # only the capped searches are split: Germany, then Bavaria by workplace
+        assert searches == [
+            lkd.Search(location="Bavaria", keyword="Python", filters={"f_WT": "1"}),
+            lkd.Search(location="Bavaria", keyword="Python", filters={"f_WT": "2"}),
+            lkd.Search(location="Bavaria", keyword="Python", filters={"f_WT": "3"}),
+            lkd.Search(location="Berlin", keyword="Python"),
+            lkd.Search(location="Hamburg", keyword="Python"),
+        ]
+        # a single request per probed search, for its last listed jobs
+        assert len(server.requests) == 7
+        assert {r["start"] for r in server.requests} == {"90"}
+        assert search.filters == {}
+
+        # the planned searches find all jobs
+        urls = set()
+        for s in searches:
+            scraper = lkd.guest.GuestJobsScraper(s.location, search_url=str(server.make_url("/search")))
+            urls |= {job.url async for job in scraper.scrap_jobs(keywords=s.keyword, until=s.until, filters=s.filters)}
+        assert urls == {f"https://www.linkedin.com/jobs/view/{job['id']}" for job in jobs}
+
+
+@pytest.mark.asyncio
+async def test_SearchPlanner_plan_facets(caplog):
+    jobs = population()
+    async with stub_server(jobs) as server:
+        # a location without sub-locations is split by facet, as many as needed
+        planner = lkd.planner.SearchPlanner(search_url=str(server.make_url("/search")), cap=100)
+        searches = await planner.plan(lkd.Search(location="Germany"))
+        # 3 workplaces, each capped, times 7 job types
+        assert len(searches) == 21
+        assert searches[0].filters == {"f_WT": "1", "f_JT": "F"}
+
+        # no more facet to split by: the search is kept as is, capped
+        planner = lkd.planner.SearchPlanner(search_url=str(server.make_url("/search")), cap=100, facets={})
+        with caplog.at_level(logging.WARNING):
+            assert await planner.plan(lkd.Search(location="Germany")) == [lkd.Search(location="Germany")]
+        assert "can't be split" in caplog.text
+
+        # probed on its own session
+        planner = lkd.planner.SearchPlanner(search_url=str(server.make_url("/search")), cap=1000)
+        assert not await planner.is_capped(lkd.Search(location="Germany"))
+
+
+@pytest.mark.asyncio
+async def test_SearchPlanner_plan_jobs_without_level(caplog):
+    # on-site full-time jobs, a third of them without any experience level
+    jobs = [
+        {"id": str(i), "location": "Munich", "f_WT": "1", "f_JT": "F", **({"f_E": "4"} if i % 3 else {})}
+        for i in range(300)
+    ]
+    async with stub_server(jobs) as server:
+        planner = lkd.planner.SearchPlanner(search_url=str(server.make_url("/search")), cap=100)
+        with caplog.at_level(logging.WARNING):
+            searches = await planner.plan(lkd.Search(location="Munich"))
+        # not split by level, which would miss the jobs without any: reported as capped instead
+        assert all("f_E" not in s.filters for s in searches)
+        assert lkd.Search(location="Munich", filters={"f_WT": "1", "f_JT": "F"}) in searches
+        assert "can't be split" in caplog.text
+
+
+@patch("jobsscraper.linkedin.main.GuestJobsScraper")
+@patch("jobsscraper.linkedin.main.SearchesRunner")
+@patch("jobsscraper.linkedin.main.SearchPlanner")
+def test_scrap_all_jobs_split(planner: Mock, runner: Mock, guest_scraper: Mock):
+    searches = [lkd.Search(location="Bavaria", filters={"f_WT": "2"}), lkd.Search(location="Berlin")]
+    planner.return_value.plan = AsyncMock(return_value=searches)
+
+    # the planned searches are run together
+    lkd.scrap_all_jobs_split("Germany", keyword="Python", sub_locations={"Germany": ["Bavaria", "Berlin"]})
+    planner.assert_called_once_with(sub_locations={"Germany": ["Bavaria", "Berlin"]})
+    planner.return_value.plan.assert_awaited_once_with(lkd.Search(location="Germany", keyword="Python"))
+    runner.assert_called_once_with(
+        searches, workers=None, headless=True, batch_extraction=True, lean=False, on_progress=None)
+
+    # or one after the other, without duplicates
+    async def scrap_jobs(**_):
+        for url in ("https://www.linkedin.com/jobs/view/1", "https://www.linkedin.com/jobs/view/2"):
+            yield make_job(url=url)
+
+    guest_scraper.return_value.scrap_jobs = Mock(side_effect=scrap_jobs)
+    assert len(list(lkd.scrap_all_jobs_split("Germany", backend="http"))) == 2
+    guest_scraper.return_value.scrap_jobs.assert_called_with(keywords="", until=86400, filters={})
+    assert guest_scraper.call_args_list == [call("Bavaria"), call("Berlin")]
+
+    with pytest.raises(ValueError):
+        lkd.scrap_all_jobs_split("Germany", backend="firefox")
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from jobsscraper.linkedin import ratelimit
+
+
+class FakeClock:
+    """
+    `time.monotonic` and `asyncio.sleep` of the rate limiters: the time only passes while sleeping,
+    at once, so that how long they wait is exact. The rates below are powers of 2, so are their intervals
+    """
+
+    def __init__(self):
+        self.now = 0.
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(ratelimit, "asyncio", SimpleNamespace(sleep=clock.sleep, Lock=asyncio.Lock))
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_TokenBucket(clock):
+    with pytest.raises(ValueError):
+        ratelimit.TokenBucket(0)
+
+    # burst calls are allowed at once, then 16 calls per second
+    bucket = ratelimit.TokenBucket(16, burst=3)
+    start = clock.now
+    for _ in range(3):
+        assert await bucket.acquire() == 0
+    assert clock.now == start
+    await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+    assert clock.now - start == 0.25
+
+    # fractional rates
+    bucket = ratelimit.TokenBucket(0.5)
+    await bucket.acquire()
+    assert await bucket.acquire() == 2
+
+
+@pytest.mark.asyncio
+async def test_TokenBucket_pause(clock):
+    bucket = ratelimit.TokenBucket(128, burst=8)
+    bucket.pause(0.25)
+    # the bucket is empty after the pause
+    start = clock.now
+    await bucket.acquire()
+    await bucket.acquire()
+    assert clock.now - start == 0.25 + 2 / 128
+
+    # no token is added during the pause
+    bucket.pause(10)
+    clock.now += 5
+    bucket._refill(clock.now)
+    assert bucket._tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_AdaptiveRateLimiter(clock):
+    limiter = ratelimit.AdaptiveRateLimiter(1, increase=0.5, max_rate=2, decrease=0.5, min_rate=0.4, backoff=0)
+    assert limiter.rate == 1
+
+    # additive increase, up to the maximal rate
+    limiter.on_success()
+    assert limiter.rate == 1.5
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate == 2
+
+    # multiplicative decrease, once for all calls in flight
+    started_at = clock.now
+    clock.now += 1
+    limiter.on_throttled(started_at)
+    limiter.on_throttled(started_at)
+    assert limiter.rate == 1
+    limiter.on_throttled(clock.now)
+    assert limiter.rate == 0.5
+    limiter.on_throttled(clock.now)
+    assert limiter.rate == 0.4
+    assert limiter.nb_throttled == 4
+
+    # the server tells how long to wait
+    limiter = ratelimit.AdaptiveRateLimiter(128)
+    limiter.on_throttled(clock.now, retry_after=0.25)
+    assert limiter.rate == 64
+    assert await limiter.acquire() == 0.25 + 1 / 64
+    # the maximal rate defaults to 4 times the initial rate
+    for _ in range(20000):
+        limiter.on_success()
+    assert limiter.rate == 512
+
+
+def test_parse_retry_after():
+    assert ratelimit.parse_retry_after(None) is None
+    assert ratelimit.parse_retry_after("120") == 120
+    assert ratelimit.parse_retry_after("-1") == 0
+    assert ratelimit.parse_retry_after("tomorrow") is None
+
+    in_a_minute = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert 58 < ratelimit.parse_retry_after(format_datetime(in_a_minute, usegmt=True)) <= 60
+    assert ratelimit.parse_retry_after(in_a_minute.strftime("%a, %d %b %Y %H:%M:%S")) > 58
+    assert ratelimit.parse_retry_after("Mon, 01 Jan 2024 00:00:00 GMT") == 0
@@ -0,0 +1,212 @@
+import multiprocessing
+import os
+import signal
+import struct
+import time
+from contextlib import contextmanager
+from unittest.mock import patch, Mock
+
+import pytest
+
+import jobsscraper.linkedin as lkd
+from .factories import make_job
+
+
+class FakeScraper:
+    """
+    Find 3 jobs in the searched location, one of them being found in all locations
+    The location tells how the search behaves: crash (the worker crashes),
+    fail (an exception is raised), slow (the search never ends), stuck (the search never ends,
+    even once terminated) or terminated (the worker is terminated)
+    """
+
+    def __init__(self, location: str, *, driver: Mock, **_):
+        self._location = location
+
+    def scrap_jobs(self, keywords: str = "", *, until: int = -1, filters: dict[str, str] | None = None):
+        if self._location == "crash":
+            os._exit(1)
+        if self._location == "fail":
+            raise ValueError("failed")
+        if self._location == "terminated":
+            os.kill(os.getpid(), signal.SIGTERM)
+        if self._location == "stuck":
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        for url in (f"{self._location}/{keywords}/1", f"{self._location}/{keywords}/2", "everywhere"):
+            yield make_job(url=url, location=self._location)
+            if self._location in ("slow", "stuck"):
+                time.sleep(60)
+
+
+class FakePool:
+    # the file where every worker writes its pid once its browser is quit, if any
+    quit_log: str | None = None
+
+    def __init__(self, size: int, **_):
+        assert size == 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        if self.quit_log is not None:
+            with open(self.quit_log, "a") as f:
+                f.write(f"{os.getpid()}\n")
+
+    @contextmanager
+    def driver(self):
+        yield Mock()
+
+
+@patch("jobsscraper.linkedin.drivers.DriverPool", FakePool)
+@patch("jobsscraper.linkedin.runner.AllJobsScraper", FakeScraper)
+def test_SearchesRunner_run():
+    searches = [
+        lkd.Search(location="Munich", keyword="Python"),
+        lkd.Search(location="crash"),
+        lkd.Search(location="Berlin", keyword="Python"),
+        lkd.Search(location="fail"),
+        lkd.Search(location="Hamburg"),
+    ]
+    reports: list[lkd.SearchProgress] = []
+    runner = lkd.runner.SearchesRunner(searches, workers=2, on_progress=reports.append, mp_context="fork")
+    jobs = list(runner.run())
+
+    # jobs are deduplicated across searches
+    assert sorted(job.url for job in jobs) == [
+        "Berlin/Python/1", "Berlin/Python/2", "Hamburg//1", "Hamburg//2",
+        "Munich/Python/1", "Munich/Python/2", "everywhere",
+    ]
+    assert [p.status for p in runner.progress] == ["done", "failed", "done", "failed", "done"]
+    assert sum(p.nb_jobs for p in runner.progress) == 7
+    assert sum(p.nb_duplicates for p in runner.progress) == 2
+    assert runner.progress[1].error == "worker died with exitcode=1"
+    assert runner.progress[3].error == "ValueError('failed')"
+
+    # every change has been reported
+    assert reports[-1].status in ("done", "failed")
+    assert {r.search.location for r in reports} == {s.location for s in searches}
+
+
+@patch("jobsscraper.linkedin.drivers.DriverPool", FakePool)
+@patch("jobsscraper.linkedin.runner.AllJobsScraper", FakeScraper)
+def test_SearchesRunner_run_worker_replaced():
+    # the only worker crashes on the first search: a new one runs the next ones
+    searches = [lkd.Search(location="crash"), lkd.Search(location="Munich"), lkd.Search(location="Berlin")]
+    runner = lkd.runner.SearchesRunner(searches, workers=1, mp_context="fork")
+    jobs = list(runner.run())
+
+    assert len(jobs) == 5
+    assert [p.status for p in runner.progress] == ["failed", "done", "done"]
+    assert runner.progress[0].error == "worker died with exitcode=1"
+    assert len(multiprocessing.active_children()) == 0
+
+
+def crash_while_sending(conn, *_):
+    """A worker crashing in the middle of a message: the size of a job, but not the job"""
+    conn.recv()
+    os.write(conn.fileno(), struct.pack("!i", 100))
+    os._exit(1)
+
+
+@patch("jobsscraper.linkedin.runner.run_searches", crash_while_sending)
+def test_SearchesRunner_run_worker_died_while_sending():
+    runner = lkd.runner.SearchesRunner([lkd.Search(location="Munich")], workers=1, mp_context="fork")
+    assert list(runner.run()) == []
+    assert runner.progress[0].status == "failed"
+    assert runner.progress[0].error == "worker died with exitcode=1"
+
+
+@patch("jobsscraper.linkedin.runner.drivers.DriverPool", FakePool)
+@patch("jobsscraper.linkedin.runner.AllJobsScraper", FakeScraper)
+def test_run_searches():
+    # the worker, in this process
+    conn, worker_conn = multiprocessing.Pipe()
+    for search in (lkd.Search(location="Munich", keyword="Python"), lkd.Search(location="fail"), None):
+        conn.send(search)
+    lkd.runner.run_searches(worker_conn, {"batch_extraction": True}, {"headless": True})
+
+    received = []
+    while conn.poll():
+        received.append(conn.recv())
+    assert [(kind, getattr(payload, "url", payload)) for kind, payload in received] == [
+        ("job", "Munich/Python/1"),
+        ("job", "Munich/Python/2"),
+        ("job", "everywhere"),
+        ("done", None),
+        ("error", "ValueError('failed')"),
+    ]
+
+
+@patch("jobsscraper.linkedin.runner.drivers.DriverPool", FakePool)
+@patch("jobsscraper.linkedin.runner.AllJobsScraper", FakeScraper)
+def test_run_searches_terminated(tmp_path):
+    FakePool.quit_log = str(tmp_path / "quit.log")
+    conn, worker_conn = multiprocessing.Pipe()
+    conn.send(lkd.Search(location="terminated"))
+    previous_handler = signal.getsignal(signal.SIGTERM)
+    try:
+        with pytest.raises(SystemExit):
+            lkd.runner.run_searches(worker_conn, {}, {})
+    finally:
+        FakePool.quit_log = None
+
+    # the browser is quit, and the signal handled as before
+    with open(tmp_path / "quit.log") as f:
+        assert f.read().split() == [str(os.getpid())]
+    assert signal.getsignal(signal.SIGTERM) == previous_handler
+
+
+@patch("jobsscraper.linkedin.drivers.DriverPool", FakePool)
+@patch("jobsscraper.linkedin.runner.AllJobsScraper", FakeScraper)
+def test_SearchesRunner_run_stopped_early():
+    runner = lkd.runner.SearchesRunner([lkd.Search(location="Munich")] * 3, workers=2, mp_context="fork")
+    jobs = runner.run()
+    next(jobs)
+    jobs.close()
+
+    # the workers have been stopped
+    assert [p.status for p in runner.progress] == ["running", "running", "pending"]
+    assert len(multiprocessing.active_children()) == 0
+
+
+@patch("jobsscraper.linkedin.drivers.DriverPool", FakePool)
+@patch("jobsscraper.linkedin.runner.AllJobsScraper", FakeScraper)
+def test_SearchesRunner_run_stopped_early_quits_browsers(tmp_path):
+    FakePool.quit_log = str(tmp_path / "quit.log")
+    try:
+        searches = [lkd.Search(location="slow", keyword=str(i)) for i in range(3)]
+        runner = lkd.runner.SearchesRunner(searches, workers=2, mp_context="fork")
+        jobs = runner.run()
+        # both workers are running their search
+        next(jobs)
+        next(jobs)
+        jobs.close()
+    finally:
+        FakePool.quit_log = None
+
+    # the workers, stuck in their search, quit their browser before stopping
+    assert len(multiprocessing.active_children()) == 0
+    with open(tmp_path / "quit.log") as f:
+        assert len(f.read().split()) == 2
+
+
+@patch("jobsscraper.linkedin.runner._stop_timeout", 0.1)
+@patch("jobsscraper.linkedin.drivers.DriverPool", FakePool)
+@patch("jobsscraper.linkedin.runner.AllJobsScraper", FakeScraper)
+def test_SearchesRunner_run_stopped_early_killed():
+    runner = lkd.runner.SearchesRunner([lkd.Search(location="stuck")], workers=1, mp_context="fork")
+    jobs = runner.run()
+    next(jobs)
+    jobs.close()
+    # the worker not stopping once terminated is killed
+    assert len(multiprocessing.active_children()) == 0
+
+
+@patch("jobsscraper.linkedin.main.SearchesRunner")
+def test_scrap_all_searches(runner: Mock):
+    searches = [lkd.Search(location="Munich")]
+    lkd.scrap_all_searches(searches, workers=3)
+    runner.assert_called_once_with(
+        searches, workers=3, headless=True, batch_extraction=True, lean=False, on_progress=None)
+    runner.return_value.run.assert_called_once_with()
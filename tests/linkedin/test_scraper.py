@@ -1,4 +1,6 @@
 import asyncio
+import base64
+import json
 import os
 from contextlib import asynccontextmanager
 from itertools import repeat
@@ -7,10 +9,13 @@ from unittest.mock import Mock, patch, AsyncMock
 
 import aiohttp
 import pytest
-from selenium.common import NoSuchElementException, ElementNotInteractableException
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from selenium.common import NoSuchElementException, ElementNotInteractableException, WebDriverException
 from selenium.webdriver.common.by import By
 
 import jobsscraper.linkedin as lkd
+from .factories import make_job
 
 dir_ = os.path.dirname(os.path.abspath(__file__))
 
@@ -38,10 +43,13 @@ def mock_driver() -> Mock:
             if by == By.TAG_NAME and job.find_element.call_count == 1:
                 raise ValueError
 
-            # Simulate the fact that logo and benefits, time to time,
+            # Simulate the fact that logo, benefits and posted time, time to time,
             # don't exist
-            if (  # fails 1 / 2 times for logo and benefits
-                    value in {lkd.scraper.logo_class_name, lkd.scraper.benefits_class_name} and
+            if (  # fails 1 / 2 times for logo, benefits and posted time
+                    value in {
+                        lkd.scraper.logo_class_name, lkd.scraper.benefits_class_name,
+                        lkd.scraper.posted_time_class_name,
+                    } and
                     job.find_element.call_count % 2 == 0
             ):
                 raise NoSuchElementException("")
@@ -81,16 +89,23 @@ def mock_driver() -> Mock:
                 job = mock_job()
                 if mocked_driver.jobs_list_count == 1:
                     jobs_list.find_elements = Mock(side_effect=NoSuchElementException)
-                # the number of jobs keep on increasing, but not unlimited
+                # only the new jobs are found, until there are no more
                 elif mocked_driver.jobs_list_count <= 6:
-                    jobs = list(repeat(job, 5 * mocked_driver.jobs_list_count))
+                    jobs = list(repeat(job, 10 if mocked_driver.jobs_list_count == 2 else 5))
                     jobs_list.find_elements = Mock(return_value=jobs)
                 else:
-                    jobs = list(repeat(job, 30))
-                    jobs_list.find_elements = Mock(return_value=jobs)
+                    jobs_list.find_elements = Mock(return_value=[])
                 return jobs_list
 
+    def execute_script(script: str, *args: Any) -> Any:
+        # all found jobs are new
+        if script == lkd.scraper.mark_jobs_script:
+            return [True] * len(args[1])
+
     mocked_driver.find_element = Mock(side_effect=find_element)
+    mocked_driver.execute_script = Mock(side_effect=execute_script)
+    # new jobs are always shown
+    mocked_driver.execute_async_script = Mock(return_value=True)
     return mocked_driver
 
 
@@ -99,7 +114,7 @@ def test_AllJobsScraper_scrap_jobs(_):
     mocked_driver = mock_driver()
 
     with patch("selenium.webdriver.Chrome", return_value=mocked_driver):
-        scraper = lkd.scraper.AllJobsScraper("Garmisch")
+        scraper = lkd.scraper.AllJobsScraper("Garmisch", batch_extraction=False)
         scraper._scraping_jobs_timeout = 0.6
         jobs = list(scraper.scrap_jobs(keywords="Python", until=86400))
 
@@ -109,14 +124,375 @@ def test_AllJobsScraper_scrap_jobs(_):
         assert mocked_driver.find_element.call_count > 10
 
 
+@patch('time.sleep', return_value=None)
+def test_AllJobsScraper_scrap_jobs_rerendered_jobs(_):
+    mocked_driver = mock_driver()
+
+    def execute_script(script: str, *args: Any) -> Any:
+        # the first found job of every batch has already been scraped
+        # before being re-rendered by LinkedIn
+        if script == lkd.scraper.mark_jobs_script:
+            return [False] + [True] * (len(args[1]) - 1)
+
+    mocked_driver.execute_script = Mock(side_effect=execute_script)
+
+    with patch("selenium.webdriver.Chrome", return_value=mocked_driver):
+        scraper = lkd.scraper.AllJobsScraper("Garmisch", batch_extraction=False)
+        scraper._scraping_jobs_timeout = 0.6
+        jobs = list(scraper.scrap_jobs(keywords="Python", until=86400))
+
+        # the re-rendered jobs are skipped, and 5 jobs couldn't be scraped
+        assert len(jobs) == 20
+        assert scraper._job_index == 25
+
+
+@patch('time.sleep')
+def test_AllJobsScraper_scrap_jobs_no_more_jobs(sleep: Mock):
+    mocked_driver = mock_driver()
+    # the More button can always be clicked, but jobs are shown
+    # only once, after loading the page
+    mocked_driver.find_element = Mock()
+    mocked_driver.execute_async_script = Mock(side_effect=[True] + [False] * 10)
+    mocked_driver.execute_script = Mock(return_value=[job_card(1)])
+
+    with patch("selenium.webdriver.Chrome", return_value=mocked_driver):
+        scraper = lkd.scraper.AllJobsScraper("Garmisch")
+        jobs = list(scraper.scrap_jobs())
+
+        assert len(jobs) == 1
+        # we gave up after 10 tries, without sleeping
+        assert mocked_driver.execute_async_script.call_count == 11
+        assert sleep.call_count == 0
+        # the first wait uses the maximum timeout. The next ones the minimum one, after the fast load,
+        # doubled by every miss up to the maximum: LinkedIn lagging doesn't end the search too early
+        timeouts = [c.args[2] for c in mocked_driver.execute_async_script.call_args_list]
+        assert timeouts == [6000, 1000, 2000, 4000] + [6000] * 7
+
+
+def job_card(i: int) -> dict[str, str | None]:
+    return {
+        "url": f"https://www.linkedin.com/jobs/view/{i}",
+        # every 5th card can't be scraped
+        "title": None if i % 5 == 0 else f" title {i} ",
+        "company_name": "company_name",
+        "company_url": "company_url",
+        # logo and benefits don't always exist
+        "logo": "logo" if i % 2 == 0 else None,
+        "benefit": ' "Actively Hiring" ' if i % 2 == 0 else None,
+        "location": "Garmisch ",
+        "posted_time": "2024-03-01",
+    }
+
+
+@patch('time.sleep', return_value=None)
+def test_AllJobsScraper_scrap_jobs_batch_extraction(_):
+    mocked_driver = mock_driver()
+    mocked_driver.script_count = 0
+
+    def execute_script(script: str, *args: Any) -> Any:
+        if script != lkd.scraper.extract_jobs_script:
+            return None
+        mocked_driver.script_count += 1
+        # the jobs list is not loaded yet
+        if mocked_driver.script_count == 1:
+            return None
+        # only the new jobs are returned, until there are no more
+        start = min(5 * (mocked_driver.script_count - 2), 30)
+        return [job_card(i) for i in range(start, min(start + 5, 30))]
+
+    mocked_driver.execute_script = Mock(side_effect=execute_script)
+
+    with patch("selenium.webdriver.Chrome", return_value=mocked_driver):
+        scraper = lkd.scraper.AllJobsScraper("Garmisch")
+        scraper._scraping_jobs_timeout = 0.6
+        jobs = list(scraper.scrap_jobs(keywords="Python", until=86400))
+
+        # all jobs should have been fetched, and 6 couldn't be scraped
+        assert len(jobs) == 24
+        assert jobs[0].title == "title 1"
+        assert jobs[0].company.logo is None
+        assert jobs[0].company.actively_hiring is None
+        assert jobs[1].company.logo == "logo"
+        assert jobs[1].company.actively_hiring is True
+        assert jobs[1].location.full_location == "Garmisch"
+        # the jobs' fields are never requested one by one
+        assert mocked_driver.jobs_list_count == 0
+
+
+def mock_batch_driver(nb_cards: int, batch_size: int = 5) -> Mock:
+    """All new jobs are extracted at once, `batch_size` at a time, newest first"""
+    mocked_driver = mock_driver()
+    mocked_driver.nb_extracted = 0
+
+    def execute_script(script: str, *args: Any) -> Any:
+        if script != lkd.scraper.extract_jobs_script:
+            return None
+        start = mocked_driver.nb_extracted
+        mocked_driver.nb_extracted = min(start + batch_size, nb_cards)
+        return [job_card(i) for i in range(start, mocked_driver.nb_extracted)]
+
+    mocked_driver.execute_script = Mock(side_effect=execute_script)
+    # the "More jobs" button is there until all jobs are shown
+    mocked_driver.find_element = Mock(side_effect=lambda *_: (
+        Mock() if mocked_driver.nb_extracted < nb_cards else (_ for _ in ()).throw(NoSuchElementException(""))))
+    return mocked_driver
+
+
+@patch('time.sleep', return_value=None)
+def test_AllJobsScraper_scrap_jobs_seen_store(_, tmp_path):
+    def scrap(nb_cards: int, stop_after_seen: int | None = 10, nb_read: int | None = None) -> list[str]:
+        mocked_driver = mock_batch_driver(nb_cards)
+        scraper = lkd.scraper.AllJobsScraper("Garmisch", driver=mocked_driver)
+        jobs = scraper.scrap_jobs(keywords="Python", until=86400, seen_store=seen, stop_after_seen=stop_after_seen)
+        urls = [job.url for _, job in zip(range(nb_read) if nb_read is not None else repeat(None), jobs)]
+        jobs.close()
+        return urls
+
+    def job_urls(*ranges: range) -> list[str]:
+        return [job_card(i)["url"] for r in ranges for i in r if i % 5 != 0]
+
+    with lkd.store.SeenJobsStore(tmp_path / "seen.sqlite") as seen:
+        # first run: everything is new
+        assert scrap(50) == job_urls(range(50))
+        assert len(seen) == 40
+        key = lkd.store.search_key("Garmisch", "Python", 86400)
+        assert seen.checkpoint(key).position == 40 and seen.checkpoint(key).done
+
+        # the known jobs are skipped, and the search stops once 10 known jobs in a row are found
+        # (job_card numbers the newest first: the same cards are found again)
+        assert scrap(200) == []
+        assert seen.checkpoint(key).position == 12
+
+        # without early stop, only the jobs never seen are returned
+        assert scrap(70, stop_after_seen=None) == job_urls(range(50, 70))
+
+    with lkd.store.SeenJobsStore(tmp_path / "crashed.sqlite") as seen:
+        # the run is stopped (crash) while reading the 13th job: it didn't finish
+        assert scrap(200, nb_read=13) == job_urls(range(17))
+        assert seen.checkpoint(key) == lkd.store.Checkpoint(12, False, seen.checkpoint(key).updated_at)
+        # the next run doesn't stop on the jobs found before the crash, and goes on from there.
+        # The 13th job is returned again, since it might not have been handled
+        assert scrap(60, stop_after_seen=4) == job_urls(range(16, 60))
+        assert seen.checkpoint(key).done
+
+
+@patch('time.sleep', return_value=None)
+def test_AllJobsScraper_scrap_jobs_prune(_):
+    # batch: the cards are emptied by the extraction itself
+    mocked_driver = mock_batch_driver(10)
+    scraper = lkd.scraper.AllJobsScraper("Garmisch", driver=mocked_driver, prune=True)
+    assert len(list(scraper.scrap_jobs(keywords="Python"))) == 8
+    extractions = [c for c in mocked_driver.execute_script.call_args_list
+                   if c.args[0] == lkd.scraper.extract_jobs_script]
+    assert all(c.args[1]["prune"] for c in extractions)
+
+    # webdriver: the new cards are emptied once scraped
+    mocked_driver = mock_driver()
+    with patch("selenium.webdriver.Chrome", return_value=mocked_driver):
+        scraper = lkd.scraper.AllJobsScraper("Garmisch", batch_extraction=False, prune=True)
+        scraper._scraping_jobs_timeout = 0.6
+        assert len(list(scraper.scrap_jobs(keywords="Python"))) == 25
+    pruned = [c.args[1] for c in mocked_driver.execute_script.call_args_list
+              if c.args[0] == lkd.scraper.prune_jobs_script]
+    assert sum(len(jobs) for jobs in pruned) == 30
+
+
+@patch('time.sleep', return_value=None)
+def test_AllJobsScraper_scrap_jobs_recycle_driver(_):
+    def recycled_driver(skipped: list[int], nb_cards: int = 30) -> Mock:
+        """The new browser, showing again the 10 jobs scraped by the previous one"""
+        driver = mock_batch_driver(nb_cards)
+        driver.nb_extracted = 10
+        extract = driver.execute_script.side_effect
+        skip = iter(skipped)
+        driver.execute_script.side_effect = lambda script, *args: (
+            next(skip) if script == lkd.scraper.skip_known_jobs_script else extract(script, *args))
+        # the jobs are shown only once the page is loaded
+        driver.execute_async_script.side_effect = [False, *repeat(True, 100)]
+        return driver
+
+    def capture_nothing(driver: Mock):
+        """Nothing is captured from the network traffic: the new jobs are extracted from the page"""
+        driver.get_log = Mock(return_value=[])
+        execute_script = driver.execute_script.side_effect
+        driver.execute_script.side_effect = lambda script, *args: (
+            {"new": [], "left": 1} if script == lkd.scraper.mark_captured_jobs_script
+            else execute_script(script, *args))
+
+    def scrap(new_driver: Mock, capture: bool = False) -> tuple[list[str], Mock]:
+        first_driver = mock_batch_driver(30)
+        extract = first_driver.execute_script.side_effect
+        first_driver.execute_script.side_effect = lambda script, *args: (
+            ["known"] if script == lkd.scraper.seen_keys_script else extract(script, *args))
+        if capture:
+            capture_nothing(first_driver)
+            capture_nothing(new_driver)
+        with patch("selenium.webdriver.Chrome", side_effect=[first_driver, new_driver]), \
+                patch.object(lkd.drivers, "driver_memory",
+                             side_effect=lambda driver: 2 * 1024 ** 3 if driver is first_driver else 0):
+            scraper = lkd.scraper.AllJobsScraper("Garmisch", max_memory_mb=1024, capture=capture)
+            scraper._memory_check_every = 2
+            urls = [job.url for job in scraper.scrap_jobs(keywords="Python")]
+        first_driver.quit.assert_called_once_with()
+        new_driver.execute_script.assert_any_call(lkd.scraper.seed_seen_keys_script, ["known"])
+        return urls, first_driver
+
+    # the new browser skips the known jobs, until new ones are shown: all jobs are scraped once
+    new_driver = recycled_driver([0, 5])
+    urls, _ = scrap(new_driver)
+    assert urls == [job_card(i)["url"] for i in range(30) if i % 5 != 0]
+    new_driver.get.assert_called_once()
+
+    # the known jobs fetched again by the new browser are not captured
+    new_driver = recycled_driver([0, 5])
+    urls, _ = scrap(new_driver, capture=True)
+    assert urls == [job_card(i)["url"] for i in range(30) if i % 5 != 0]
+    new_driver.get_log.assert_called_with("performance")
+
+    # no more jobs after the known ones
+    urls, _ = scrap(recycled_driver([0], nb_cards=10))
+    assert urls == [job_card(i)["url"] for i in range(10) if i % 5 != 0]
+
+    # a given browser is never replaced
+    with patch.object(lkd.drivers, "driver_memory") as driver_memory:
+        scraper = lkd.scraper.AllJobsScraper("Garmisch", driver=mock_batch_driver(30), max_memory_mb=1)
+        scraper._memory_check_every = 1
+        assert len(list(scraper.scrap_jobs(keywords="Python"))) == 24
+        driver_memory.assert_not_called()
+
+
+def performance_entry(method: str, **params: Any) -> dict[str, Any]:
+    return {"level": "INFO", "message": json.dumps({"message": {"method": method, "params": params}, "webview": "1"})}
+
+
+def fragment_response(request_id: str, url: str, status: int = 200) -> dict[str, Any]:
+    return performance_entry(
+        "Network.responseReceived", requestId=request_id, response={"url": url, "status": status})
+
+
+def fragment_html(cards: range) -> str:
+    return "".join(
+        f'<li><a href="https://www.linkedin.com/jobs/view/{i}?trk=guest"></a><h3>title {i}</h3>'
+        f'<h4><a href="https://www.linkedin.com/company/company">company</a></h4>'
+        f'<span class="{lkd.scraper.location_class_name}">Garmisch</span></li>'
+        for i in cards
+    )
+
+
+@patch('time.sleep', return_value=None)
+def test_AllJobsScraper_scrap_jobs_capture(_):
+    fragment_url = f"https://www.linkedin.com{lkd.scraper.captured_fragments_path}search?start=5"
+    mocked_driver = mock_driver()
+    mocked_driver.get_log = Mock(side_effect=[
+        # the first jobs are loaded with the page
+        [],
+        # the fragment's response is received, then loaded
+        [performance_entry("Network.requestWillBeSent", requestId="1"), fragment_response("1", fragment_url)],
+        [
+            performance_entry("Network.loadingFinished", requestId="1"),
+            fragment_response("2", fragment_url), performance_entry("Network.loadingFinished", requestId="2"),
+            # not kept by the browser anymore
+            fragment_response("3", fragment_url), performance_entry("Network.loadingFinished", requestId="3"),
+            # not a fragment of job cards
+            fragment_response("4", "https://www.linkedin.com/jobs/search"),
+            fragment_response("5", fragment_url, status=400),
+            performance_entry("Network.loadingFinished", requestId="4"),
+        ],
+        [],
+    ])
+    bodies = {
+        # also has jobs already extracted from the page, and the next fragment overlaps it
+        "1": {"body": fragment_html(range(3, 16)), "base64Encoded": False},
+        "2": {"body": base64.b64encode(fragment_html(range(15, 25)).encode()).decode(), "base64Encoded": True},
+    }
+    mocked_driver.execute_cdp_cmd = Mock(side_effect=lambda _, params: (
+        bodies[params["requestId"]] if params["requestId"] in bodies else (_ for _ in ()).throw(WebDriverException())))
+
+    # the urls of the jobs scraped, on the page side
+    scraped = set()
+
+    def execute_script(script: str, *args: Any) -> Any:
+        if script == lkd.scraper.mark_captured_jobs_script:
+            is_new = []
+            for url in args[1]:
+                is_new.append(url not in scraped)
+                scraped.add(url)
+            # the first jobs aren't captured
+            return {"new": is_new, "left": 5 if mocked_driver.get_log.call_count == 1 else 0}
+        if script == lkd.scraper.extract_jobs_script:
+            scraped.update(job_card(i)["url"] for i in range(5))
+            return [job_card(i) for i in range(5)]
+
+    mocked_driver.execute_script = Mock(side_effect=execute_script)
+    # the "More jobs" button is there until all fragments are loaded
+    mocked_driver.find_element = Mock(side_effect=lambda *_: (
+        Mock() if mocked_driver.get_log.call_count < 4 else (_ for _ in ()).throw(NoSuchElementException(""))))
+
+    scraper = lkd.scraper.AllJobsScraper("Garmisch", driver=mocked_driver, capture=True, prune=True)
+    jobs = list(scraper.scrap_jobs(keywords="Python"))
+
+    # every job once
+    assert [job.url for job in jobs] == [job_card(i)["url"] for i in range(1, 5)] + [
+        f"https://www.linkedin.com/jobs/view/{i}?trk=guest" for i in range(5, 25)]
+    assert jobs[-1].title == "title 24"
+    # the page is queried for the jobs not captured only
+    scripts = [c.args[0] for c in mocked_driver.execute_script.call_args_list]
+    assert scripts.count(lkd.scraper.extract_jobs_script) == 1
+    # the captured jobs are marked on the page, by url
+    marked = [c.args for c in mocked_driver.execute_script.call_args_list
+              if c.args[0] == lkd.scraper.mark_captured_jobs_script]
+    assert marked[2][1] == {"jobsList": lkd.scraper.jobs_results_class_name, "seen": lkd.scraper.seen_job_attribute,
+                            "prune": True}
+    assert marked[2][2] == [f"https://www.linkedin.com/jobs/view/{i}" for i in [*range(3, 16), *range(15, 25)]]
+
+
+@patch('time.sleep', return_value=None)
+def test_AllJobsScraper_scrap_jobs_capture_not_supported(_):
+    mocked_driver = mock_batch_driver(10)
+    extract = mocked_driver.execute_script.side_effect
+    mocked_driver.execute_script.side_effect = lambda script, *args: (
+        {"new": [], "left": 5} if script == lkd.scraper.mark_captured_jobs_script else extract(script, *args))
+    mocked_driver.get_log = Mock(side_effect=WebDriverException("log type 'performance' not found"))
+
+    # the jobs are extracted from the page
+    scraper = lkd.scraper.AllJobsScraper("Garmisch", driver=mocked_driver, capture=True)
+    assert len(list(scraper.scrap_jobs(keywords="Python"))) == 8
+    mocked_driver.get_log.assert_called_once()
+
+    with pytest.raises(ValueError):
+        lkd.scraper.AllJobsScraper("Garmisch", driver=mocked_driver, capture=True, batch_extraction=False)
+
+
+def test_job_from_card():
+    card = job_card(2)
+    card["benefit"] = "Be an early applicant"
+    job = lkd.scraper.job_from_card(card)
+    assert job.url == "https://www.linkedin.com/jobs/view/2"
+    assert job.company.actively_hiring is False
+    assert job.posted_time == "2024-03-01"
+
+    # a missing mandatory field: the job can't be scraped
+    card["location"] = None
+    assert lkd.scraper.job_from_card(card) is None
+
+
+@pytest.mark.parametrize("i", range(1, 5))
+def test_job_from_card_record(i: int):
+    # the same job, as a lightweight record
+    card = job_card(i)
+    record = lkd.scraper.job_from_card(card, record=True)
+    assert isinstance(record, lkd.JobRecord)
+    assert record.job_id == str(i)
+    assert record.to_model() == lkd.scraper.job_from_card(card)
+
+    # a missing mandatory field: the job can't be scraped
+    for field in ("url", "title", "company_name", "location"):
+        assert lkd.scraper.job_from_card({**card, field: None}, record=True) is None
+
+
 @pytest.mark.asyncio
 async def test_SingleJobScraper_scrap():
-    data = lkd.LinkedInJob(
-        url="http://test.com/path",
-        title="title",
-        company=lkd.Company(name="company"),
-        location=lkd.Location(full_location="Garmisch"),
-    )
+    data = make_job(url="http://test.com/path")
 
     def session(res_status_code: int = 200):
         sess = Mock()
@@ -127,6 +503,7 @@ async def test_SingleJobScraper_scrap():
             sess.nb_req += 1
             resp = Mock()
             resp.status = res_status_code
+            resp.headers = {}
             resp.text = AsyncMock(return_value=html_data)
             if res_status_code >= 400:
                 resp.raise_for_status = Mock(side_effect=aiohttp.ClientError)
@@ -146,7 +523,7 @@ async def test_SingleJobScraper_scrap():
     # case when there are too many requests - 429 error code
     mocked = session(429)
     with patch("aiohttp.ClientSession", return_value=mocked):
-        scraper = lkd.scraper.SingleJobScraper(rqs=5)
+        scraper = lkd.scraper.SingleJobScraper(rqs=5, adaptive=False, backoff=0)
         with pytest.raises(aiohttp.ClientError):
             await scraper.scrap(data)
         assert mocked.nb_req == 6
@@ -160,6 +537,28 @@ async def test_SingleJobScraper_scrap():
         assert len(data.criteria) > 0
         assert mocked.nb_req == 1
 
+    # same data with the BeautifulSoup parser
+    mocked = session()
+    with patch("aiohttp.ClientSession", return_value=mocked):
+        soup_data = data.model_copy(update={"description": "", "criteria": {}})
+        scraper = lkd.scraper.SingleJobScraper(rqs=5, parser="bs4")
+        await scraper.scrap(soup_data)
+        assert soup_data.description == data.description
+        assert soup_data.criteria == data.criteria
+        with pytest.raises(ValueError):
+            lkd.scraper.SingleJobScraper(parser="html5lib")
+
+    # parsed in another process
+    mocked = session()
+    with patch("aiohttp.ClientSession", return_value=mocked):
+        process_data = data.model_copy(update={"description": "", "criteria": {}})
+        scraper = lkd.scraper.SingleJobScraper(rqs=5, parse_workers=1)
+        await scraper.scrap(process_data)
+        assert process_data.description == data.description
+        assert process_data.criteria == data.criteria
+        mocked.close = AsyncMock()
+        await scraper.close()
+
     # concurrent calls
     mocked = session()
     with patch("aiohttp.ClientSession", return_value=mocked):
@@ -173,3 +572,81 @@ async def test_SingleJobScraper_scrap():
         assert len(data.description) > 0
         assert len(data.criteria) > 0
         assert mocked.nb_req == 2
+
+
+def test_AllJobsScraper_without_selenium():
+    with patch.object(lkd.drivers, "webdriver", None):
+        with pytest.raises(ImportError):
+            lkd.scraper.AllJobsScraper("Garmisch")
+
+
+def test_AllJobsScraper_close():
+    with patch("selenium.webdriver.Chrome") as chrome:
+        lkd.scraper.AllJobsScraper("Garmisch").close()
+        chrome.return_value.quit.assert_called_once_with()
+
+    # the browser has been given: it is not quit
+    driver = Mock()
+    lkd.scraper.AllJobsScraper("Garmisch", driver=driver).close()
+    driver.quit.assert_not_called()
+
+
+def stub_job_server(latency: float = 0) -> tuple[TestServer, list[tuple[web.Request, Any]]]:
+    # the requests, and the client's address of their connection
+    requests = []
+
+    async def job(request: web.Request) -> web.Response:
+        requests.append((request, request.transport.get_extra_info("peername")))
+        await asyncio.sleep(latency)
+        return web.Response(text=html_data, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/jobs/view/{id}", job)
+    return TestServer(app), requests
+
+
+@pytest.mark.asyncio
+async def test_SingleJobScraper_session():
+    server, requests = stub_job_server()
+    async with server:
+        url = str(server.make_url("/jobs/view/1"))
+        async with lkd.scraper.SingleJobScraper(rqs=100, limit_per_host=2, keepalive_timeout=10) as scraper:
+            # created on the first request
+            assert scraper._session is None
+            await scraper.scrap(make_job(url=url))
+            await scraper.scrap(make_job(url=url))
+            session = scraper._session
+            assert session.connector.limit_per_host == 2
+        assert session.closed
+        # compressed responses are asked for, and the connection is kept alive
+        assert "gzip" in requests[0][0].headers["Accept-Encoding"]
+        assert len({peer for _, peer in requests}) == 1
+
+        # a session shared by several scrapers, and not closed by them
+        async with lkd.scraper.create_session() as session:
+            for _ in range(2):
+                async with lkd.scraper.SingleJobScraper(rqs=100, session=session) as scraper:
+                    await scraper.scrap(make_job(url=url))
+            assert not session.closed
+        assert len({peer for _, peer in requests[2:]}) == 1
+
+
+@pytest.mark.asyncio
+async def test_SingleJobScraper_timeout():
+    server, _ = stub_job_server(latency=1)
+    async with server:
+        async with lkd.scraper.SingleJobScraper(rqs=100, timeout=0.05) as scraper:
+            with pytest.raises(asyncio.TimeoutError):
+                await scraper.scrap(make_job(url=str(server.make_url("/jobs/view/1"))))
+
+
+@pytest.mark.asyncio
+async def test_SingleJobScraper_not_closed(caplog):
+    server, _ = stub_job_server()
+    async with server:
+        scraper = lkd.scraper.SingleJobScraper(rqs=100)
+        await scraper.scrap(make_job(url=str(server.make_url("/jobs/view/1"))))
+        session = scraper._session
+        del scraper
+        assert "not closed" in caplog.text
+        await session.close()
@@ -0,0 +1,144 @@
+import gzip
+import json
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from jobsscraper.linkedin.sinks import JobsSink, NdjsonSink, ParquetSink, SqliteSink, job_row
+from .factories import make_job, make_record
+
+record = make_record(1)
+
+
+def test_job_row():
+    job = make_job(1, description="description", tags={"b", "a"}, criteria={"Seniority level": "Entry level"})
+    assert job_row(job) == {
+        "job_id": "1",
+        "url": "https://www.linkedin.com/jobs/view/python-developer-1",
+        "title": "Python Developer 1",
+        "company_name": "Company 1",
+        "company_url": None,
+        "company_logo": None,
+        "actively_hiring": None,
+        "location": "Munich, Bavaria, Germany",
+        "posted_time": None,
+        "description": "description",
+        "tags": ["a", "b"],
+        "criteria": {"Seniority level": "Entry level"},
+    }
+    assert job_row(record) == job_row(make_job(1))
+
+
+def test_JobsSink_batches():
+    batches = []
+
+    class ListSink(JobsSink):
+        def _write_batch(self, jobs):
+            batches.append(list(jobs))
+
+    with ListSink(batch_size=2) as sink:
+        sink.write(make_job(0))
+        assert batches == [] and sink.nb_rows == 0
+        assert sink.rows_per_second == 0
+        sink.write(make_job(1))
+        # written once the batch is full
+        assert len(batches) == 1 and sink.nb_rows == 2
+        assert sink.write_all(make_job(i) for i in range(2, 5)) == 3
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert sink.nb_rows == 5 and sink.rows_per_second > 0
+
+    # a sink must write its batches
+    class IncompleteSink(JobsSink):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSink()
+
+
+@pytest.mark.asyncio
+async def test_JobsSink_write_all_async(tmp_path):
+    async def jobs():
+        for i in range(3):
+            yield make_job(i)
+
+    with NdjsonSink(tmp_path / "jobs.ndjson", batch_size=2) as sink:
+        assert await sink.write_all_async(jobs()) == 3
+    assert len((tmp_path / "jobs.ndjson").read_text().splitlines()) == 3
+
+
+def test_NdjsonSink(tmp_path):
+    path = tmp_path / "jobs.ndjson"
+    with NdjsonSink(path, batch_size=2) as sink:
+        sink.write_all([make_job(0), record])
+    # appended
+    with NdjsonSink(path) as sink:
+        sink.write(make_job(2))
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["job_id"] for line in lines] == ["0", "1", "2"]
+    assert lines[1]["title"] == record.title and lines[1]["company"]["name"] == record.company_name
+
+    # compressed
+    with NdjsonSink(tmp_path / "jobs.ndjson.gz") as sink:
+        sink.write_all([make_job(0), make_job(1)])
+    with gzip.open(tmp_path / "jobs.ndjson.gz", "rt") as f:
+        assert [json.loads(line)["job_id"] for line in f] == ["0", "1"]
+    with NdjsonSink(tmp_path / "jobs.gzip", compress=True) as sink:
+        sink.write(make_job(0))
+    with gzip.open(tmp_path / "jobs.gzip", "rt") as f:
+        assert len(f.readlines()) == 1
+
+
+def test_SqliteSink(tmp_path):
+    path = tmp_path / "jobs.sqlite"
+    with patch("time.time", return_value=1000):
+        with SqliteSink(path, batch_size=2) as sink:
+            sink.write_all([make_job(0), make_job(1, description="old", tags={"remote"}), make_job(2)])
+
+    # upserted: the details found before are kept, unless new ones are found
+    with patch("time.time", return_value=2000):
+        with SqliteSink(path) as sink:
+            sink.write_all([
+                make_job(1, posted_time="2024-03-01"),
+                make_job(2, description="new", criteria={"Employment type": "Full-time"}),
+            ])
+
+    with sqlite3.connect(path) as db:
+        rows = db.execute(
+            "SELECT job_id, posted_time, description, tags, criteria, updated_at FROM jobs ORDER BY job_id").fetchall()
+    assert rows == [
+        ("0", None, None, None, None, 1000),
+        ("1", "2024-03-01", "old", '["remote"]', None, 2000),
+        ("2", None, "new", None, '{"Employment type": "Full-time"}', 2000),
+    ]
+
+    # another table
+    with SqliteSink(path, table="other_jobs") as sink:
+        sink.write(record)
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT job_id, title FROM other_jobs").fetchall() == [("1", "Python Developer 1")]
+    # even a keyword
+    with SqliteSink(path, table="select") as sink:
+        sink.write(record)
+
+    # not an sql injection
+    for table in ("jobs; DROP TABLE other_jobs", 'jobs"', ""):
+        with pytest.raises(ValueError):
+            SqliteSink(path, table=table)
+
+
+def test_ParquetSink(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "jobs.parquet"
+    with ParquetSink(path, batch_size=2) as sink:
+        sink.write_all([make_job(0, tags={"remote"}, criteria={"Employment type": "Full-time"}), record, make_job(2)])
+    file = parquet.ParquetFile(path)
+    # a row group per batch
+    assert file.num_row_groups == 2
+    rows = file.read().to_pylist()
+    assert [row["job_id"] for row in rows] == ["0", "1", "2"]
+    assert rows[0]["tags"] == ["remote"] and rows[0]["criteria"] == [("Employment type", "Full-time")]
+
+    with patch("jobsscraper.linkedin.sinks.pyarrow", None):
+        with pytest.raises(ImportError, match="jobsscraper\\[parquet\\]"):
+            ParquetSink(path)
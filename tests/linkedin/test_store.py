@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+from jobsscraper.linkedin.store import Checkpoint, SeenJobsStore, search_key
+
+
+def test_SeenJobsStore(tmp_path):
+    key = search_key("Garmisch", "Python", 86400)
+    assert key != search_key("Garmisch", "Python", 3600)
+    # the searches split by filter are checkpointed apart, whatever the filters' order
+    assert key == search_key("Garmisch", "Python", 86400, {})
+    assert key != search_key("Garmisch", "Python", 86400, {"f_WT": "2"})
+    assert search_key("Garmisch", "", 86400, {"f_WT": "2", "f_JT": "F"}) == \
+        search_key("Garmisch", "", 86400, {"f_JT": "F", "f_WT": "2"})
+
+    with SeenJobsStore(tmp_path / "seen.sqlite") as store:
+        assert "3812345678" not in store
+        store.add("3812345678")
+        store.add("3812345678")
+        assert "3812345678" in store
+        assert len(store) == 1
+
+        assert store.checkpoint(key) is None
+        with patch("time.time", return_value=1000):
+            store.save_checkpoint(key, 25, done=False)
+        assert store.checkpoint(key) == Checkpoint(25, False, 1000)
+
+    # persisted on disk
+    with SeenJobsStore(tmp_path / "seen.sqlite") as store:
+        assert "3812345678" in store
+        store.save_checkpoint(key, 50, done=True)
+        assert store.checkpoint(key).position == 50 and store.checkpoint(key).done
@@ -1,4 +1,7 @@
+import asyncio
 import os
+import threading
+import time
 from unittest.mock import Mock
 
 import pytest
@@ -39,3 +42,89 @@ def test_take_screenshot_on_error():
         run(obj, 3)
     assert obj._driver.save_screenshot.call_count == 1
     del os.environ[utils.screenshot_on_error_env_name]
+
+
+def test_adaptive_timeout():
+    timeout = utils.AdaptiveTimeout(1, 6, factor=4, smoothing=0.5)
+    # no observed latency yet
+    assert timeout.timeout == 6
+
+    timeout.observe(0.1)
+    assert timeout.timeout == 1
+    timeout.observe(0.5)
+    assert timeout.timeout == 1.2
+    timeout.observe(10)
+    assert timeout.timeout == 6
+
+    # doubled by every miss, up to the maximum
+    timeout = utils.AdaptiveTimeout(1, 6)
+    timeout.observe(0.01)
+    timeout.miss()
+    assert timeout.timeout == 2
+    timeout.miss()
+    assert timeout.timeout == 4
+    timeout.miss()
+    assert timeout.timeout == 6
+    # nothing observed yet: already the maximum
+    timeout = utils.AdaptiveTimeout(1, 6)
+    timeout.miss()
+    assert timeout.timeout == 6
+
+
+@pytest.mark.asyncio
+async def test_iterate_async():
+    async def numbers():
+        yield 1
+        yield 2
+
+    assert [i async for i in utils.iterate_async([1, 2])] == [1, 2]
+    assert [i async for i in utils.iterate_async(numbers())] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_iterate_in_thread():
+    main_thread = threading.current_thread()
+    threads = set()
+    closed = threading.Event()
+
+    def numbers(n: int):
+        try:
+            for i in range(n):
+                threads.add(threading.current_thread())
+                time.sleep(0.001)
+                yield i
+            if n == 3:
+                raise ValueError("failed")
+        finally:
+            closed.set()
+
+    assert [i async for i in utils.iterate_in_thread(numbers(10), maxsize=2)] == list(range(10))
+    assert main_thread not in threads
+    assert closed.wait(1)
+
+    # the error is raised to the caller
+    closed.clear()
+    found = []
+    with pytest.raises(ValueError):
+        async for i in utils.iterate_in_thread(numbers(3)):
+            found.append(i)
+    assert found == [0, 1, 2]
+    assert closed.wait(1)
+
+    # the caller stops early, while the thread waits for the full queue
+    closed.clear()
+    iterator = utils.iterate_in_thread(numbers(1000), maxsize=1)
+    assert await anext(iterator) == 0
+    await asyncio.sleep(0.05)
+    await iterator.aclose()
+    await asyncio.sleep(0.05)
+    assert closed.is_set()
+
+
+def test_job_id_from_url():
+    assert utils.job_id_from_url(
+        "https://de.linkedin.com/jobs/view/python-developer-at-acme-3812345678?refId=abc&trk=public_jobs"
+    ) == "3812345678"
+    assert utils.job_id_from_url("https://www.linkedin.com/jobs/view/3812345678/") == "3812345678"
+    assert utils.job_id_from_url("https://www.linkedin.com/jobs/search?currentJobId=3812345678") == "3812345678"
+    assert utils.job_id_from_url("https://www.linkedin.com/jobs/view/python-developer") is None